@@ -0,0 +1,93 @@
+# APPOINTMENT LOG - STREAMING AGGREGATOR
+# Ringkasan root cause (status, waste, jam-dokter) dari log appointment dengan memori konstan
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from data_loader import (APPT_COLUMNS, APPT_STATUSES, BATCH_ROWS, DEPARTMENTS,
+                         MONTH_ORIGIN, N_MONTHS, appt_partials, iter_records,
+                         merge_partials)
+
+# Satu slot appointment = 30 menit waktu dokter
+SLOT_HOURS = 0.5
+WASTE_STATUSES = ['Dibatalkan', 'No-Show']
+
+
+def stream_appointments(path, batch_rows=BATCH_ROWS):
+    """Generator (partials berjalan, jumlah baris) setelah setiap batch"""
+    total, rows = {}, 0
+    for batch in iter_records(path, APPT_COLUMNS, batch_rows):
+        total = merge_partials(total, appt_partials(batch))
+        rows += len(batch)
+        yield total, rows
+
+
+def _waste(counts):
+    """Jumlah appointment terbuang (Dibatalkan + No-Show) per baris"""
+    index = [APPT_STATUSES.index(s) for s in WASTE_STATUSES]
+    return np.asarray(counts)[..., index].sum(axis=-1)
+
+
+def appointment_breakdowns(partials):
+    """Frame waste per bulan dan per departemen dari partial aggregates appointment"""
+    def frame(labels, counts):
+        df = pd.DataFrame(counts, columns=APPT_STATUSES)
+        df.insert(0, 'Label', labels)
+        total = counts.sum(axis=1)
+        df['Total'] = total
+        with np.errstate(invalid='ignore', divide='ignore'):
+            df['Waste_Pct'] = np.round(_waste(counts) / total * 100, 1)
+        df['Wasted_Doctor_Hours'] = _waste(counts) * SLOT_HOURS
+        return df[total > 0].reset_index(drop=True)
+
+    months = (MONTH_ORIGIN + np.arange(N_MONTHS)).astype(str)
+    by_month = frame(months, partials['month_status']).rename(columns={'Label': 'Month'})
+    by_dept = frame(DEPARTMENTS, partials['dept_status']).rename(columns={'Label': 'Department'})
+    return by_month, by_dept
+
+
+def summarize_appointments(path, batch_rows=BATCH_ROWS):
+    """Ringkasan lengkap log appointment + laju pemrosesan (rows/sec)"""
+    start = time.perf_counter()
+    partials, rows = {}, 0
+    for partials, rows in stream_appointments(path, batch_rows):
+        pass
+    seconds = time.perf_counter() - start
+
+    counts = partials['status_count']
+    waste = int(_waste(counts))
+    by_month, by_dept = appointment_breakdowns(partials)
+    return {
+        'status_count': dict(zip(APPT_STATUSES, counts.tolist())),
+        'waste': waste,
+        'waste_pct': round(waste / counts.sum() * 100, 1) if counts.sum() else 0.0,
+        'wasted_doctor_hours': waste * SLOT_HOURS,
+        'by_month': by_month,
+        'by_department': by_dept,
+        'rows': rows,
+        'seconds': seconds,
+        'rows_per_sec': rows / seconds if seconds else float('inf'),
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Ringkas log appointment secara streaming")
+    parser.add_argument('path', help="File Parquet/CSV log appointment")
+    parser.add_argument('--batch-rows', type=int, default=BATCH_ROWS)
+    args = parser.parse_args()
+
+    summary = summarize_appointments(args.path, args.batch_rows)
+    for status, count in summary['status_count'].items():
+        print(f"{status:>12}: {count:,}")
+    print(f"{'Waste':>12}: {summary['waste']:,} ({summary['waste_pct']}%)")
+    print(f"{'Jam-dokter':>12}: {summary['wasted_doctor_hours']:,.0f} terbuang")
+    print()
+    print(summary['by_month'].to_string(index=False))
+    print()
+    print(summary['by_department'].to_string(index=False))
+    print()
+    print(f"{summary['rows']:,} baris dalam {summary['seconds']:.2f} s "
+          f"({summary['rows_per_sec']:,.0f} rows/sec)")
@@ -0,0 +1,292 @@
+# BENCHMARK HARNESS - REGRESI PERFORMA
+# Waktu load, agregasi, build figure, dan render headless setiap halaman/dimensi atas data sintetis
+#
+#   python benchmark.py --rows 5000000 --baseline bench_baseline.json --threshold 0.25
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+BENCH_DIR = Path(os.environ.get("HOSPITAL_BENCH_DIR", "bench_data"))
+BASELINE = Path(os.environ.get("HOSPITAL_BENCH_BASELINE", "bench_baseline.json"))
+# Tahap dianggap regresi jika lebih lambat dari baseline x (1 + THRESHOLD)...
+THRESHOLD = 0.25
+# ...dan selisihnya melebihi lantai noise ini (detik), supaya tahap milidetik tidak flaky
+MIN_SECONDS = 0.05
+RENDER_TIMEOUT = 600
+
+# Modul repo di-import di dalam fungsi: HOSPITAL_DATA_DIR & HOSPITAL_SNAPSHOT_DIR
+# harus sudah menunjuk ke data sintetis sebelum data_loader/snapshot dibaca.
+
+# ============================================================
+# STAGES
+# ============================================================
+
+def _clear_caches(data_dir):
+    """Hapus cache partial & store di data_dir serta cache Streamlit dalam proses"""
+    import streamlit as st
+    from partitions import CACHE_DIRNAME
+    from query_store import store_path
+
+    shutil.rmtree(Path(data_dir) / CACHE_DIRNAME, ignore_errors=True)
+    store_path(data_dir).unlink(missing_ok=True)
+    st.cache_data.clear()
+    st.cache_resource.clear()
+
+
+def pipeline_stages(data_dir, timings):
+    """Satu pass streaming: waktu baca+decode (load) dipisah dari reduksi ke partial
+    (aggregate), lalu build_frames dan semua builder figure"""
+    from data_loader import (APPT_COLUMNS, APPT_SOURCE, WAIT_COLUMNS, WAIT_SOURCE,
+                             appt_partials, build_frames, iter_records, merge_partials,
+                             source_files, wait_partials)
+
+    load = aggregate = 0.0
+    totals = {}
+    for source, columns, build in [(WAIT_SOURCE, WAIT_COLUMNS, wait_partials),
+                                   (APPT_SOURCE, APPT_COLUMNS, appt_partials)]:
+        for path in source_files(source, data_dir):
+            batches = iter_records(path, columns)
+            while True:
+                start = time.perf_counter()
+                batch = next(batches, None)
+                load += time.perf_counter() - start
+                if batch is None:
+                    break
+                start = time.perf_counter()
+                totals = merge_partials(totals, build(batch))
+                aggregate += time.perf_counter() - start
+    timings['load'] = load
+    timings['aggregate'] = aggregate
+
+    start = time.perf_counter()
+    frames = build_frames(totals)
+    timings['frames'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    figure_stages(frames, totals, timings)
+    timings['figures'] = time.perf_counter() - start
+
+
+def figure_stages(frames, totals, timings):
+    """Bangun setiap figure dashboard sekali (tanpa cache) -> figure:<nama>"""
+    import figures
+    from appointment_stream import appointment_breakdowns
+    from erlang import recommend_staffing
+
+    dept_df, hour_df, day_df, staff_df, triage_df, appt_df = frames
+    staff_per_dept, staff_reco, _ = recommend_staffing(dept_df, hour_df, cube=totals)
+    by_month, by_dept = appointment_breakdowns(totals)
+    productive = appt_df[appt_df['Status'] == 'Hadir']['Count'].sum()
+    waste = appt_df[appt_df['Status'] != 'Hadir']['Count'].sum()
+    builds = [
+        ('dept', figures.dept_chart, dept_df),
+        ('hour', figures.hour_chart, hour_df, staff_reco),
+        ('reco', figures.staffing_heatmap, staff_per_dept),
+        ('day', figures.day_chart, day_df),
+        ('vol', figures.volume_chart, day_df),
+        ('corr', figures.correlation_chart, staff_df),
+        ('triage', figures.triage_chart, triage_df),
+        ('pie', figures.triage_pie, triage_df),
+        ('appt', figures.appointment_donut, appt_df),
+        ('compare', figures.compare_chart, productive, waste),
+        ('month', figures.month_waste_chart, by_month),
+        ('dept_waste', figures.dept_waste_chart, by_dept),
+    ]
+    for name, build, *args in builds:
+        start = time.perf_counter()
+        build(*args).to_json()
+        timings[f'figure:{name}'] = time.perf_counter() - start
+
+
+def cold_stages(data_dir, timings):
+    """Refresh partisi, build store SQLite, fit forecast, sweep occupancy & model risiko
+    dari nol (jalur pertama kali dashboard dibuka)"""
+    from forecast import DemandForecast
+    from occupancy import slot_occupancy
+    from partitions import refresh
+    from query_store import ensure_store
+    from risk import no_show_risk
+    from rollups import DailyRollup
+
+    _clear_caches(data_dir)
+    start = time.perf_counter()
+    refresh(data_dir)
+    timings['refresh_cold'] = time.perf_counter() - start
+    start = time.perf_counter()
+    store = ensure_store(data_dir)
+    timings['store_build'] = time.perf_counter() - start
+    start = time.perf_counter()
+    rollup = DailyRollup()
+    rollup.sync(store)
+    DemandForecast().sync(rollup)
+    timings['forecast_fit'] = time.perf_counter() - start
+    start = time.perf_counter()
+    slot_occupancy(data_dir)
+    timings['occupancy'] = time.perf_counter() - start
+    start = time.perf_counter()
+    no_show_risk(data_dir)
+    timings['risk'] = time.perf_counter() - start
+
+
+def app_stages(data_dir, timings, timeout=RENDER_TIMEOUT):
+    """Render headless lewat AppTest: cold start (cache kosong), lalu setiap halaman & dimensi"""
+    from streamlit.testing.v1 import AppTest
+    from static_export import DASHBOARD, DIMENSION_SELECT, PAGE_RADIO, _widget
+
+    def run(at, name):
+        start = time.perf_counter()
+        at.run()
+        timings[name] = time.perf_counter() - start
+        if at.exception:
+            raise RuntimeError(f"{name} gagal: {at.exception[0].message}")
+        return at
+
+    _clear_caches(data_dir)
+    at = run(AppTest.from_file(str(DASHBOARD), default_timeout=timeout), 'app:cold_start')
+    home, detail = _widget(at.sidebar.radio, PAGE_RADIO).options[:2]
+    # Rerun hangat halaman utama (cache Streamlit terisi); widget dicari ulang setiap run
+    run(at, 'app:home')
+
+    _widget(at.sidebar.radio, PAGE_RADIO).set_value(detail)
+    run(at, 'app:detail')
+    # Nama tahap mengikuti nama file halaman static_export (detail-1 .. detail-N)
+    options = _widget(at.selectbox, DIMENSION_SELECT).options
+    for i, option in enumerate(options, 1):
+        _widget(at.selectbox, DIMENSION_SELECT).set_value(option)
+        run(at, f'app:detail-{i}')
+    _widget(at.sidebar.radio, PAGE_RADIO).set_value(home)
+    run(at, 'app:home_return')
+
+# ============================================================
+# RUN & COMPARE
+# ============================================================
+
+def _median(values):
+    values = sorted(values)
+    mid = len(values) // 2
+    return values[mid] if len(values) % 2 else (values[mid - 1] + values[mid]) / 2
+
+
+def run_benchmark(data_dir, repeat=3, app=True, timeout=RENDER_TIMEOUT):
+    """Median detik per tahap atas `repeat` putaran"""
+    runs = []
+    for _ in range(repeat):
+        timings = {}
+        pipeline_stages(data_dir, timings)
+        cold_stages(data_dir, timings)
+        if app:
+            app_stages(data_dir, timings, timeout)
+        runs.append(timings)
+    return {name: round(_median([t[name] for t in runs if name in t]), 6) for name in runs[0]}
+
+
+def environment():
+    import numpy as np
+    import pandas as pd
+    import plotly
+    import streamlit as st
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'plotly': plotly.__version__,
+        'streamlit': st.__version__,
+        'cpu_count': os.cpu_count(),
+        'machine': platform.machine(),
+    }
+
+
+def compare(result, baseline, threshold=THRESHOLD, min_seconds=MIN_SECONDS):
+    """[(tahap, baseline, sekarang)] untuk tahap yang melewati ambang regresi"""
+    if baseline['meta']['data'] != result['meta']['data']:
+        raise ValueError(f"Skala baseline {baseline['meta']['data']} berbeda dengan "
+                         f"run ini {result['meta']['data']}; jalankan ulang dengan --update-baseline")
+    regressed = []
+    for name, seconds in result['stages'].items():
+        before = baseline['stages'].get(name)
+        if before is None:
+            continue
+        if seconds > before * (1 + threshold) and seconds - before > min_seconds:
+            regressed.append((name, before, seconds))
+    return regressed
+
+
+def _write_json(path, payload):
+    path = Path(path)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(payload, indent=2, ensure_ascii=False))
+    os.replace(tmp, path)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark dashboard atas data sintetis")
+    parser.add_argument('--rows', type=int, default=5_000,
+                        help="Jumlah record wait-time sintetis (5k - 50M)")
+    parser.add_argument('--appt-rows', type=int, default=None)
+    parser.add_argument('--format', choices=['parquet', 'csv'], default='parquet')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--data-dir', default=None,
+                        help="Direktori data sintetis (default: HOSPITAL_BENCH_DIR/<rows>)")
+    parser.add_argument('--repeat', type=int, default=3, help="Putaran per tahap (median)")
+    parser.add_argument('--no-app', action='store_true', help="Lewati render headless AppTest")
+    parser.add_argument('--timeout', type=float, default=RENDER_TIMEOUT)
+    parser.add_argument('--baseline', default=str(BASELINE))
+    parser.add_argument('--update-baseline', action='store_true',
+                        help="Tulis hasil run ini sebagai baseline baru")
+    parser.add_argument('--threshold', type=float, default=THRESHOLD,
+                        help="Perlambatan relatif maksimum per tahap")
+    parser.add_argument('--min-seconds', type=float, default=MIN_SECONDS)
+    parser.add_argument('--output', default=None, help="Tulis hasil run ini ke file JSON")
+    args = parser.parse_args()
+
+    data_dir = Path(args.data_dir or BENCH_DIR / f"{args.rows}-{args.format}")
+    # Dashboard membaca data sintetis, dan tidak boleh memakai snapshot precompute lama
+    os.environ['HOSPITAL_DATA_DIR'] = str(data_dir)
+    os.environ['HOSPITAL_SNAPSHOT_DIR'] = tempfile.mkdtemp(prefix='bench-snapshots-')
+
+    from synthetic_data import generate
+
+    start = time.perf_counter()
+    data = generate(data_dir, args.rows, args.appt_rows, args.format, args.seed)
+    print(f"Data sintetis: {data['rows']:,} wait-time + {data['appt_rows']:,} appointment "
+          f"di {data_dir} ({time.perf_counter() - start:.1f} s)")
+
+    try:
+        stages = run_benchmark(data_dir, args.repeat, not args.no_app, args.timeout)
+    finally:
+        shutil.rmtree(os.environ['HOSPITAL_SNAPSHOT_DIR'], ignore_errors=True)
+    result = {
+        'meta': {'data': data, 'repeat': args.repeat, 'app': not args.no_app,
+                 'timestamp': datetime.now().isoformat(timespec='seconds'), **environment()},
+        'stages': stages,
+    }
+    for name, seconds in stages.items():
+        print(f"  {name:<40} {seconds:9.3f} s")
+    if args.output:
+        _write_json(args.output, result)
+
+    baseline_path = Path(args.baseline)
+    if args.update_baseline or not baseline_path.exists():
+        _write_json(baseline_path, result)
+        print(f"Baseline ditulis ke {baseline_path}")
+        sys.exit(0)
+
+    try:
+        regressed = compare(result, json.loads(baseline_path.read_text()),
+                            args.threshold, args.min_seconds)
+    except ValueError as exc:
+        raise SystemExit(str(exc))
+    if regressed:
+        print(f"REGRESI (> {args.threshold:.0%} vs {baseline_path}):")
+        for name, before, seconds in regressed:
+            print(f"  {name:<40} {before:9.3f} s -> {seconds:9.3f} s ({seconds / before - 1:+.0%})")
+        sys.exit(1)
+    print(f"Tidak ada regresi vs {baseline_path} (ambang {args.threshold:.0%})")
@@ -0,0 +1,58 @@
+# OLAP CUBE - ANALISIS DETAIL
+# Slice-and-dice cube sum/count dept × jam × hari × triage × dokter tanpa menyentuh record mentah
+
+import numpy as np
+
+from data_loader import (CUBE_SHAPE, DAYS, DEPARTMENTS, MAX_DOCTORS, N_HOURS,
+                         TRIAGE_CATEGORIES, build_frames)
+
+# Urutan sumbu sama dengan CUBE_SHAPE
+CUBE_DIMS = {
+    'Department': DEPARTMENTS,
+    'Hour': list(range(N_HOURS)),
+    'Day': DAYS,
+    'Triage': TRIAGE_CATEGORIES,
+    'Doctors': list(range(MAX_DOCTORS + 1)),
+}
+
+
+def axis_mask(dim, selected):
+    """Mask boolean satu sumbu; selected kosong/None = semua nilai"""
+    labels = CUBE_DIMS[dim]
+    if not selected:
+        return np.ones(len(labels), dtype=bool)
+    return np.isin(np.arange(len(labels)), [labels.index(v) for v in selected])
+
+
+def slice_cube(cube, filters):
+    """Nol-kan sel di luar filter {dim: [nilai, ...]}; bentuk cube tetap"""
+    for axis, dim in enumerate(CUBE_DIMS):
+        if filters.get(dim):
+            shape = [1] * len(CUBE_SHAPE)
+            shape[axis] = -1
+            cube = cube * axis_mask(dim, filters[dim]).reshape(shape)
+    return cube
+
+
+def query(partials, filters):
+    """Rata-rata wait & jumlah pasien untuk kombinasi filter apa pun"""
+    index = np.ix_(*(np.flatnonzero(axis_mask(dim, filters.get(dim))) for dim in CUBE_DIMS))
+    total = partials['cube_sum'][index].sum()
+    count = int(partials['cube_count'][index].sum())
+    return (total / count if count else float('nan')), count
+
+
+def filtered_frames(partials, filters):
+    """6 frame dashboard dari marginal cube yang sudah difilter (appt_df tidak terpengaruh)"""
+    sliced = {
+        **partials,
+        'cube_sum': slice_cube(partials['cube_sum'], filters),
+        'cube_count': slice_cube(partials['cube_count'], filters),
+    }
+    # Sketch tidak punya sumbu dokter: persentil hanya valid tanpa filter dokter
+    if 'wait_sketch' in partials:
+        if filters.get('Doctors'):
+            del sliced['wait_sketch']
+        else:
+            sliced['wait_sketch'] = slice_cube(partials['wait_sketch'], filters)
+    return build_frames(sliced)
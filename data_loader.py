@@ -0,0 +1,681 @@
+# DATA LOADER - RECORD LEVEL
+# Baca data mentah (Parquet/CSV) dan bangun 6 frame agregat dashboard
+
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from sketches import PERCENTILES, build_sketches, marginal_quantiles
+
+# ============================================================
+# SCHEMA
+# ============================================================
+
+DATA_DIR = Path(os.environ.get("HOSPITAL_DATA_DIR", "data"))
+
+WAIT_SOURCE = "wait_times"
+APPT_SOURCE = "appointments"
+# Appointment mendatang (belum ada status) untuk scoring risiko di risk.py
+BOOK_SOURCE = "appointment_book"
+
+DEPARTMENTS = ['Neurology', 'Internal Medicine', 'General Surgery',
+               'Orthopedics', 'Cardiology', 'Emergency', 'Oncology',
+               'Pediatrics', 'Obstetrics', 'Radiology']
+TRIAGE_CATEGORIES = ['Immediate', 'Emergency', 'Urgent', 'Semi-urgent', 'Non-urgent']
+DAYS = ['Senin', 'Selasa', 'Rabu', 'Kamis', 'Jumat', 'Sabtu', 'Minggu']
+APPT_STATUSES = ['Hadir', 'Dibatalkan', 'No-Show']
+N_HOURS = 24
+MAX_DOCTORS = 30
+
+# Target waktu tunggu standar (menit)
+TARGET_WAIT = 120
+
+# Periode data default (Jan-Mar 2024) untuk mengubah volume total jadi laju harian
+DEFAULT_DAYS = 91
+
+# Breakdown appointment per bulan: indeks bulan sejak MONTH_ORIGIN
+MONTH_ORIGIN = np.datetime64('2000-01', 'M')
+N_MONTHS = 600
+
+# Nomor hari untuk tanggal kosong/tidak terbaca (NaT): record-nya dibuang & dihitung
+NO_DATE = np.iinfo(np.int32).min
+# Alasan record dibuang, urut prioritas: record dihitung di alasan pertama yang berlaku
+# (partial wait_dropped / appt_dropped). Appointment tanpa departemen tidak dibuang: tetap
+# ikut total status, hanya tidak ikut breakdown per departemen.
+WAIT_DROP_REASONS = ['Visit_Date', 'Department', 'Triage_Category', 'Wait_Time']
+APPT_DROP_REASONS = ['Appointment_Date', 'Status']
+
+# Cube dept × jam × hari × triage × dokter-on-shift
+CUBE_SHAPE = (len(DEPARTMENTS), N_HOURS, len(DAYS), len(TRIAGE_CATEGORIES), MAX_DOCTORS + 1)
+
+# Label status di data mentah (bahasa Inggris) -> label dashboard
+STATUS_ALIASES = {
+    'Attended': 'Hadir', 'Completed': 'Hadir', 'Show': 'Hadir',
+    'Cancelled': 'Dibatalkan', 'Canceled': 'Dibatalkan',
+    'No Show': 'No-Show', 'No-show': 'No-Show', 'Noshow': 'No-Show',
+}
+
+# Hanya kolom ini yang dibaca (column pruning), dengan dtype eksplisit
+WAIT_COLUMNS = {
+    'Visit_Date': 'datetime64[ns]',
+    'Department': 'category',
+    'Arrival_Hour': 'int8',
+    'Triage_Category': 'category',
+    'Doctors_On_Shift': 'int8',
+    'Wait_Time': 'float32',
+}
+APPT_COLUMNS = {
+    'Appointment_Date': 'datetime64[ns]',
+    'Department': 'category',
+    'Status': 'category',
+}
+# Kolom jadwal appointment (opsional) untuk rekonstruksi slot dokter di occupancy.py
+APPT_SLOT_COLUMNS = {
+    'Department': 'category',
+    'Status': 'category',
+    'Doctor_ID': 'int32',
+    'Start_Time': 'datetime64[m]',
+    'End_Time': 'datetime64[m]',
+}
+# Kolom fitur risiko no-show/cancel (opsional); appointment book = kolom yang sama tanpa Status
+APPT_RISK_COLUMNS = {
+    'Appointment_Date': 'datetime64[ns]',
+    'Booking_Date': 'datetime64[ns]',
+    'Start_Time': 'datetime64[m]',
+    'Department': 'category',
+    'Patient_ID': 'int64',
+    'Status': 'category',
+}
+BOOK_RISK_COLUMNS = {c: t for c, t in APPT_RISK_COLUMNS.items() if c != 'Status'}
+
+# Tabel kategori bersama: kolom kategorikal -> (vocab, alias). Kode int8 = indeks vocab.
+CATEGORY_TABLES = {
+    'Department': (DEPARTMENTS, None),
+    'Triage_Category': (TRIAGE_CATEGORIES, None),
+    'Status': (APPT_STATUSES, STATUS_ALIASES),
+}
+
+# Ukuran batch default untuk pembacaan streaming (memori puncak ~ satu batch)
+BATCH_ROWS = 1_000_000
+# Potongan decode Parquet -> kode (buffer Arrow ~ potongan ini, bukan satu batch penuh)
+DECODE_ROWS = 65_536
+
+# Worker pool untuk loading paralel (1 = berurutan). Default dibatasi supaya server
+# dashboard tidak memakai semua core host; CLI bisa menaikkannya lewat --workers.
+MAX_DEFAULT_WORKERS = 4
+LOAD_WORKERS = int(os.environ.get("HOSPITAL_LOAD_WORKERS",
+                                  min(os.cpu_count() or 1, MAX_DEFAULT_WORKERS)))
+# Jenis pool: 'thread' (default; aman di dalam server Streamlit karena tidak fork, dan Arrow,
+# NumPy & zlib melepas GIL) atau 'process' (CLI batch seperti precompute.py, lihat set_load_pool)
+POOL_KINDS = ('thread', 'process')
+LOAD_POOL = os.environ.get("HOSPITAL_LOAD_POOL", "thread")
+
+# ============================================================
+# READING
+# ============================================================
+
+def find_source(name, data_dir=None):
+    """Cari file sumber: Parquet diutamakan, CSV sebagai fallback"""
+    data_dir = Path(data_dir) if data_dir is not None else DATA_DIR
+    for suffix in ('.parquet', '.csv'):
+        path = data_dir / f"{name}{suffix}"
+        if path.exists():
+            return path
+    return None
+
+
+def source_files(name, data_dir=None):
+    """File satu sumber: partisi harian <name>/date=YYYY-MM-DD.* jika ada, selain itu file tunggal"""
+    data_dir = Path(data_dir) if data_dir is not None else DATA_DIR
+    partition_dir = data_dir / name
+    if partition_dir.is_dir():
+        files = sorted(path for path in partition_dir.glob('date=*')
+                       if path.suffix in ('.parquet', '.csv'))
+        if files:
+            return files
+    return [path for path in [find_source(name, data_dir)] if path is not None]
+
+
+def file_columns(path):
+    """Nama kolom file sumber tanpa membaca datanya"""
+    path = Path(path)
+    if path.suffix == '.parquet':
+        import pyarrow.parquet as pq
+        return pq.read_schema(path).names
+    return list(pd.read_csv(path, nrows=0).columns)
+
+
+def has_raw_data(data_dir=None):
+    return bool(source_files(WAIT_SOURCE, data_dir)) and bool(source_files(APPT_SOURCE, data_dir))
+
+
+class CodedRecords:
+    """Kolom record sebagai array numpy ringkas, tanpa DataFrame:
+    kategori -> kode int8 terhadap tabel kategori bersama (CATEGORY_TABLES),
+    tanggal -> int32 nomor hari sejak 1970-01-01 (datetime64[m]: int64 menit),
+    numerik -> dtype kecil dari schema.
+    Kode -1 = kategori kosong, NO_DATE = tanggal kosong."""
+
+    def __init__(self, columns):
+        self.columns = columns
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def __len__(self):
+        return len(next(iter(self.columns.values()), ()))
+
+    @property
+    def nbytes(self):
+        return sum(values.nbytes for values in self.columns.values())
+
+    @classmethod
+    def concat(cls, batches):
+        return cls({name: np.concatenate([b[name] for b in batches])
+                    for name in batches[0].columns})
+
+
+def _numeric(name, values, dtype):
+    """Kolom numerik ke dtype schema; nilai kosong di kolom integer ditolak"""
+    if values.dtype.kind == 'f' and np.dtype(dtype).kind in 'iu' and np.isnan(values).any():
+        raise ValueError(f"Kolom {name} berisi nilai kosong")
+    return values.astype(dtype, copy=False)
+
+
+def _arrow_codes(name, array):
+    """Kode int8 langsung dari indeks dictionary Arrow (tanpa materialisasi string)"""
+    import pyarrow as pa
+    if not pa.types.is_dictionary(array.type):
+        array = array.dictionary_encode()
+    lut = _lookup(array.dictionary.to_pylist(), *CATEGORY_TABLES[name])
+    return lut[array.indices.fill_null(len(lut) - 1).to_numpy()]
+
+
+def _code_batch(batch, columns):
+    """RecordBatch Arrow -> CodedRecords"""
+    coded = {}
+    for name, dtype in columns.items():
+        array = batch.column(name)
+        if dtype == 'category':
+            coded[name] = _arrow_codes(name, array)
+        elif dtype == 'datetime64[m]':
+            coded[name] = minute_codes(array.to_numpy(zero_copy_only=False))
+        elif dtype.startswith('datetime'):
+            coded[name] = date_codes(array.to_numpy(zero_copy_only=False))
+        else:
+            coded[name] = _numeric(name, array.to_numpy(zero_copy_only=False), dtype)
+    return CodedRecords(coded)
+
+
+def _code_frame(df, columns):
+    """DataFrame (chunk CSV) -> CodedRecords"""
+    coded = {}
+    for name, dtype in columns.items():
+        if dtype == 'category':
+            coded[name] = encode(df[name], *CATEGORY_TABLES[name])
+        elif dtype == 'datetime64[m]':
+            coded[name] = minute_codes(df[name])
+        elif dtype.startswith('datetime'):
+            coded[name] = date_codes(df[name])
+        else:
+            coded[name] = df[name].to_numpy(dtype)
+    return CodedRecords(coded)
+
+
+def record_slices(path, batch_rows=BATCH_ROWS):
+    """Potongan file yang bisa diproses independen: kelompok row group Parquet
+    (~batch_rows baris per potongan); CSV dibaca utuh sebagai satu potongan (None)"""
+    path = Path(path)
+    if path.suffix != '.parquet':
+        return [None]
+    import pyarrow.parquet as pq
+    metadata = pq.ParquetFile(path).metadata
+    slices, group, rows = [], [], 0
+    for i in range(metadata.num_row_groups):
+        group.append(i)
+        rows += metadata.row_group(i).num_rows
+        if rows >= batch_rows:
+            slices.append(tuple(group))
+            group, rows = [], 0
+    if group or not slices:
+        slices.append(tuple(group))
+    return slices
+
+
+def iter_records(path, columns, batch_rows=BATCH_ROWS, row_groups=None):
+    """Generator batch CodedRecords berukuran tetap: memori tidak bergantung ukuran file.
+    row_groups membatasi pembacaan Parquet ke potongan dari record_slices."""
+    path = Path(path)
+    names = list(columns)
+    categorical = [c for c, t in columns.items() if t == 'category']
+    if path.suffix == '.parquet':
+        import pyarrow.parquet as pq
+        reader = pq.ParquetFile(path, read_dictionary=categorical, pre_buffer=False,
+                                buffer_size=1 << 20)
+        # Decode Arrow dalam potongan kecil, kumpulkan kodenya sampai batch_rows:
+        # buffer Arrow tetap kecil sementara agregasi tetap bervektor besar
+        pieces, rows = [], 0
+        for batch in reader.iter_batches(batch_size=min(DECODE_ROWS, batch_rows),
+                                         row_groups=row_groups, columns=names):
+            pieces.append(_code_batch(batch, columns))
+            rows += batch.num_rows
+            if rows >= batch_rows:
+                yield CodedRecords.concat(pieces)
+                pieces, rows = [], 0
+        if pieces:
+            yield CodedRecords.concat(pieces)
+    else:
+        dates = [c for c, t in columns.items() if t.startswith('datetime')]
+        dtypes = {c: t for c, t in columns.items() if c not in dates}
+        for chunk in pd.read_csv(path, usecols=names, dtype=dtypes, parse_dates=dates,
+                                 chunksize=batch_rows):
+            yield _code_frame(chunk, columns)
+
+# ============================================================
+# ENCODING
+# ============================================================
+
+def _lookup(labels, vocab, aliases=None):
+    """Tabel kode int8 label -> indeks vocab, dengan slot terakhir -1 untuk kosong"""
+    labels = [aliases.get(c, c) if aliases else c for c in labels]
+    unknown = sorted(set(labels) - set(vocab))
+    if unknown:
+        raise ValueError(f"Nilai tidak dikenal: {unknown}")
+    return np.array([vocab.index(label) for label in labels] + [-1], dtype=np.int8)
+
+
+def encode(values, vocab, aliases=None):
+    """Ubah kolom kategorikal jadi kode int8 sesuai urutan vocab"""
+    cat = pd.Categorical(values)
+    # Kode -1 (missing) jatuh ke elemen terakhir lut
+    return _lookup(cat.categories, vocab, aliases)[cat.codes]
+
+
+def date_codes(dates):
+    """Nomor hari sejak 1970-01-01 (int32; NaT = NO_DATE)"""
+    days = np.asarray(dates).astype('datetime64[D]')
+    codes = days.view(np.int64).astype(np.int32)
+    codes[np.isnat(days)] = NO_DATE
+    return codes
+
+
+def minute_codes(dates):
+    """Nomor menit sejak 1970-01-01 00:00 (int64; NaT = nilai int64 terkecil)"""
+    return np.asarray(dates).astype('datetime64[m]').view(np.int64)
+
+
+def weekday_codes(dates):
+    """Senin=0 ... Minggu=6 langsung dari datetime64 (1970-01-01 = Kamis)"""
+    return ((date_codes(dates) + 3) % 7).astype(np.int8)
+
+# ============================================================
+# AGGREGATION
+# ============================================================
+
+def drop_counts(missing):
+    """Jumlah record per alasan dibuang (alasan pertama yang berlaku) dari mask per alasan"""
+    missing = np.stack(missing)
+    dropped = missing.any(axis=0)
+    return np.bincount(np.argmax(missing[:, dropped], axis=0),
+                       minlength=len(missing)).astype(np.int64)
+
+
+def wait_missing(records):
+    """Mask per WAIT_DROP_REASONS: tanggal, departemen, triage kosong; Wait_Time non-finite"""
+    return [records['Visit_Date'] == NO_DATE, records['Department'] < 0,
+            records['Triage_Category'] < 0, ~np.isfinite(records['Wait_Time'])]
+
+
+def wait_codes(records):
+    """Kode int per dimensi cube, wait time (float32), dan nomor hari dari CodedRecords;
+    record dengan kategori atau tanggal kosong dibuang, begitu juga Wait_Time non-finite
+    (sama seperti sketch, lihat sketches.build_sketches). Jumlahnya: wait_partials."""
+    wait = records['Wait_Time']
+    dept = records['Department']
+    triage = records['Triage_Category']
+    hour = records['Arrival_Hour']
+    doctors = records['Doctors_On_Shift']
+    date = records['Visit_Date']
+    day = ((date + 3) % 7).astype(np.int8)
+
+    if len(hour) and (hour.min() < 0 or hour.max() >= N_HOURS):
+        raise ValueError("Arrival_Hour harus di rentang 0-23")
+    if len(doctors) and (doctors.min() < 0 or doctors.max() > MAX_DOCTORS):
+        raise ValueError(f"Doctors_On_Shift harus di rentang 0-{MAX_DOCTORS}")
+
+    codes = (dept, hour, day, triage, doctors)
+    missing = np.logical_or.reduce(wait_missing(records))
+    if missing.any():
+        valid = ~missing
+        codes = tuple(c[valid] for c in codes)
+        wait = wait[valid]
+        date = date[valid]
+    return codes, wait, date
+
+
+def cube_cells(codes):
+    """Indeks sel flat (row-major CUBE_SHAPE) dari kode per dimensi"""
+    cell = np.zeros(len(codes[0]), dtype=np.int32)
+    for c, n in zip(codes, CUBE_SHAPE):
+        cell *= n
+        cell += c
+    return cell
+
+
+def wait_partials(records):
+    """Cube sum & count + sketch persentil wait time dalam satu pass (bincount atas indeks sel).
+    wait_dropped = jumlah record dibuang per WAIT_DROP_REASONS; staff_wait_sq = jumlah kuadrat
+    wait per dokter-on-shift (untuk simpangan baku & korelasi record-level)."""
+    codes, wait, _ = wait_codes(records)
+    cell = cube_cells(codes)
+    size = int(np.prod(CUBE_SHAPE))
+    # Sketch per dept × jam × hari × triage: dokter adalah sumbu terakhir cube
+    sketch_shape = CUBE_SHAPE[:-1]
+    sketch = build_sketches(cell // CUBE_SHAPE[-1], int(np.prod(sketch_shape)), wait)
+    return {
+        'cube_sum': np.bincount(cell, weights=wait, minlength=size).reshape(CUBE_SHAPE),
+        'cube_count': np.bincount(cell, minlength=size).reshape(CUBE_SHAPE),
+        'wait_sketch': sketch.reshape(sketch_shape + (-1,)),
+        'staff_wait_sq': np.bincount(codes[4], weights=np.square(wait, dtype=np.float64),
+                                     minlength=MAX_DOCTORS + 1),
+        'wait_dropped': drop_counts(wait_missing(records)),
+    }
+
+
+def cube_marginals(cube_sum, cube_count):
+    """Sum & count per dimensi (marginal cube) untuk frame 1-D"""
+    def marginal(cube, axis):
+        return cube.sum(axis=tuple(i for i in range(cube.ndim) if i != axis))
+
+    doctors = np.arange(MAX_DOCTORS + 1, dtype=np.float64)
+    return {
+        'dept_sum': marginal(cube_sum, 0),
+        'dept_count': marginal(cube_count, 0),
+        'hour_sum': marginal(cube_sum, 1),
+        'hour_count': marginal(cube_count, 1),
+        'hour_staff_sum': marginal(cube_count * doctors, 1),
+        'day_sum': marginal(cube_sum, 2),
+        'day_count': marginal(cube_count, 2),
+        'triage_sum': marginal(cube_sum, 3),
+        'triage_count': marginal(cube_count, 3),
+        'staff_sum': marginal(cube_sum, 4),
+        'staff_count': marginal(cube_count, 4),
+    }
+
+
+def month_codes(dates):
+    """Indeks bulan sejak MONTH_ORIGIN (datetime64 atau int32 nomor hari)"""
+    dates = np.asarray(dates)
+    if dates.dtype.kind in 'iu':
+        dates = dates.astype('datetime64[D]')
+    months = dates.astype('datetime64[M]') - MONTH_ORIGIN
+    months = months.astype(np.int64)
+    if len(months) and (months.min() < 0 or months.max() >= N_MONTHS):
+        raise ValueError(f"Appointment_Date di luar rentang {MONTH_ORIGIN} + {N_MONTHS} bulan")
+    return months
+
+
+def appt_partials(records):
+    """Jumlah status appointment total, per departemen, dan per bulan; appointment tanpa
+    tanggal atau status dibuang dan dihitung per APPT_DROP_REASONS di appt_dropped"""
+    n_status = len(APPT_STATUSES)
+    dated = records['Appointment_Date'] != NO_DATE
+    status = records['Status'][dated].astype(np.int64)
+    dept = records['Department'][dated].astype(np.int64)
+    month = month_codes(records['Appointment_Date'][dated])
+
+    valid = status >= 0
+    by_dept = valid & (dept >= 0)
+    return {
+        'status_count': np.bincount(status[valid], minlength=n_status),
+        'dept_status': np.bincount(dept[by_dept] * n_status + status[by_dept],
+                                   minlength=len(DEPARTMENTS) * n_status
+                                   ).reshape(len(DEPARTMENTS), n_status),
+        'month_status': np.bincount(month[valid] * n_status + status[valid],
+                                    minlength=N_MONTHS * n_status).reshape(N_MONTHS, n_status),
+        'appt_dropped': drop_counts([~dated, records['Status'] < 0]),
+    }
+
+
+def merge_partials(total, partials, sign=1):
+    """Tambah (sign=1) atau kurangkan (sign=-1) partial aggregates ke total"""
+    merged = dict(total)
+    for key, values in partials.items():
+        merged[key] = merged[key] + sign * values if key in merged else sign * values
+    return merged
+
+
+def slice_partials(path, row_groups, columns, build, batch_rows=BATCH_ROWS):
+    """Partial aggregates satu potongan file, dibangun batch demi batch lalu di-merge"""
+    total = {}
+    for batch in iter_records(path, columns, batch_rows, row_groups):
+        total = merge_partials(total, build(batch))
+    return total
+
+
+def stream_partials(path, columns, build, batch_rows=BATCH_ROWS, workers=1):
+    """Partial aggregates satu file: potongan diproses (paralel) lalu di-merge berurutan"""
+    jobs = [(path, row_groups, columns, build, batch_rows)
+            for row_groups in record_slices(path, batch_rows)]
+    total = {}
+    for partials in parallel_map(slice_partials, jobs, workers):
+        total = merge_partials(total, partials)
+    return total
+
+
+def _mean(total, count):
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.round(total / count, 1)
+
+
+def _percentage(count):
+    total = count.sum()
+    return np.round(count / total * 100, 1) if total else np.zeros(len(count))
+
+
+def _percentile_columns(partials, axis, seen):
+    """Kolom P50/P90/P95 dari sketch; kosong jika sketch tidak tersedia"""
+    if 'wait_sketch' not in partials:
+        return {}
+    values = marginal_quantiles(partials['wait_sketch'], axis)[seen]
+    return {name: np.round(values[:, i], 1) for i, name in enumerate(PERCENTILES)}
+
+
+def _std_column(partials, seen):
+    """Kolom Wait_Std per dokter-on-shift dari jumlah kuadrat; kosong jika tidak tersedia
+    (store & cube tidak menyimpan kuadrat)"""
+    if 'staff_wait_sq' not in partials:
+        return {}
+    count = partials['cube_count'].sum(axis=(0, 1, 2, 3))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = partials['cube_sum'].sum(axis=(0, 1, 2, 3)) / count
+        var = partials['staff_wait_sq'] / count - mean ** 2
+    return {'Wait_Std': np.round(np.sqrt(np.maximum(var, 0)), 1)[seen]}
+
+
+def build_frames(partials):
+    """Bangun dept_df, hour_df, day_df, staff_df, triage_df, appt_df dari partial aggregates"""
+    p = {**cube_marginals(partials['cube_sum'], partials['cube_count']),
+         'status_count': partials['status_count']}
+
+    seen = p['dept_count'] > 0
+    dept_df = pd.DataFrame({
+        'Department': np.array(DEPARTMENTS)[seen],
+        'Avg_Wait': _mean(p['dept_sum'], p['dept_count'])[seen],
+        'Total_Patients': p['dept_count'][seen],
+        **_percentile_columns(partials, 0, seen),
+    }).sort_values('Avg_Wait', ascending=False, ignore_index=True)
+
+    seen = p['hour_count'] > 0
+    hour_df = pd.DataFrame({
+        'Hour': np.arange(N_HOURS)[seen],
+        'Wait_Time': _mean(p['hour_sum'], p['hour_count'])[seen],
+        'Volume': p['hour_count'][seen],
+        'Staff': _mean(p['hour_staff_sum'], p['hour_count'])[seen],
+        **_percentile_columns(partials, 1, seen),
+    })
+
+    seen = p['day_count'] > 0
+    day_df = pd.DataFrame({
+        'Day': np.array(DAYS)[seen],
+        'Wait_Time': _mean(p['day_sum'], p['day_count'])[seen],
+        'Volume': p['day_count'][seen],
+        **_percentile_columns(partials, 2, seen),
+    })
+
+    seen = p['staff_count'] > 0
+    staff_df = pd.DataFrame({
+        'Doctors': np.arange(MAX_DOCTORS + 1)[seen],
+        'Wait_Time': _mean(p['staff_sum'], p['staff_count'])[seen],
+        'Patients': p['staff_count'][seen],
+        **_std_column(partials, seen),
+    })
+
+    triage_df = pd.DataFrame({
+        'Category': TRIAGE_CATEGORIES,
+        'Wait_Time': _mean(p['triage_sum'], p['triage_count']),
+        'Count': p['triage_count'],
+        'Percentage': _percentage(p['triage_count']),
+        **_percentile_columns(partials, 3, slice(None)),
+    })
+
+    appt_df = pd.DataFrame({
+        'Status': APPT_STATUSES,
+        'Count': p['status_count'],
+        'Percentage': _percentage(p['status_count']),
+    })
+
+    return dept_df, hour_df, day_df, staff_df, triage_df, appt_df
+
+
+def load_raw_frames(data_dir=None, workers=LOAD_WORKERS):
+    """Baca record mentah wait-time & appointment lalu agregasi ke 6 frame.
+    Potongan kedua sumber berjalan bersamaan di satu pool."""
+    jobs = [(path, row_groups, columns, build)
+            for source, columns, build in [(WAIT_SOURCE, WAIT_COLUMNS, wait_partials),
+                                           (APPT_SOURCE, APPT_COLUMNS, appt_partials)]
+            for path in source_files(source, data_dir)
+            for row_groups in record_slices(path)]
+    partials = {}
+    for part in parallel_map(slice_partials, jobs, workers):
+        partials = merge_partials(partials, part)
+    return build_frames(partials)
+
+# ============================================================
+# PARALLEL LOADING
+# ============================================================
+
+def _job_label(job):
+    """Nama potongan untuk pesan error: file + row group"""
+    path, row_groups = Path(job[0]), job[1]
+    if not row_groups:
+        return path.name
+    return f"{path.name} (row group {row_groups[0]}-{row_groups[-1]})"
+
+
+def _failed(job, exc):
+    return RuntimeError(f"Gagal memproses {_job_label(job)}: {type(exc).__name__}: {exc}")
+
+
+def set_load_pool(kind):
+    """Pilih jenis pool (POOL_KINDS) untuk parallel_map & pool_executor di proses ini"""
+    global LOAD_POOL
+    if kind not in POOL_KINDS:
+        raise ValueError(f"Jenis pool tidak dikenal: {kind} (pilihan: {', '.join(POOL_KINDS)})")
+    LOAD_POOL = kind
+
+
+def pool_executor(workers):
+    """Executor dengan `workers` worker sesuai LOAD_POOL"""
+    if LOAD_POOL == 'process':
+        return ProcessPoolExecutor(max_workers=workers)
+    return ThreadPoolExecutor(max_workers=workers)
+
+
+def parallel_map(fn, jobs, workers=LOAD_WORKERS):
+    """Generator fn(*job) untuk setiap job (path, row_groups, ...) dalam urutan jobs.
+
+    Dengan workers > 1 job dijalankan di pool_executor dengan paling banyak 2x workers
+    hasil tertunda (memori terbatas). Hasil selalu dikembalikan sesuai urutan jobs,
+    sehingga merge identik dengan jalur berurutan berapa pun jumlah worker. Error
+    worker dilempar ulang sebagai RuntimeError yang menyebut file & row group-nya;
+    job yang belum berjalan dibatalkan.
+    """
+    jobs = list(jobs)
+    if workers <= 1 or len(jobs) <= 1:
+        for job in jobs:
+            try:
+                result = fn(*job)
+            except Exception as exc:
+                raise _failed(job, exc) from exc
+            yield result
+        return
+
+    def collect(job, future):
+        try:
+            return future.result()
+        except Exception as exc:
+            raise _failed(job, exc) from exc
+
+    pool = pool_executor(min(workers, len(jobs)))
+    try:
+        pending = deque()
+        for job in jobs:
+            pending.append((job, pool.submit(fn, *job)))
+            if len(pending) >= 2 * workers:
+                yield collect(*pending.popleft())
+        while pending:
+            yield collect(*pending.popleft())
+    finally:
+        pool.shutdown(cancel_futures=True)
+
+# ============================================================
+# BUILT-IN SUMMARY (tanpa data mentah)
+# ============================================================
+
+def builtin_frames():
+    """Hasil analisis PySpark (Jan-Mar 2024) untuk dipakai saat data mentah tidak tersedia"""
+
+    dept_df = pd.DataFrame({
+        'Department': DEPARTMENTS,
+        'Avg_Wait': [165, 161, 161, 155, 153, 149, 149, 146, 146, 138],
+        'Total_Patients': [498, 504, 506, 492, 483, 485, 528, 526, 480, 489]
+    })
+
+    hour_df = pd.DataFrame({
+        'Hour': list(range(7, 18)),
+        'Wait_Time': [151, 150, 155, 150, 152, 153, 149, 152, 153, 156, 151],
+        'Volume': [157, 575, 535, 550, 545, 578, 564, 542, 562, 377, 106],
+        'Staff': [4.9, 5.0, 5.1, 4.9, 4.9, 4.9, 5.0, 4.9, 5.0, 5.0, 5.3]
+    })
+
+    day_df = pd.DataFrame({
+        'Day': DAYS,
+        'Wait_Time': [155, 151, 153, 151, 148, 152, 154],
+        'Volume': [715, 757, 691, 655, 710, 741, 722]
+    })
+
+    staff_df = pd.DataFrame({
+        'Doctors': [2, 3, 4, 5, 6, 7],
+        'Wait_Time': [146.8, 152.7, 152.2, 152.1, 153.5, 154.9],
+        'Patients': [112, 731, 1488, 1806, 700, 154]
+    })
+
+    triage_df = pd.DataFrame({
+        'Category': TRIAGE_CATEGORIES,
+        'Wait_Time': [107, 110, 129, 149, 175],
+        'Count': [93, 399, 958, 1477, 2064],
+        'Percentage': [1.9, 8.0, 19.2, 29.6, 41.4]
+    })
+
+    appt_df = pd.DataFrame({
+        'Status': ['Hadir', 'Dibatalkan', 'No-Show'],
+        'Count': [86032, 18254, 6615],
+        'Percentage': [77.2, 16.4, 5.9]
+    })
+
+    return dept_df, hour_df, day_df, staff_df, triage_df, appt_df
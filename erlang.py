@@ -0,0 +1,123 @@
+# ERLANG-C STAFFING OPTIMIZER
+# Jumlah dokter minimum per jam × departemen untuk target waktu tunggu (model M/M/c)
+
+import numpy as np
+import pandas as pd
+
+from data_loader import DEFAULT_DAYS, DEPARTMENTS, MAX_DOCTORS, N_HOURS, TARGET_WAIT
+
+
+def estimate_service_minutes(hour_df, days=DEFAULT_DAYS, candidates=200):
+    """Estimasi durasi layanan yang membuat model M/M/c konsisten dengan data: rata-rata wait
+    prediksi per jam (Staff & Volume teramati) sama dengan rata-rata wait teramati.
+
+    Batas atasnya asumsi dokter selalu sibuk (menit-dokter tersedia / pasien dilayani);
+    batas itu dipakai jika rata-rata wait teramati tidak tersedia.
+    """
+    volume = hour_df['Volume'].to_numpy(np.float64)
+    saturated = float((hour_df['Staff'] * 60 * days).sum() / volume.sum())
+    observed = np.average(hour_df['Wait_Time'], weights=volume)
+    if not np.isfinite(observed):
+        return saturated
+
+    # Wait prediksi naik monoton terhadap durasi layanan: ambil kandidat pertama yang mencapai
+    # rata-rata teramati (di batas jenuh beberapa jam sudah tidak stabil -> wait tak hingga)
+    staff = np.clip(hour_df['Staff'].round().to_numpy(int), 1, MAX_DOCTORS)[:, None]
+    rates = volume / days
+    for service_minutes in np.geomspace(saturated / 100, saturated, candidates):
+        wq, _ = staffing_grid(rates, service_minutes)
+        predicted = np.take_along_axis(wq, staff - 1, axis=-1)[:, 0]
+        if np.average(predicted, weights=volume) >= observed:
+            return float(service_minutes)
+    return saturated
+
+
+def arrival_rates(dept_df, hour_df, days=DEFAULT_DAYS, cube=None):
+    """Laju kedatangan per jam (pasien/jam) dalam grid departemen × jam (0-23).
+
+    Dengan cube: hitungan record per sel. Tanpa cube: total per departemen
+    dibagi mengikuti profil volume per jam.
+    """
+    if cube is not None:
+        counts = cube['cube_count'].sum(axis=(2, 3, 4))
+    else:
+        hourly = np.zeros(N_HOURS)
+        hourly[hour_df['Hour'].to_numpy()] = hour_df['Volume'].to_numpy()
+        per_dept = (dept_df.set_index('Department')['Total_Patients']
+                    .reindex(DEPARTMENTS).fillna(0).to_numpy(np.float64))
+        counts = np.outer(per_dept, hourly / hourly.sum())
+    return counts / days
+
+
+def erlang_c(load, servers):
+    """Probabilitas pasien harus menunggu (Erlang C), broadcast atas load & servers.
+
+    load: beban (Erlang) berbentuk (...), servers: 1..C. Hasil (..., C);
+    bernilai 1 jika sistem tidak stabil (load >= servers).
+    """
+    load = np.asarray(load, dtype=np.float64)[..., None]
+    c = np.asarray(servers, dtype=np.float64)
+    k = np.arange(1, int(c.max()) + 1, dtype=np.float64)
+    # a^k / k! untuk k = 0..C lewat cumprod (tanpa loop per sel)
+    terms = np.concatenate([np.ones(load.shape), np.cumprod(load / k, axis=-1)], axis=-1)
+    partial = np.cumsum(terms, axis=-1)  # sum_{k<=n} a^k/k!
+    index = c.astype(int)
+    top = terms[..., index] * c / np.maximum(c - load, 1e-12)
+    prob = top / (partial[..., index - 1] + top)
+    return np.where(load < c, prob, 1.0)
+
+
+def staffing_grid(rates, service_minutes, max_doctors=MAX_DOCTORS):
+    """Expected wait (menit) untuk setiap sel × kandidat dokter 1..max_doctors"""
+    servers = np.arange(1, max_doctors + 1)
+    mu = 1.0 / service_minutes              # pasien per menit per dokter
+    lam = np.asarray(rates, dtype=np.float64) / 60.0
+    load = lam / mu
+    p_wait = erlang_c(load, servers)
+    with np.errstate(divide='ignore'):
+        wq = p_wait / (servers * mu - lam[..., None])
+    return np.where(load[..., None] < servers, wq, np.inf), p_wait
+
+
+def min_doctors(rates, service_minutes, target=TARGET_WAIT, service_level=None,
+                max_doctors=MAX_DOCTORS):
+    """Dokter minimum per sel agar rata-rata wait <= target.
+
+    Dengan service_level (mis. 0.8) kriterianya P(wait <= target) >= service_level.
+    Sel tanpa kedatangan -> 0, sel yang tidak terpenuhi dengan max_doctors -> NaN.
+    """
+    rates = np.asarray(rates, dtype=np.float64)
+    servers = np.arange(1, max_doctors + 1)
+    wq, p_wait = staffing_grid(rates, service_minutes, max_doctors)
+    if service_level is None:
+        ok = wq <= target
+    else:
+        lam = rates[..., None] / 60.0
+        decay = np.clip(servers / service_minutes - lam, 0, None)
+        ok = (1 - p_wait * np.exp(-decay * target) >= service_level) & np.isfinite(wq)
+    first = np.argmax(ok, axis=-1)
+    needed = np.where(ok.any(axis=-1), servers[first], np.nan)
+    return np.where(rates > 0, needed, 0.0)
+
+
+def recommend_staffing(dept_df, hour_df, days=DEFAULT_DAYS, cube=None,
+                       target=TARGET_WAIT, service_minutes=None):
+    """Rekomendasi dokter per departemen × jam, plus per jam untuk jam di hour_df.
+
+    'Recommended' memakai satu antrian gabungan (dokter bisa melayani semua
+    departemen, sebanding dengan kolom Staff); 'Recommended_Per_Dept' adalah
+    jumlah kebutuhan jika tiap departemen punya antrian sendiri.
+    """
+    if service_minutes is None:
+        service_minutes = estimate_service_minutes(hour_df, days)
+    rates = arrival_rates(dept_df, hour_df, days, cube)
+    # Grid departemen dan antrian gabungan dievaluasi sebagai satu array
+    needed = min_doctors(np.vstack([rates, rates.sum(axis=0)]), service_minutes, target)
+    hours = hour_df['Hour'].to_numpy()
+    per_cell = pd.DataFrame(needed[:-1, hours], index=DEPARTMENTS, columns=hours)
+    total = pd.DataFrame({
+        'Hour': hours,
+        'Recommended': needed[-1, hours],
+        'Recommended_Per_Dept': per_cell.sum(axis=0, min_count=1).to_numpy(),
+    })
+    return per_cell, total, service_minutes
@@ -0,0 +1,392 @@
+# FIGURE LAYER - BUILDER & CACHE
+# Builder Plotly per chart dashboard dan cache LRU bersama antar sesi (versi data, view, filter)
+
+import os
+import threading
+from collections import OrderedDict
+
+import plotly.express as px
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+from appointment_stream import WASTE_STATUSES
+from data_loader import TARGET_WAIT
+
+FIGURE_CACHE_SIZE = int(os.environ.get("HOSPITAL_FIGURE_CACHE", 256))
+
+# Kolom frame occupancy (occupancy.occupancy_frames) dan warnanya
+SLOT_STATES = ['Produktif', 'Terbuang_Bersih', 'Backfill', 'Idle']
+SLOT_COLORS = {'Produktif': '#10b981', 'Terbuang_Bersih': '#dc2626',
+               'Backfill': '#f59e0b', 'Idle': '#9ca3af'}
+
+PERCENTILE_MARKERS = {
+    'P50': dict(symbol='circle', color='#1e3a8a'),
+    'P90': dict(symbol='diamond', color='#f59e0b'),
+    'P95': dict(symbol='x', color='#dc2626'),
+}
+
+# ============================================================
+# FIGURE CACHE
+# ============================================================
+
+class FigureCache:
+    """Cache LRU figure siap kirim, dibagi ke semua sesi dalam proses.
+
+    Figure disimpan sebagai objek go.Figure yang sudah tervalidasi:
+    st.plotly_chart hanya perlu to_dict + to_json, sedangkan spec dict/JSON
+    akan divalidasi ulang oleh Plotly di setiap rerun.
+    """
+
+    def __init__(self, maxsize=FIGURE_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, build):
+        """Figure untuk `key`; panggil build() hanya saat miss"""
+        with self.lock:
+            fig = self.entries.get(key)
+            if fig is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return fig
+            self.misses += 1
+        # Build di luar lock supaya chart lambat tidak menahan sesi lain
+        fig = build()
+        with self.lock:
+            self.entries[key] = fig
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+        return fig
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self.entries),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+
+def filter_key(filters):
+    """Key filter yang hashable dan stabil (dimensi kosong diabaikan)"""
+    return tuple((dim, tuple(values)) for dim, values in sorted(filters.items()) if values)
+
+# ============================================================
+# HELPERS
+# ============================================================
+
+def add_forecast_band(fig, forecast, x, **kwargs):
+    """Overlay forecast volume (forecast.forecast_*_frame): garis + band interval Lower-Upper;
+    hover menampilkan volume minggu depan tanpa skala"""
+    fig.add_trace(go.Scatter(x=forecast[x], y=forecast['Upper'], mode='lines',
+                             line=dict(width=0), showlegend=False, hoverinfo='skip'), **kwargs)
+    fig.add_trace(go.Scatter(x=forecast[x], y=forecast['Lower'], mode='lines',
+                             line=dict(width=0), fill='tonexty',
+                             fillcolor='rgba(249,115,22,0.18)', name="Interval 80%",
+                             hoverinfo='skip'), **kwargs)
+    fig.add_trace(go.Scatter(x=forecast[x], y=forecast['Forecast'], mode='lines+markers',
+                             name="Forecast Minggu Depan",
+                             line=dict(color='#f97316', width=2, dash='dot'),
+                             customdata=forecast['Next_Week'],
+                             hovertemplate="%{y:.0f} (minggu depan: %{customdata:.0f})"),
+                  **kwargs)
+
+
+def add_percentile_markers(fig, df, category):
+    """Tambah marker P50/P90/P95 (jika tersedia) di bar horizontal rata-rata"""
+    for name, marker in PERCENTILE_MARKERS.items():
+        if name in df:
+            fig.add_trace(go.Scatter(x=df[name], y=df[category], mode='markers',
+                                     name=name, marker=dict(size=10, **marker)))
+            fig.update_layout(showlegend=True)
+
+# ============================================================
+# WAIT TIME CHARTS
+# ============================================================
+
+def dept_chart(dept_df):
+    dept_df = dept_df.sort_values('Avg_Wait')
+    fig = px.bar(
+        dept_df,
+        x='Avg_Wait',
+        y='Department',
+        orientation='h',
+        color='Avg_Wait',
+        color_continuous_scale='RdYlGn_r',
+        text='Avg_Wait',
+        title='Waktu Tunggu per Departemen',
+        labels={'Avg_Wait': 'Waktu Tunggu (menit)'}
+    )
+
+    fig.add_vline(x=TARGET_WAIT, line_dash="dash", line_color="green",
+                  annotation_text=f"Target: {TARGET_WAIT} min")
+    fig.update_traces(texttemplate='%{text:.0f} min', textposition='outside')
+    fig.update_layout(height=500, showlegend=False)
+    add_percentile_markers(fig, dept_df, 'Department')
+    return fig
+
+
+def hour_chart(hour_df, staff_reco, forecast=None):
+    fig = make_subplots(specs=[[{"secondary_y": True}]])
+
+    fig.add_trace(
+        go.Scatter(x=hour_df['Hour'], y=hour_df['Wait_Time'],
+                   name="Wait Time", line=dict(color='red', width=3),
+                   mode='lines+markers'),
+        secondary_y=False,
+    )
+
+    fig.add_trace(
+        go.Bar(x=hour_df['Hour'], y=hour_df['Volume'],
+               name="Volume Pasien", marker_color='lightblue', opacity=0.6),
+        secondary_y=True,
+    )
+
+    fig.add_trace(
+        go.Scatter(x=hour_df['Hour'], y=hour_df['Staff'],
+                   name="Jumlah Dokter", line=dict(color='green', width=2, dash='dash'),
+                   mode='lines+markers'),
+        secondary_y=False,
+    )
+
+    # Rekomendasi staffing analitik (Erlang-C) di samping staffing aktual
+    fig.add_trace(
+        go.Scatter(x=staff_reco['Hour'], y=staff_reco['Recommended'],
+                   name="Rekomendasi Dokter (Erlang-C)",
+                   line=dict(color='#7c3aed', width=2, shape='hv'),
+                   mode='lines+markers'),
+        secondary_y=False,
+    )
+
+    # Band persentil P50-P95 dari sketch (hanya dengan data record-level)
+    if 'P95' in hour_df:
+        fig.add_trace(
+            go.Scatter(x=hour_df['Hour'], y=hour_df['P50'], name="P50",
+                       line=dict(color='rgba(220,38,38,0.5)', dash='dot')),
+            secondary_y=False,
+        )
+        fig.add_trace(
+            go.Scatter(x=hour_df['Hour'], y=hour_df['P95'], name="P50-P95",
+                       fill='tonexty', fillcolor='rgba(220,38,38,0.12)',
+                       line=dict(color='rgba(220,38,38,0.5)', width=1)),
+            secondary_y=False,
+        )
+
+    # Forecast volume (Holt-Winters) di sumbu volume, diskalakan ke periode chart
+    if forecast is not None:
+        add_forecast_band(fig, forecast, 'Hour', secondary_y=True)
+
+    fig.add_hline(y=TARGET_WAIT, line_dash="dash", line_color="green",
+                  annotation_text="Target", secondary_y=False)
+
+    fig.update_layout(
+        title="Pola Per Jam: Wait Time vs Volume vs Staffing",
+        height=500
+    )
+
+    fig.update_yaxes(title_text="Wait Time (min) / Dokter", secondary_y=False)
+    fig.update_yaxes(title_text="Volume Pasien", secondary_y=True)
+    return fig
+
+
+def staffing_heatmap(staff_per_dept):
+    fig = px.imshow(staff_per_dept, text_auto='.0f', aspect='auto',
+                    color_continuous_scale='Purples',
+                    labels={'x': 'Jam', 'y': 'Departemen', 'color': 'Dokter'})
+    fig.update_layout(height=450)
+    return fig
+
+
+def simulation_chart(sim_now, sim_new, replications):
+    fig = go.Figure()
+    for label, sim, color in [("Roster saat ini", sim_now, '#dc2626'),
+                              ("Roster usulan", sim_new, '#10b981')]:
+        fig.add_trace(go.Scatter(x=sim['Hour'], y=sim['P50'], name=f"{label} P50",
+                                 line=dict(color=color, width=3)))
+        fig.add_trace(go.Scatter(x=sim['Hour'], y=sim['P90'], name=f"{label} P90",
+                                 line=dict(color=color, dash='dot')))
+    fig.add_hline(y=TARGET_WAIT, line_dash="dash", line_color="green")
+    fig.update_layout(title=f"Proyeksi Wait per Jam ({replications} replikasi)",
+                      xaxis_title="Jam", yaxis_title="Waktu Tunggu (menit)",
+                      height=400)
+    return fig
+
+
+def day_chart(day_df):
+    fig = go.Figure()
+
+    fig.add_trace(go.Bar(
+        x=day_df['Day'], y=day_df['Wait_Time'],
+        marker_color=['#dc2626' if d == 'Senin' else '#3b82f6' for d in day_df['Day']],
+        text=day_df['Wait_Time'],
+        texttemplate='%{text:.0f} min',
+        textposition='outside',
+        name='Wait Time'
+    ))
+
+    fig.add_hline(y=TARGET_WAIT, line_dash="dash", line_color="green")
+
+    fig.update_layout(
+        title="Waktu Tunggu per Hari",
+        yaxis_title="Waktu Tunggu (menit)",
+        height=400
+    )
+    return fig
+
+
+def volume_chart(day_df, forecast=None):
+    fig = px.bar(day_df, x='Day', y='Volume',
+                 color='Volume', color_continuous_scale='Blues',
+                 text='Volume', title="Volume Pasien per Hari")
+    fig.update_traces(textposition='outside')
+    fig.update_layout(showlegend=False, height=400)
+    if forecast is not None:
+        add_forecast_band(fig, forecast, 'Day')
+        fig.update_layout(showlegend=True, legend=dict(orientation='h', y=-0.15))
+    return fig
+
+
+def correlation_chart(staff_df):
+    fig = px.scatter(
+        staff_df, x='Doctors', y='Wait_Time', size='Patients',
+        color='Wait_Time', color_continuous_scale='RdYlGn_r',
+        title="Korelasi: Jumlah Dokter vs Waktu Tunggu",
+        labels={'Doctors': 'Jumlah Dokter', 'Wait_Time': 'Waktu Tunggu (menit)'}
+    )
+
+    fig.add_hline(y=TARGET_WAIT, line_dash="dash", line_color="green")
+    fig.update_layout(height=500, showlegend=False)
+    return fig
+
+
+def triage_chart(triage_df):
+    fig = px.bar(
+        triage_df, x='Wait_Time', y='Category', orientation='h',
+        color='Wait_Time', color_continuous_scale='RdYlGn_r',
+        text='Wait_Time', title="Wait Time per Kategori Triage"
+    )
+
+    fig.add_vline(x=TARGET_WAIT, line_dash="dash", line_color="green")
+    fig.update_traces(texttemplate='%{text:.0f} min', textposition='outside')
+    fig.update_layout(showlegend=False, height=400)
+    add_percentile_markers(fig, triage_df, 'Category')
+    return fig
+
+
+def triage_pie(triage_df):
+    return px.pie(
+        triage_df, values='Count', names='Category',
+        title="Distribusi Pasien", hole=0.4
+    )
+
+# ============================================================
+# APPOINTMENT CHARTS
+# ============================================================
+
+def appointment_donut(appt_df):
+    """Donut status appointment (dipakai Ringkasan Eksekutif & Root Cause)"""
+    fig = go.Figure(data=[go.Pie(
+        labels=appt_df['Status'],
+        values=appt_df['Count'],
+        hole=0.5,
+        marker_colors=['#10b981', '#f59e0b', '#dc2626'],
+        textinfo='label+percent',
+        pull=[0, 0.1, 0.1]
+    )])
+
+    total = appt_df['Count'].sum()
+    fig.update_layout(
+        title="Distribusi Status Appointment",
+        annotations=[dict(text=f'{total:,}<br>Total', x=0.5, y=0.5,
+                          font_size=16, showarrow=False)],
+        height=400
+    )
+    return fig
+
+
+def compare_chart(productive, waste):
+    fig = go.Figure(data=[
+        go.Bar(x=['Produktif', 'Terbuang'],
+               y=[productive, waste],
+               marker_color=['#10b981', '#dc2626'],
+               text=[productive, waste],
+               texttemplate='%{text:,}',
+               textposition='outside')
+    ])
+
+    fig.update_layout(
+        title="Slot Produktif vs Terbuang",
+        yaxis_title="Jumlah Appointments",
+        height=400,
+        showlegend=False
+    )
+    return fig
+
+
+def slot_hours_chart(totals):
+    """Jam-dokter hasil rekonstruksi jadwal: produktif vs terbuang (dipisah yang terisi walk-in)"""
+    labels = ['Produktif', 'Terbuang (bersih)', 'Terisi walk-in', 'Idle']
+    values = [totals['Produktif'], totals['Terbuang_Bersih'], totals['Backfill'], totals['Idle']]
+    fig = go.Figure(data=[
+        go.Bar(x=labels, y=values,
+               marker_color=[SLOT_COLORS[name] for name in SLOT_STATES],
+               text=values,
+               texttemplate='%{text:,.0f}',
+               textposition='outside')
+    ])
+
+    fig.update_layout(
+        title="Slot Produktif vs Terbuang (jam-dokter)",
+        yaxis_title="Jam-Dokter",
+        height=400,
+        showlegend=False
+    )
+    return fig
+
+
+def slot_breakdown_chart(df, label, title):
+    """Bar bertumpuk jam-dokter per state untuk frame occupancy (per departemen/jam/hari)"""
+    fig = px.bar(df, x=label, y=SLOT_STATES, title=title,
+                 labels={'value': 'Jam-Dokter', 'variable': ''},
+                 color_discrete_map=SLOT_COLORS)
+    fig.update_layout(height=400, legend_title_text='')
+    return fig
+
+
+def risk_heatmap(matrix):
+    """Expected appointment terbuang per hari klinik (risk.risk_matrix), departemen x jam"""
+    fig = px.imshow(matrix, text_auto='.1f', aspect='auto', color_continuous_scale='Reds',
+                    labels={'x': 'Jam', 'y': 'Departemen', 'color': 'Waste/Hari'},
+                    title="Expected Appointment Terbuang per Slot (per Hari Klinik)")
+    fig.update_layout(height=450)
+    return fig
+
+
+def month_waste_chart(by_month):
+    fig = px.bar(by_month, x='Month', y=WASTE_STATUSES,
+                 title="Appointment Terbuang per Bulan",
+                 labels={'value': 'Jumlah Appointments', 'Month': 'Bulan'},
+                 color_discrete_sequence=['#f59e0b', '#dc2626'])
+    fig.update_layout(height=400, legend_title_text='')
+    return fig
+
+
+def dept_waste_chart(by_dept):
+    fig = px.bar(by_dept.sort_values('Waste_Pct'), x='Waste_Pct', y='Department',
+                 orientation='h', text='Waste_Pct',
+                 title="Waste % per Departemen",
+                 labels={'Waste_Pct': 'Waste (%)'})
+    fig.update_traces(texttemplate='%{text:.1f}%', textposition='outside',
+                      marker_color='#dc2626')
+    fig.update_layout(height=400)
+    return fig
@@ -0,0 +1,224 @@
+# DEMAND FORECAST - HOLT-WINTERS
+# Forecast volume harian per departemen × jam (musiman mingguan) untuk staffing proaktif;
+# semua seri × kandidat parameter di-fit sekaligus sebagai array bertumpuk
+#
+#   python forecast.py --data-dir data
+
+import argparse
+import itertools
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from data_loader import DAYS, DEPARTMENTS, N_HOURS
+
+SEASON = len(DAYS)
+HORIZON = 7
+# Inisialisasi level/trend/musiman butuh dua musim penuh
+MIN_DAYS = 2 * SEASON
+# Grid parameter (alpha, beta, gamma); gamma 1 ~ seasonal naive (musiman = minggu lalu)
+ALPHAS = (0.05, 0.1, 0.2, 0.3, 0.5, 0.8)
+BETAS = (0.0, 0.01, 0.05, 0.1)
+GAMMAS = (0.05, 0.1, 0.3, 0.5, 1.0)
+GRID = np.array(list(itertools.product(ALPHAS, BETAS, GAMMAS)))
+# Interval prediksi 80% (normal)
+INTERVAL_Z = 1.2816
+N_SERIES = len(DEPARTMENTS) * N_HOURS
+
+# ============================================================
+# MODEL
+# ============================================================
+
+class DemandForecast:
+    """Holt-Winters aditif untuk setiap seri dept × jam dan setiap kombinasi GRID sekaligus.
+
+    State (level, trend, musiman per hari-minggu, SSE one-step) berbentuk (grid, seri),
+    jadi hari baru cukup melanjutkan rekursi: tidak ada fit ulang dari awal. Parameter
+    terbaik per seri = SSE one-step terkecil.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.first_day = None
+        self.n_days = 0
+        self.total = 0
+        self.warmup = []
+        self.level = self.trend = self.season = self.sse = None
+        self.n_errors = 0
+
+    @property
+    def ready(self):
+        return self.level is not None
+
+    @property
+    def last_day(self):
+        return self.first_day + self.n_days - 1 if self.n_days else None
+
+    def _init_state(self, y):
+        """Level = rata-rata minggu pertama, trend = selisih rata-rata minggu 1-2 / 7,
+        musiman = minggu pertama - level (diindeks hari-minggu)"""
+        first, second = y[:SEASON].mean(axis=0), y[SEASON:2 * SEASON].mean(axis=0)
+        weekday = (self.first_day + np.arange(SEASON) + 3) % SEASON
+        season = np.empty((SEASON, y.shape[1]))
+        season[weekday] = y[:SEASON] - first
+        shape = (len(GRID), y.shape[1])
+        self.level = np.broadcast_to(first, shape).copy()
+        self.trend = np.broadcast_to((second - first) / SEASON, shape).copy()
+        self.season = np.broadcast_to(season, (len(GRID),) + season.shape).copy()
+        self.sse = np.zeros(shape)
+
+    def _step(self, first_day, y):
+        """Rekursi untuk hari-hari berurutan y (T, seri), bervektor atas grid × seri"""
+        alpha, beta, gamma = (GRID[:, i, None] for i in range(3))
+        for t, values in enumerate(y):
+            w = (first_day + t + 3) % SEASON
+            season = self.season[:, w]
+            error = values - (self.level + self.trend + season)
+            self.sse += error * error
+            level = alpha * (values - season) + (1 - alpha) * (self.level + self.trend)
+            self.trend = beta * (level - self.level) + (1 - beta) * self.trend
+            self.season[:, w] = gamma * (values - level) + (1 - gamma) * season
+            self.level = level
+        self.n_errors += len(y)
+
+    def update(self, first_day, y):
+        """Tambahkan hari first_day.. (nomor hari) dengan volume y (T, seri)"""
+        if not len(y):
+            return
+        y = np.asarray(y, dtype=np.float64).reshape(len(y), -1)
+        if self.first_day is None:
+            self.first_day = first_day
+        elif first_day != self.first_day + self.n_days:
+            raise ValueError("Hari baru harus melanjutkan hari terakhir forecast")
+        start = self.first_day + self.n_days
+        self.n_days += len(y)
+        self.total += int(y.sum())
+        if not self.ready:
+            self.warmup.append(y)
+            if self.n_days < MIN_DAYS:
+                return
+            y, start = np.concatenate(self.warmup), self.first_day
+            self.warmup = []
+            self._init_state(y)
+        self._step(start, y)
+
+    def sync(self, rollup):
+        """Samakan dengan DailyRollup: hanya hari baru yang diproses; fit ulang dari awal
+        jika riwayat yang sudah di-fit berubah. Kembalikan jumlah hari yang ditambahkan."""
+        with self.lock:
+            if rollup.first_day is None:
+                return 0
+            if self.n_days and (rollup.first_day != self.first_day
+                                or rollup.n_days < self.n_days
+                                or rollup.total_patients(self.n_days) != self.total):
+                self._reset()
+            counts = rollup.daily_patients(self.n_days)
+            self.update(rollup.first_day + self.n_days, counts.reshape(len(counts), N_SERIES))
+            return len(counts)
+
+    def parameters(self):
+        """Indeks GRID terbaik dan varians error one-step per seri"""
+        best = np.argmin(self.sse, axis=0)
+        series = np.arange(self.sse.shape[1])
+        return best, self.sse[best, series] / max(self.n_errors, 1)
+
+    def forecast(self, horizon=HORIZON):
+        """{'days': nomor hari, 'mean'/'variance': (horizon, dept, jam)}; None sebelum
+        MIN_DAYS hari. Varians h-langkah ETS(A,A,A): s2 (1 + sum_j c_j^2),
+        c_j = alpha (1 + j beta) + gamma [j kelipatan musim]."""
+        with self.lock:
+            if not self.ready:
+                return None
+            best, sigma2 = self.parameters()
+            series = np.arange(len(best))
+            alpha, beta, gamma = (GRID[best, i] for i in range(3))
+            h = np.arange(1, horizon + 1)
+            days = self.last_day + h
+            weekday = (days + 3) % SEASON
+            mean = (self.level[best, series] + h[:, None] * self.trend[best, series]
+                    + self.season[best[None, :], weekday[:, None], series[None, :]])
+            j = np.arange(1, horizon)[:, None]
+            c = alpha * (1 + j * beta) + gamma * (j % SEASON == 0)
+            cumulative = np.vstack([np.zeros(len(series)), np.cumsum(c * c, axis=0)])
+            variance = sigma2 * (1 + cumulative)
+        shape = (horizon, len(DEPARTMENTS), N_HOURS)
+        return {'days': days, 'mean': np.maximum(mean, 0).reshape(shape),
+                'variance': variance.reshape(shape)}
+
+# ============================================================
+# FRAMES
+# ============================================================
+
+def _dept_mask(departments):
+    return np.isin(DEPARTMENTS, departments) if departments else np.ones(len(DEPARTMENTS), bool)
+
+
+def _band(df, mean, variance, scale):
+    """Kolom Forecast/Lower/Upper (diskalakan) + Next_Week (tanpa skala). Varians seri &
+    hari dijumlahkan seolah error independen."""
+    sd = np.sqrt(variance)
+    df['Forecast'] = np.round(mean * scale, 1)
+    df['Lower'] = np.round(np.maximum(mean - INTERVAL_Z * sd, 0) * scale, 1)
+    df['Upper'] = np.round((mean + INTERVAL_Z * sd) * scale, 1)
+    df['Next_Week'] = np.round(mean, 1)
+    return df
+
+
+def forecast_hour_frame(fc, departments=None, scale=1.0):
+    """Forecast volume per jam untuk horizon (Hour, Forecast, Lower, Upper, Next_Week).
+    scale mengubah total horizon ke satuan chart, mis. hari periode / horizon."""
+    mask = _dept_mask(departments)
+    mean = fc['mean'][:, mask].sum(axis=(0, 1))
+    variance = fc['variance'][:, mask].sum(axis=(0, 1))
+    hours = np.flatnonzero(mean > 0)
+    return _band(pd.DataFrame({'Hour': hours}), mean[hours], variance[hours], scale)
+
+
+def forecast_day_frame(fc, departments=None, scale=1.0):
+    """Forecast volume per hari-minggu untuk horizon (Day, Forecast, Lower, Upper, Next_Week)"""
+    mask = _dept_mask(departments)
+    weekday = (fc['days'] + 3) % SEASON
+    mean = np.bincount(weekday, weights=fc['mean'][:, mask].sum(axis=(1, 2)), minlength=SEASON)
+    variance = np.bincount(weekday, weights=fc['variance'][:, mask].sum(axis=(1, 2)),
+                           minlength=SEASON)
+    seen = np.isin(np.arange(SEASON), weekday)
+    return _band(pd.DataFrame({'Day': np.array(DAYS)[seen]}), mean[seen], variance[seen], scale)
+
+
+def forecast_cube(fc, departments=None):
+    """cube_count dept × jam total horizon untuk erlang.arrival_rates (days = horizon)"""
+    counts = fc['mean'].sum(axis=0) * _dept_mask(departments)[:, None]
+    return {'cube_count': counts[:, :, None, None, None]}
+
+
+if __name__ == '__main__':
+    from query_store import ensure_store
+    from rollups import DailyRollup
+
+    parser = argparse.ArgumentParser(description="Forecast volume minggu depan (Holt-Winters)")
+    parser.add_argument('--data-dir', default=None)
+    parser.add_argument('--horizon', type=int, default=HORIZON)
+    args = parser.parse_args()
+
+    store = ensure_store(args.data_dir)
+    if store is None:
+        raise SystemExit("Data mentah tidak ditemukan")
+    rollup = DailyRollup()
+    rollup.sync(store)
+    model = DemandForecast()
+    start = time.perf_counter()
+    model.sync(rollup)
+    fc = model.forecast(args.horizon)
+    if fc is None:
+        raise SystemExit(f"Butuh minimal {MIN_DAYS} hari data (ada {model.n_days})")
+    print(f"{N_SERIES} seri x {len(GRID)} parameter di-fit atas {model.n_days} hari "
+          f"dalam {time.perf_counter() - start:.3f} s")
+    print()
+    print(forecast_day_frame(fc).to_string(index=False))
+    print()
+    print(forecast_hour_frame(fc).to_string(index=False))
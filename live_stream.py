@@ -0,0 +1,240 @@
+# LIVE EVENT STREAM - SLIDING WINDOW METRICS
+# Tail file event pasien (append-only JSONL) dan jaga metrik wait bergulir O(1) per event
+#
+# Satu event per baris, contoh:
+#   {"ts": "2024-03-04T09:12:00", "patient_id": "P1", "type": "arrival", "department": "Neurology"}
+#   {"ts": "2024-03-04T09:14:00", "patient_id": "P1", "type": "triage", "triage": "Non-urgent"}
+#   {"ts": "2024-03-04T11:40:00", "patient_id": "P1", "type": "seen"}
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from data_loader import DATA_DIR, DEPARTMENTS, TRIAGE_CATEGORIES
+
+EVENT_LOG = Path(os.environ.get("HOSPITAL_EVENT_LOG", DATA_DIR / "events.jsonl"))
+
+# Baris metrik: per departemen, per triage, dan keseluruhan
+KEYS = DEPARTMENTS + TRIAGE_CATEGORIES + ['Semua']
+OVERALL = len(KEYS) - 1
+WINDOWS = {'15 menit': 15, '1 jam': 60}
+# Pasien tanpa event seen selama ini (walk-out, event hilang) dikeluarkan dari antrian
+WAITING_TTL_MINUTES = 24 * 60
+
+# ============================================================
+# SLIDING WINDOW
+# ============================================================
+
+class SlidingWindow:
+    """Ring buffer bucket per menit untuk semua key sekaligus.
+
+    Total window disimpan berjalan: event menambah satu bucket, dan bucket
+    yang keluar window dikurangkan saat waktu maju (amortized O(1)).
+    """
+
+    def __init__(self, minutes, n_keys=len(KEYS)):
+        self.minutes = minutes
+        self.sums = np.zeros((n_keys, minutes))
+        self.counts = np.zeros((n_keys, minutes), dtype=np.int64)
+        self.total_sum = np.zeros(n_keys)
+        self.total_count = np.zeros(n_keys, dtype=np.int64)
+        self.current = None
+
+    def advance(self, minute):
+        if self.current is None:
+            self.current = minute
+            return
+        steps = min(minute - self.current, self.minutes)
+        for step in range(1, steps + 1):
+            slot = (self.current + step) % self.minutes
+            self.total_sum -= self.sums[:, slot]
+            self.total_count -= self.counts[:, slot]
+            self.sums[:, slot] = 0
+            self.counts[:, slot] = 0
+        self.current = max(self.current, minute)
+
+    def add(self, minute, keys, value):
+        self.advance(minute)
+        if minute <= self.current - self.minutes:
+            return  # terlalu lama, sudah di luar window
+        slot = minute % self.minutes
+        self.sums[keys, slot] += value
+        self.counts[keys, slot] += 1
+        self.total_sum[keys] += value
+        self.total_count[keys] += 1
+
+# ============================================================
+# LIVE METRICS
+# ============================================================
+
+def _timestamp(value):
+    if isinstance(value, (int, float)):
+        return float(value)
+    return datetime.fromisoformat(value).timestamp()
+
+
+def _keys(department, triage):
+    """Indeks baris KEYS untuk satu pasien: keseluruhan + departemen + triage (jika dikenal)"""
+    keys = [OVERALL]
+    if department in DEPARTMENTS:
+        keys.append(DEPARTMENTS.index(department))
+    if triage in TRIAGE_CATEGORIES:
+        keys.append(len(DEPARTMENTS) + TRIAGE_CATEGORIES.index(triage))
+    return keys
+
+
+class LiveMetrics:
+    """Pasangkan event arrival/triage/seen per pasien dan update semua window.
+
+    Jumlah pasien menunggu per key dijaga sebagai counter (bukan dihitung ulang dari
+    antrian), dan pasien yang menunggu lebih dari WAITING_TTL_MINUTES dikeluarkan
+    berurutan waktu kedatangan: memori & biaya summary tidak tumbuh dengan walk-out.
+    """
+
+    def __init__(self, ttl_minutes=WAITING_TTL_MINUTES):
+        self.windows = {name: SlidingWindow(minutes) for name, minutes in WINDOWS.items()}
+        self.today = None
+        self.today_sum = np.zeros(len(KEYS))
+        self.today_count = np.zeros(len(KEYS), dtype=np.int64)
+        self.waiting = {}   # patient_id -> [ts kedatangan, departemen, triage]
+        self.waiting_count = np.zeros(len(KEYS), dtype=np.int64)
+        self.arrivals = deque()   # (ts kedatangan, patient_id) untuk eviction
+        self.ttl = ttl_minutes * 60
+        self.expired = 0
+        self.stale = 0      # event bertanggal sebelum hari berjalan, diabaikan
+
+    def _leave(self, patient):
+        entry = self.waiting.pop(patient)
+        self.waiting_count[_keys(entry[1], entry[2])] -= 1
+        return entry
+
+    def _expire(self, ts):
+        """Keluarkan pasien yang datang sebelum ts - ttl (amortized O(1) per kedatangan)"""
+        while self.arrivals and self.arrivals[0][0] < ts - self.ttl:
+            arrived, patient = self.arrivals.popleft()
+            # Entri basi: pasien sudah seen atau datang ulang setelahnya
+            entry = self.waiting.get(patient)
+            if entry is not None and entry[0] == arrived:
+                self._leave(patient)
+                self.expired += 1
+
+    def _roll_day(self, ts):
+        """Pindah ke hari ts jika lebih baru; False jika ts sebelum hari berjalan"""
+        day = datetime.fromtimestamp(ts).date()
+        if self.today is not None and day < self.today:
+            return False
+        if day != self.today:
+            self.today = day
+            self.today_sum[:] = 0
+            self.today_count[:] = 0
+        return True
+
+    def process(self, event):
+        """Proses satu event; KeyError/ValueError/TypeError jika field wajib hilang/invalid.
+        Event dari hari sebelumnya (datang terlambat) diabaikan dan dihitung di `stale`."""
+        ts = _timestamp(event['ts'])
+        patient = event['patient_id']
+        kind = event['type']
+        if not self._roll_day(ts):
+            self.stale += 1
+            return
+        self._expire(ts)
+        if kind == 'arrival':
+            if patient in self.waiting:
+                self._leave(patient)
+            department, triage = event.get('department'), event.get('triage')
+            self.waiting[patient] = [ts, department, triage]
+            self.waiting_count[_keys(department, triage)] += 1
+            self.arrivals.append((ts, patient))
+        elif kind == 'triage' and patient in self.waiting:
+            entry = self.waiting[patient]
+            self.waiting_count[_keys(entry[1], entry[2])] -= 1
+            entry[2] = event.get('triage')
+            self.waiting_count[_keys(entry[1], entry[2])] += 1
+        elif kind == 'seen' and patient in self.waiting:
+            arrived, department, triage = self._leave(patient)
+            keys = _keys(department, triage)
+            wait = (ts - arrived) / 60
+            minute = int(ts // 60)
+            for window in self.windows.values():
+                window.add(minute, keys, wait)
+            self.today_sum[keys] += wait
+            self.today_count[keys] += 1
+
+    def summary(self, now=None):
+        """Frame metrik per key: rata-rata wait & jumlah pasien per window, plus antrian saat ini"""
+        now = time.time() if now is None else now
+        minute = int(now // 60)
+        self._roll_day(now)
+        columns = {'Key': KEYS}
+        for name, window in self.windows.items():
+            window.advance(minute)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                columns[f'Avg_Wait {name}'] = window.total_sum / window.total_count
+            columns[f'Patients {name}'] = window.total_count.copy()
+        with np.errstate(invalid='ignore', divide='ignore'):
+            columns['Avg_Wait hari ini'] = self.today_sum / self.today_count
+        columns['Patients hari ini'] = self.today_count.copy()
+        self._expire(now)
+        columns['Menunggu'] = self.waiting_count.copy()
+        return pd.DataFrame(columns)
+
+# ============================================================
+# FILE TAIL
+# ============================================================
+
+class EventTail:
+    """Baca hanya byte baru dari file event sejak poll sebelumnya.
+    Baris yang tidak valid dilewati dan dihitung di `malformed`."""
+
+    def __init__(self, path=EVENT_LOG):
+        self.path = Path(path)
+        self.offset = 0
+        self.inode = None
+        self.metrics = LiveMetrics()
+        self.malformed = 0
+        self.lock = threading.Lock()
+
+    def poll(self):
+        """Proses event baru; kembalikan jumlah event yang dibaca"""
+        with self.lock:
+            try:
+                f = open(self.path, 'rb')
+            except FileNotFoundError:
+                return 0
+            with f:
+                stat = os.fstat(f.fileno())
+                if stat.st_ino != self.inode:
+                    # File baru hasil rotasi: event lama sudah diproses, baca dari awal
+                    self.inode = stat.st_ino
+                    self.offset = 0
+                elif stat.st_size < self.offset:
+                    # File dipotong di tempat: isinya ditulis ulang, mulai ulang dari awal
+                    self.offset = 0
+                    self.metrics = LiveMetrics()
+                n = 0
+                f.seek(self.offset)
+                for line in f:
+                    if not line.endswith(b'\n'):
+                        break  # baris belum selesai ditulis
+                    self.offset += len(line)
+                    if not line.strip():
+                        continue
+                    try:
+                        self.metrics.process(json.loads(line))
+                    except (ValueError, KeyError, TypeError):
+                        self.malformed += 1
+                        continue
+                    n += 1
+            return n
+
+    def summary(self, now=None):
+        with self.lock:
+            return self.metrics.summary(now)
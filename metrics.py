@@ -0,0 +1,282 @@
+# HEADLINE METRICS - REGISTRY
+# Metrik bernama dengan input yang dideklarasikan; dievaluasi lazy & di-memo per versi frame sumber
+
+import hashlib
+import threading
+
+import numpy as np
+import pandas as pd
+
+from appointment_stream import SLOT_HOURS, WASTE_STATUSES
+from data_loader import DAYS, TARGET_WAIT, TRIAGE_CATEGORIES
+from snapshot import FRAME_NAMES
+
+# Nama metrik -> (input, fungsi). Input adalah nama frame sumber (FRAME_NAMES) atau metrik
+# yang sudah terdaftar sebelumnya, jadi graf dependensi selalu asiklik.
+REGISTRY = {}
+NON_URGENT = ['Semi-urgent', 'Non-urgent']
+
+
+def metric(*inputs):
+    """Dekorator: daftarkan fungsi sebagai metrik bernama fungsi itu dengan input `inputs`"""
+    def register(fn):
+        unknown = [name for name in inputs if name not in FRAME_NAMES and name not in REGISTRY]
+        if unknown:
+            raise ValueError(f"Input metrik {fn.__name__} tidak dikenal: {unknown}")
+        REGISTRY[fn.__name__] = (inputs, fn)
+        return fn
+    return register
+
+
+def sources_of(name):
+    """Frame sumber (transitif) yang menentukan nilai metrik"""
+    inputs, _ = REGISTRY[name]
+    found = set()
+    for name in inputs:
+        found |= {name} if name in FRAME_NAMES else sources_of(name)
+    return found
+
+
+def frame_version(df):
+    """Hash isi frame: versi berubah hanya jika data frame itu sendiri berubah"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr(list(df.columns)).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+# ============================================================
+# EVALUATION
+# ============================================================
+
+class MetricCache:
+    """Memo nilai metrik dibagi ke semua sesi: nama -> (versi sumber, nilai).
+    Satu entri per metrik, jadi versi lama otomatis tergantikan."""
+
+    def __init__(self):
+        self.entries = {}
+        self.lock = threading.Lock()
+        self.computed = 0
+
+    def get(self, name, key):
+        with self.lock:
+            entry = self.entries.get(name)
+            return entry if entry is not None and entry[0] == key else None
+
+    def put(self, name, key, value):
+        with self.lock:
+            self.entries[name] = (key, value)
+            self.computed += 1
+
+
+class Metrics:
+    """Tampilan lazy atas REGISTRY untuk satu set frame: metrics['waste_pct'] hanya
+    menghitung metrik itu & dependensinya, dan hanya jika frame sumbernya berubah"""
+
+    def __init__(self, frames, cache=None):
+        self.frames = frames if isinstance(frames, dict) else dict(zip(FRAME_NAMES, frames))
+        self.cache = cache if cache is not None else MetricCache()
+        self.versions = {}
+
+    def version(self, source):
+        if source not in self.versions:
+            self.versions[source] = frame_version(self.frames[source])
+        return self.versions[source]
+
+    def __getitem__(self, name):
+        inputs, fn = REGISTRY[name]
+        key = tuple((source, self.version(source)) for source in sorted(sources_of(name)))
+        entry = self.cache.get(name, key)
+        if entry is not None:
+            return entry[1]
+        value = fn(*(self.frames[i] if i in FRAME_NAMES else self[i] for i in inputs))
+        self.cache.put(name, key, value)
+        return value
+
+# ============================================================
+# DEPARTEMEN
+# ============================================================
+
+@metric()
+def target_wait():
+    return TARGET_WAIT
+
+
+@metric('dept_df')
+def avg_wait(dept_df):
+    """Rata-rata wait seluruh pasien (tertimbang jumlah pasien per departemen);
+    None jika tidak ada pasien (mis. filter store tanpa record)"""
+    if not dept_df['Total_Patients'].sum():
+        return None
+    return round(float(np.average(dept_df['Avg_Wait'], weights=dept_df['Total_Patients'])), 1)
+
+
+@metric('avg_wait', 'target_wait')
+def wait_gap(avg_wait, target_wait):
+    return None if avg_wait is None else round(avg_wait - target_wait, 1)
+
+
+@metric('dept_df')
+def n_departments(dept_df):
+    return len(dept_df)
+
+
+@metric('dept_df', 'target_wait')
+def depts_above_target(dept_df, target_wait):
+    return int((dept_df['Avg_Wait'] > target_wait).sum())
+
+
+@metric('depts_above_target', 'n_departments')
+def depts_above_pct(depts_above_target, n_departments):
+    return round(depts_above_target / n_departments * 100) if n_departments else 0
+
+
+@metric('dept_df')
+def dept_wait_range(dept_df):
+    if dept_df.empty:
+        return None
+    return float(dept_df['Avg_Wait'].min()), float(dept_df['Avg_Wait'].max())
+
+
+@metric('dept_df', 'target_wait')
+def dept_gap_extremes(dept_df, target_wait):
+    """(departemen, gap) dengan gap terhadap target terkecil dan terbesar; None tanpa data"""
+    if dept_df.empty:
+        return None
+    low = dept_df.loc[dept_df['Avg_Wait'].idxmin()]
+    high = dept_df.loc[dept_df['Avg_Wait'].idxmax()]
+    return ((low['Department'], float(low['Avg_Wait'] - target_wait)),
+            (high['Department'], float(high['Avg_Wait'] - target_wait)))
+
+# ============================================================
+# JAM & HARI
+# ============================================================
+
+def _variation_pct(values):
+    """Selisih max-min relatif terhadap min (%); None jika kosong atau min 0 (tak hingga)"""
+    if values.empty or values.min() <= 0:
+        return None
+    return round(float((values.max() - values.min()) / values.min() * 100))
+
+
+@metric('hour_df')
+def volume_range(hour_df):
+    if hour_df.empty:
+        return None
+    return int(hour_df['Volume'].min()), int(hour_df['Volume'].max())
+
+
+@metric('hour_df')
+def staff_range(hour_df):
+    if hour_df.empty:
+        return None
+    return float(hour_df['Staff'].min()), float(hour_df['Staff'].max())
+
+
+@metric('hour_df')
+def volume_variation_pct(hour_df):
+    return _variation_pct(hour_df['Volume'])
+
+
+@metric('hour_df')
+def staffing_variation_pct(hour_df):
+    return _variation_pct(hour_df['Staff'])
+
+
+@metric('hour_df')
+def peak_hours(hour_df):
+    """Dua jam dengan wait tertinggi (urut jam)"""
+    return sorted(int(h) for h in hour_df.nlargest(2, 'Wait_Time')['Hour'])
+
+
+@metric('day_df')
+def day_stats(day_df):
+    """Hari -> (wait, volume) untuk semua hari; hari tanpa data = (nan, 0)"""
+    df = day_df.set_index('Day').reindex(DAYS)
+    return {day: (float(wait), int(volume) if volume == volume else 0)
+            for day, wait, volume in zip(DAYS, df['Wait_Time'], df['Volume'])}
+
+
+@metric('day_df')
+def best_day(day_df):
+    """Hari dengan wait terendah; None tanpa data"""
+    if day_df.empty:
+        return None
+    return day_df.loc[day_df['Wait_Time'].idxmin(), 'Day']
+
+# ============================================================
+# DOKTER & TRIAGE
+# ============================================================
+
+@metric('staff_df')
+def shift_extremes(staff_df):
+    """((dokter, wait) shift dengan wait tertinggi, (dokter, wait) terendah); None tanpa data"""
+    if staff_df.empty:
+        return None
+    high = staff_df.loc[staff_df['Wait_Time'].idxmax()]
+    low = staff_df.loc[staff_df['Wait_Time'].idxmin()]
+    return ((int(high['Doctors']), float(high['Wait_Time'])),
+            (int(low['Doctors']), float(low['Wait_Time'])))
+
+
+@metric('staff_df')
+def correlation(staff_df):
+    """Pearson dokter on shift vs wait record-level, dari momen per shift (Patients,
+    Wait_Time, Wait_Std); NaN jika frame tidak punya Wait_Std (data bawaan, filter store).
+
+    Aproksimasi: Wait_Time & Wait_Std di frame sudah dibulatkan ke 0.1 menit, jadi hasilnya
+    bisa berbeda dari Pearson record-level di digit ketiga. Nilai eksak beserta CI-nya ada
+    di stats.findings (bootstrap dari bucket record-level).
+    """
+    if 'Wait_Std' not in staff_df or not staff_df['Patients'].sum():
+        return float('nan')
+    n = staff_df['Patients'].to_numpy(np.float64)
+    d = staff_df['Doctors'].to_numpy(np.float64)
+    w = staff_df['Wait_Time'].to_numpy(np.float64)
+    ww = staff_df['Wait_Std'].to_numpy(np.float64) ** 2 + w * w
+    mean_d, mean_w = np.average(d, weights=n), np.average(w, weights=n)
+    cov = np.average(d * w, weights=n) - mean_d * mean_w
+    var_d = np.average(d * d, weights=n) - mean_d ** 2
+    var_w = np.average(ww, weights=n) - mean_w ** 2
+    return round(float(cov / np.sqrt(var_d * var_w)), 3) if var_d > 0 and var_w > 0 else float('nan')
+
+
+@metric('triage_df')
+def triage_stats(triage_df):
+    """Kategori -> (persentase, wait) untuk semua kategori; kategori tanpa data = (0, nan)"""
+    df = triage_df.set_index('Category').reindex(TRIAGE_CATEGORIES)
+    return {category: (float(np.nan_to_num(pct)), float(wait))
+            for category, pct, wait in zip(TRIAGE_CATEGORIES, df['Percentage'], df['Wait_Time'])}
+
+
+@metric('triage_df')
+def non_urgent_pct(triage_df):
+    return round(float(triage_df[triage_df['Category'].isin(NON_URGENT)]['Percentage'].sum()))
+
+# ============================================================
+# APPOINTMENT
+# ============================================================
+
+@metric('appt_df')
+def status_stats(appt_df):
+    """Status -> (jumlah, persentase)"""
+    return {row.Status: (int(row.Count), float(row.Percentage)) for row in appt_df.itertuples()}
+
+
+@metric('appt_df')
+def total_appointments(appt_df):
+    return int(appt_df['Count'].sum())
+
+
+@metric('appt_df')
+def waste_count(appt_df):
+    return int(appt_df[appt_df['Status'].isin(WASTE_STATUSES)]['Count'].sum())
+
+
+@metric('appt_df')
+def waste_pct(appt_df):
+    return round(float(appt_df[appt_df['Status'].isin(WASTE_STATUSES)]['Percentage'].sum()), 1)
+
+
+@metric('waste_count')
+def wasted_doctor_hours(waste_count):
+    return float(waste_count * SLOT_HOURS)
@@ -0,0 +1,325 @@
+# SLOT OCCUPANCY - SWEEP LINE
+# Jadwal dokter direkonstruksi dari jam mulai/selesai appointment: jam-dokter produktif,
+# terbuang (cancel/no-show), idle, dan bagian terbuang yang terisi pasien walk-in
+#
+#   python occupancy.py --data-dir data --workers 4
+
+import argparse
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from appointment_stream import WASTE_STATUSES
+from data_loader import (APPT_SLOT_COLUMNS, APPT_SOURCE, APPT_STATUSES, BATCH_ROWS, DAYS,
+                         DEPARTMENTS, LOAD_WORKERS, N_HOURS, POOL_KINDS, WAIT_COLUMNS,
+                         WAIT_SOURCE, file_columns, iter_records, parallel_map, record_slices,
+                         set_load_pool, source_files, wait_codes)
+from queue_sim import DEFAULT_SERVICE_MINUTES
+
+STATES = ['Produktif', 'Terbuang', 'Idle']
+PRODUCTIVE, WASTED, IDLE = range(len(STATES))
+MINUTES_PER_DAY = 24 * 60
+N_DEPTS = len(DEPARTMENTS)
+WASTE_CODES = [APPT_STATUSES.index(s) for s in WASTE_STATUSES]
+SLOT_FIELDS = ['day', 'doctor', 'dept', 'wasted', 'start', 'end']
+
+# Hasil per potongan: 'slot_minutes' (dept, jam, hari, state) + menit terbuang per sel
+# (tanggal, dept, jam) untuk dicocokkan dengan walk-in. Sel = (tanggal x N_DEPTS + dept) x 24 + jam.
+
+# ============================================================
+# SLOTS
+# ============================================================
+
+def slot_arrays(records):
+    """Kolom jadwal dari CodedRecords; appointment tanpa departemen/status/jam valid dibuang.
+    Hari-dokter = tanggal Start_Time."""
+    dept, status = records['Department'], records['Status']
+    start, end = records['Start_Time'], records['End_Time']
+    valid = (dept >= 0) & (status >= 0) & (start > np.iinfo(np.int64).min) & (end > start)
+    start = start[valid]
+    return {
+        'day': start // MINUTES_PER_DAY,
+        'doctor': records['Doctor_ID'][valid],
+        'dept': dept[valid],
+        'wasted': np.isin(status[valid], WASTE_CODES),
+        'start': start,
+        'end': end[valid],
+    }
+
+
+def _take(slots, mask):
+    return {name: slots[name][mask] for name in SLOT_FIELDS}
+
+
+def _concat(parts):
+    return {name: np.concatenate([p[name] for p in parts]) for name in SLOT_FIELDS}
+
+
+def _empty():
+    return {'slot_minutes': np.zeros((N_DEPTS, N_HOURS, len(DAYS), len(STATES))),
+            'wasted_cells': np.zeros(0, np.int64), 'wasted_minutes': np.zeros(0)}
+
+
+def _merge(total, part):
+    return {
+        'slot_minutes': total['slot_minutes'] + part['slot_minutes'],
+        'wasted_cells': np.concatenate([total['wasted_cells'], part['wasted_cells']]),
+        'wasted_minutes': np.concatenate([total['wasted_minutes'], part['wasted_minutes']]),
+    }
+
+
+def _reduce_cells(cells, values):
+    """Jumlahkan nilai per sel unik (hasil terurut menurut sel)"""
+    cells, inverse = np.unique(cells, return_inverse=True)
+    return cells, np.bincount(inverse, weights=values, minlength=len(cells))
+
+# ============================================================
+# SWEEP LINE
+# ============================================================
+
+def _split_hours(start, end):
+    """Pecah segmen [start, end) (menit) di batas jam: (indeks segmen, jam absolut, menit)"""
+    first = start // 60
+    pieces = (end - 1) // 60 - first + 1
+    segment = np.repeat(np.arange(len(start)), pieces)
+    offset = np.arange(len(segment)) - np.repeat(np.cumsum(pieces) - pieces, pieces)
+    hour = first[segment] + offset
+    minutes = (np.minimum(end[segment], (hour + 1) * 60)
+               - np.maximum(start[segment], hour * 60))
+    return segment, hour, minutes
+
+
+def _event_order(day, doctor, time):
+    """Urutan event per (hari, dokter, waktu) lewat satu kunci int64 (sort stabil cepat
+    untuk log yang hampir terurut); lexsort jika kunci gabungan bisa overflow"""
+    doctor = doctor.astype(np.int64) - doctor.min()
+    offset = time - day * MINUTES_PER_DAY
+    n_days, n_doctors = int(day.max() - day.min()) + 1, int(doctor.max()) + 1
+    span = int(offset.max()) + 1
+    if n_days * n_doctors * span < 2 ** 62:
+        return np.argsort(((day - day.min()) * n_doctors + doctor) * span + offset, kind='stable')
+    return np.lexsort((time, doctor, day))
+
+
+def sweep(slots):
+    """Occupancy sekumpulan hari-dokter lengkap.
+
+    Endpoint semua interval diurutkan per (hari, dokter, waktu); cumsum +1/-1 memberi
+    jumlah appointment hadir & terbuang yang aktif di setiap segmen antar endpoint.
+    Segmen dengan appointment hadir = produktif (double booking dengan cancel tidak
+    dihitung terbuang), hanya appointment terbuang = terbuang, tanpa appointment di
+    antara appointment pertama & terakhir dokter hari itu = idle.
+    """
+    n = len(slots['start'])
+    if not n:
+        return _empty()
+    time = np.concatenate([slots['start'], slots['end']])
+    day = np.concatenate([slots['day'], slots['day']])
+    doctor = np.concatenate([slots['doctor'], slots['doctor']])
+    order = _event_order(day, doctor, time)
+    time, day, doctor = time[order], day[order], doctor[order]
+    appt = order % n
+    sign = np.where(order < n, 1, -1)
+    wasted = slots['wasted'][appt]
+    # Delta setiap hari-dokter berjumlah nol, jadi cumsum global = hitungan per hari-dokter
+    busy = np.cumsum(np.where(wasted, 0, sign))
+    lost = np.cumsum(np.where(wasted, sign, 0))
+
+    same = (day[1:] == day[:-1]) & (doctor[1:] == doctor[:-1]) & (time[1:] > time[:-1])
+    start, end = time[:-1][same], time[1:][same]
+    state = np.where(busy[:-1] > 0, PRODUCTIVE, np.where(lost[:-1] > 0, WASTED, IDLE))[same]
+    dept = slots['dept'][appt[:-1][same]].astype(np.int64)
+
+    segment, hour, minutes = _split_hours(start, end)
+    date, hour_of_day = hour // 24, hour % 24
+    dept, state = dept[segment], state[segment]
+    cell = ((dept * N_HOURS + hour_of_day) * len(DAYS) + (date + 3) % 7) * len(STATES) + state
+    slot_minutes = np.bincount(cell, weights=minutes, minlength=N_DEPTS * N_HOURS * len(DAYS)
+                               * len(STATES)).reshape(N_DEPTS, N_HOURS, len(DAYS), len(STATES))
+    lost = state == WASTED
+    wasted_cells, wasted_minutes = _reduce_cells(
+        (date[lost] * N_DEPTS + dept[lost]) * N_HOURS + hour_of_day[lost], minutes[lost])
+    return {'slot_minutes': slot_minutes, 'wasted_cells': wasted_cells,
+            'wasted_minutes': wasted_minutes}
+
+# ============================================================
+# CHUNKED PASS
+# ============================================================
+
+def _unsorted(path):
+    return ValueError(f"{Path(path).name}: log appointment harus terurut per tanggal Start_Time")
+
+
+def slice_occupancy(path, row_groups, batch_rows=BATCH_ROWS):
+    """(head, occupancy, tail) satu potongan file terurut tanggal.
+
+    Hanya hari yang pasti lengkap di potongan ini yang di-sweep; baris hari pertama
+    (head) & hari terakhir (tail) dikembalikan mentah untuk disambung dengan potongan
+    tetangga. Memori ~ satu batch + baris satu hari.
+    """
+    total, heads, tail, first, last = _empty(), [], None, None, None
+    for batch in iter_records(path, APPT_SLOT_COLUMNS, batch_rows, row_groups):
+        slots = slot_arrays(batch)
+        day = slots['day']
+        if not len(day):
+            continue
+        if np.any(day[1:] < day[:-1]) or (last is not None and day[0] < last):
+            raise _unsorted(path)
+        if first is None:
+            first = day[0]
+        if tail is not None:
+            slots = _concat([tail, slots])
+            day = slots['day']
+        last = day[-1]
+        head = day == first
+        end = (day == last) & ~head
+        heads.append(_take(slots, head))
+        total = _merge(total, sweep(_take(slots, ~(head | end))))
+        tail = _take(slots, end)
+    head = _concat(heads) if heads else None
+    return head, total, tail
+
+
+def _stitch(path_parts):
+    """Gabungkan hasil potongan berurutan: tail satu potongan + head potongan berikutnya
+    (hari yang sama) di-sweep bersama"""
+    total, pending = _empty(), None
+    for path, (head, part, tail) in path_parts:
+        total = _merge(total, part)
+        for rows in (head, tail):
+            if rows is None or not len(rows['day']):
+                continue
+            if pending is not None and rows['day'][0] == pending['day'][-1]:
+                pending = _concat([pending, rows])
+                continue
+            if pending is not None:
+                if rows['day'][0] < pending['day'][-1]:
+                    raise _unsorted(path)
+                total = _merge(total, sweep(pending))
+            pending = rows
+    if pending is not None:
+        total = _merge(total, sweep(pending))
+    return total
+
+
+def slice_walkins(path, row_groups, batch_rows=BATCH_ROWS):
+    """(sel, jumlah walk-in) satu potongan file wait-time"""
+    cells, counts = [np.zeros(0, np.int64)], [np.zeros(0)]
+    for batch in iter_records(path, WAIT_COLUMNS, batch_rows, row_groups):
+        (dept, hour, _, _, _), _, date = wait_codes(batch)
+        cell = (date.astype(np.int64) * N_DEPTS + dept) * N_HOURS + hour
+        c, n = np.unique(cell, return_counts=True)
+        cells.append(c)
+        counts.append(n.astype(np.float64))
+    return _reduce_cells(np.concatenate(cells), np.concatenate(counts))
+
+
+def backfill(wasted_cells, wasted_minutes, walkin_cells, walkin_counts,
+             service_minutes=DEFAULT_SERVICE_MINUTES):
+    """Menit terbuang yang terisi walk-in per (dept, jam, hari): di setiap sel
+    (tanggal, dept, jam) walk-in mengisi paling banyak min(menit terbuang, walk-in x durasi)"""
+    filled = np.zeros(len(wasted_cells))
+    if len(walkin_cells):
+        pos = np.minimum(np.searchsorted(walkin_cells, wasted_cells), len(walkin_cells) - 1)
+        demand = np.where(walkin_cells[pos] == wasted_cells,
+                          walkin_counts[pos] * service_minutes, 0)
+        filled = np.minimum(wasted_minutes, demand)
+    hour = wasted_cells % N_HOURS
+    dept = wasted_cells // N_HOURS % N_DEPTS
+    date = wasted_cells // (N_HOURS * N_DEPTS)
+    cell = (dept * N_HOURS + hour) * len(DAYS) + (date + 3) % 7
+    return np.bincount(cell, weights=filled, minlength=N_DEPTS * N_HOURS * len(DAYS)
+                       ).reshape(N_DEPTS, N_HOURS, len(DAYS))
+
+# ============================================================
+# ENTRY POINTS
+# ============================================================
+
+def has_slot_data(data_dir=None):
+    """Log appointment punya kolom jadwal (Doctor_ID, Start_Time, End_Time)"""
+    files = source_files(APPT_SOURCE, data_dir)
+    return bool(files) and all(set(APPT_SLOT_COLUMNS) <= set(file_columns(p)) for p in files)
+
+
+def slot_occupancy(data_dir=None, service_minutes=DEFAULT_SERVICE_MINUTES,
+                   workers=LOAD_WORKERS, batch_rows=BATCH_ROWS):
+    """{'slot_minutes': (dept, jam, hari, state), 'backfill_minutes': (dept, jam, hari)};
+    None jika log appointment tidak punya kolom jadwal"""
+    if not has_slot_data(data_dir):
+        return None
+    jobs = [(path, row_groups, batch_rows)
+            for path in source_files(APPT_SOURCE, data_dir)
+            for row_groups in record_slices(path, batch_rows)]
+    parts = parallel_map(slice_occupancy, jobs, workers)
+    total = _stitch(zip((job[0] for job in jobs), parts))
+    wasted_cells, wasted_minutes = _reduce_cells(total['wasted_cells'], total['wasted_minutes'])
+
+    jobs = [(path, row_groups, batch_rows)
+            for path in source_files(WAIT_SOURCE, data_dir)
+            for row_groups in record_slices(path, batch_rows)]
+    walkins = list(parallel_map(slice_walkins, jobs, workers))
+    walkin_cells, walkin_counts = _reduce_cells(
+        np.concatenate([np.zeros(0, np.int64)] + [c for c, _ in walkins]),
+        np.concatenate([np.zeros(0)] + [n for _, n in walkins]))
+    return {
+        'slot_minutes': total['slot_minutes'],
+        'backfill_minutes': backfill(wasted_cells, wasted_minutes, walkin_cells,
+                                     walkin_counts, service_minutes),
+    }
+
+
+def occupancy_frames(result):
+    """Jam-dokter per departemen, jam, dan hari: Produktif, Terbuang, Backfill (terisi
+    walk-in), Terbuang_Bersih, Idle"""
+    slot = result['slot_minutes'] / 60
+    filled = result['backfill_minutes'] / 60
+
+    def frame(label, labels, axes):
+        states, backfilled = slot.sum(axis=axes), filled.sum(axis=axes)
+        df = pd.DataFrame({label: labels})
+        for i, name in enumerate(STATES):
+            df[name] = np.round(states[:, i], 1)
+        df['Backfill'] = np.round(backfilled, 1)
+        df['Terbuang_Bersih'] = np.round(states[:, WASTED] - backfilled, 1)
+        return df[states.sum(axis=1) > 0].reset_index(drop=True)
+
+    return (frame('Department', DEPARTMENTS, (1, 2)),
+            frame('Hour', np.arange(N_HOURS), (0, 2)),
+            frame('Day', DAYS, (0, 1)))
+
+
+def occupancy_totals(result):
+    """Total jam-dokter per state + backfill"""
+    states = result['slot_minutes'].sum(axis=(0, 1, 2)) / 60
+    backfilled = float(result['backfill_minutes'].sum() / 60)
+    totals = {name: float(states[i]) for i, name in enumerate(STATES)}
+    totals['Backfill'] = backfilled
+    totals['Terbuang_Bersih'] = totals['Terbuang'] - backfilled
+    return totals
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Rekonstruksi occupancy slot dokter (sweep-line)")
+    parser.add_argument('--data-dir', default=None)
+    parser.add_argument('--service-minutes', type=float, default=DEFAULT_SERVICE_MINUTES,
+                        help="Menit dokter per pasien walk-in (untuk backfill)")
+    parser.add_argument('--workers', type=int, default=LOAD_WORKERS)
+    parser.add_argument('--batch-rows', type=int, default=BATCH_ROWS)
+    parser.add_argument('--pool', choices=POOL_KINDS, default='process',
+                        help="Jenis pool paralel (default: process; dashboard memakai thread)")
+    args = parser.parse_args()
+    set_load_pool(args.pool)
+
+    start = time.perf_counter()
+    result = slot_occupancy(args.data_dir, args.service_minutes, args.workers, args.batch_rows)
+    if result is None:
+        raise SystemExit("Log appointment tidak punya kolom Doctor_ID/Start_Time/End_Time")
+    totals = occupancy_totals(result)
+    print(f"Occupancy dihitung dalam {time.perf_counter() - start:.2f} s")
+    for name, hours in totals.items():
+        print(f"  {name:<16} {hours:12,.1f} jam-dokter")
+    for df in occupancy_frames(result):
+        print()
+        print(df.to_string(index=False))
@@ -0,0 +1,229 @@
+# INCREMENTAL PARTITION REFRESH
+# Partial aggregates per partisi harian, disimpan di disk dan di-key dengan fingerprint file
+
+import argparse
+import hashlib
+import os
+import pickle
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from data_loader import (APPT_COLUMNS, APPT_SOURCE, DATA_DIR, LOAD_WORKERS,
+                         WAIT_COLUMNS, WAIT_SOURCE, appt_partials, has_raw_data,
+                         merge_partials, parallel_map, record_slices, slice_partials,
+                         source_files, stream_partials, wait_partials)
+
+CACHE_DIRNAME = '.partials'
+# Naikkan jika isi partial aggregates berubah, supaya cache lama tidak ikut di-merge
+PARTIALS_VERSION = 7
+MANIFEST_NAME = f'manifest.v{PARTIALS_VERSION}.pkl'
+
+# Kolom tanggal yang menentukan partisi harian tiap sumber
+PARTITION_KEYS = {
+    WAIT_SOURCE: 'Visit_Date',
+    APPT_SOURCE: 'Appointment_Date',
+}
+
+PARTIAL_BUILDERS = {
+    WAIT_SOURCE: (WAIT_COLUMNS, wait_partials),
+    APPT_SOURCE: (APPT_COLUMNS, appt_partials),
+}
+
+# ============================================================
+# FINGERPRINTS
+# ============================================================
+
+def fingerprint(path):
+    """Fingerprint murah dari nama, ukuran, dan mtime file (tanpa membaca isinya)"""
+    stat = Path(path).stat()
+    key = f"{Path(path).name}:{stat.st_size}:{stat.st_mtime_ns}"
+    return hashlib.sha1(key.encode()).hexdigest()[:16]
+
+
+def data_fingerprint(data_dir=None):
+    """Fingerprint gabungan semua partisi; None jika data mentah tidak ada"""
+    if not has_raw_data(data_dir):
+        return None
+    digest = hashlib.sha1()
+    for source in PARTIAL_BUILDERS:
+        for path in source_files(source, data_dir):
+            digest.update(f"{source}/{path.name}={fingerprint(path)};".encode())
+    return digest.hexdigest()[:16]
+
+# ============================================================
+# PARTIAL AGGREGATE CACHE
+# ============================================================
+
+def _cache_dir(data_dir):
+    return (Path(data_dir) if data_dir is not None else DATA_DIR) / CACHE_DIRNAME
+
+
+def _atomic_write(path, write):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp, 'wb') as f:
+        write(f)
+    os.replace(tmp, path)
+
+
+def _cached_path(cache_dir, source, fp):
+    return cache_dir / source / f"{fp}.v{PARTIALS_VERSION}.npz"
+
+
+def _load_cached(cache_dir, source, fp):
+    path = _cached_path(cache_dir, source, fp)
+    if not path.exists():
+        return None
+    with np.load(path) as cached:
+        return {key: cached[key] for key in cached.files}
+
+
+def _save_cached(cache_dir, source, fp, partials):
+    _atomic_write(_cached_path(cache_dir, source, fp),
+                  lambda f: np.savez_compressed(f, **partials))
+
+
+def partition_partials(path, source, cache_dir):
+    """Partial aggregates satu partisi: dari cache jika fingerprint sama, selain itu hitung & simpan"""
+    fp = fingerprint(path)
+    partials = _load_cached(cache_dir, source, fp)
+    if partials is None:
+        columns, build = PARTIAL_BUILDERS[source]
+        partials = stream_partials(path, columns, build)
+        _save_cached(cache_dir, source, fp, partials)
+    return fp, partials
+
+
+def _missing_slice(path, row_groups, source, cache_dir, fp, whole):
+    """Partial aggregates satu potongan (di worker); partisi satu-potongan langsung disimpan
+    ke cache di worker sehingga kompresi npz ikut paralel, dan tidak dikirim balik"""
+    columns, build = PARTIAL_BUILDERS[source]
+    partials = slice_partials(path, row_groups, columns, build)
+    if whole:
+        _save_cached(cache_dir, source, fp, partials)
+        return {}
+    return partials
+
+
+def compute_missing(data_dir, cache_dir, workers=LOAD_WORKERS):
+    """Hitung semua partisi yang belum ada di cache, dari kedua sumber sekaligus:
+    potongan row group dibagi ke satu pool, lalu di-merge per partisi sesuai urutan.
+    Potongan satu partisi berurutan di jobs, jadi partisi yang lengkap langsung disimpan
+    ke cache dan dilepas: memori = satu partisi + hasil tertunda pool, bukan seluruh
+    partisi baru. Kembalikan jumlah partisi yang dihitung."""
+    jobs = []
+    for source in PARTIAL_BUILDERS:
+        for path in source_files(source, data_dir):
+            fp = fingerprint(path)
+            if _cached_path(cache_dir, source, fp).exists():
+                continue
+            slices = record_slices(path)
+            jobs += [(path, row_groups, source, cache_dir, fp, len(slices) == 1)
+                     for row_groups in slices]
+
+    def flush(owner, partials):
+        if owner is not None and not _cached_path(cache_dir, *owner).exists():
+            _save_cached(cache_dir, *owner, partials)
+
+    owner, current, computed = None, {}, 0
+    for job, partials in zip(jobs, parallel_map(_missing_slice, jobs, workers)):
+        if (job[2], job[4]) != owner:
+            flush(owner, current)
+            owner, current = (job[2], job[4]), {}
+            computed += 1
+        current = merge_partials(current, partials)
+    flush(owner, current)
+    return computed
+
+
+def _load_manifest(cache_dir):
+    path = cache_dir / MANIFEST_NAME
+    if not path.exists():
+        return {}
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+# ============================================================
+# REFRESH
+# ============================================================
+
+def _refresh_source(source, state, data_dir, cache_dir):
+    files = dict(state['files'])
+    totals = state['totals']
+    current = {path.relative_to(data_dir).as_posix(): path
+               for path in source_files(source, data_dir)}
+
+    # Partisi yang hilang/berubah: kurangkan kontribusi lamanya
+    for name, old_fp in state['files'].items():
+        path = current.get(name)
+        if path is not None and fingerprint(path) == old_fp:
+            continue
+        old = _load_cached(cache_dir, source, old_fp)
+        if old is None:
+            # Cache lama hilang, tidak bisa dikurangkan -> bangun ulang source ini
+            return _refresh_source(source, {'files': {}, 'totals': {}}, data_dir, cache_dir)
+        totals = merge_partials(totals, old, sign=-1)
+        del files[name]
+
+    # Partisi baru/berubah: tambahkan
+    for name, path in current.items():
+        if name not in files:
+            fp, partials = partition_partials(path, source, cache_dir)
+            totals = merge_partials(totals, partials)
+            files[name] = fp
+
+    return {'files': files, 'totals': totals}
+
+
+def refresh(data_dir=None, workers=LOAD_WORKERS):
+    """Fold hanya partisi baru/berubah ke total berjalan, lalu kembalikan total partial aggregates.
+    Partisi baru dari kedua sumber diagregasi paralel oleh `workers` worker parallel_map."""
+    data_dir = Path(data_dir) if data_dir is not None else DATA_DIR
+    cache_dir = _cache_dir(data_dir)
+    manifest = _load_manifest(cache_dir)
+    compute_missing(data_dir, cache_dir, workers)
+
+    totals = {}
+    changed = False
+    for source in PARTIAL_BUILDERS:
+        state = manifest.get(source, {'files': {}, 'totals': {}})
+        new_state = _refresh_source(source, state, data_dir, cache_dir)
+        changed |= new_state['files'] != state['files']
+        manifest[source] = new_state
+        totals.update(new_state['totals'])
+
+    if changed:
+        _atomic_write(cache_dir / MANIFEST_NAME, lambda f: pickle.dump(manifest, f))
+    return totals
+
+# ============================================================
+# PARTITIONING
+# ============================================================
+
+def split_by_day(path, source, data_dir=None):
+    """Pecah file tunggal menjadi partisi harian <source>/date=YYYY-MM-DD.parquet"""
+    data_dir = Path(data_dir) if data_dir is not None else DATA_DIR
+    path = Path(path)
+    key = PARTITION_KEYS[source]
+    records = (pd.read_parquet(path) if path.suffix == '.parquet'
+               else pd.read_csv(path, parse_dates=[key]))
+    out_dir = data_dir / source
+    out_dir.mkdir(parents=True, exist_ok=True)
+    written = []
+    for day, part in records.groupby(records[key].dt.normalize(), sort=True):
+        out = out_dir / f"date={day:%Y-%m-%d}.parquet"
+        _atomic_write(out, lambda f: part.to_parquet(f, index=False))
+        written.append(out)
+    return written
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Pecah data mentah menjadi partisi harian")
+    parser.add_argument('source', choices=sorted(PARTITION_KEYS))
+    parser.add_argument('path', help="File Parquet/CSV sumber")
+    parser.add_argument('--data-dir', default=None)
+    args = parser.parse_args()
+    files = split_by_day(args.path, args.source, args.data_dir)
+    print(f"{len(files)} partisi ditulis ke {files[0].parent if files else '-'}")
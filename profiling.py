@@ -0,0 +1,122 @@
+# RERUN PROFILING
+# Waktu & alokasi per tahap setiap rerun, riwayat p50/p95, dan log JSON terstruktur
+
+import json
+import os
+import socket
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+PROFILE_LOG = Path(os.environ.get("HOSPITAL_PROFILE_LOG", "logs/profile.jsonl"))
+HISTORY_SIZE = 200
+SMAPS_ROLLUP = Path('/proc/self/smaps_rollup')
+
+
+def process_memory():
+    """RSS proses dipecah shared (halaman dibagi dengan proses lain, mis. snapshot mmap) vs
+    private, dalam MB; None jika /proc/self/smaps_rollup tidak tersedia (non-Linux)"""
+    try:
+        text = SMAPS_ROLLUP.read_text()
+    except OSError:
+        return None
+    kb = {}
+    for line in text.splitlines():
+        parts = line.split()
+        if len(parts) == 3 and parts[2] == 'kB':
+            kb[parts[0].rstrip(':')] = int(parts[1])
+    shared = kb.get('Shared_Clean', 0) + kb.get('Shared_Dirty', 0)
+    private = kb.get('Private_Clean', 0) + kb.get('Private_Dirty', 0)
+    return {'rss_mb': round(kb.get('Rss', 0) / 1024, 1), 'shared_mb': round(shared / 1024, 1),
+            'private_mb': round(private / 1024, 1)}
+
+
+class RerunProfile:
+    """Kumpulan tahap (nama, detik, byte alokasi puncak) untuk satu rerun atau rerun fragment"""
+
+    def __init__(self, page, track_alloc=False, fragment=None):
+        self.page = page
+        self.fragment = fragment
+        self.started = time.time()
+        self.stages = []
+        # tracemalloc bersifat global per proses: alokasi mencakup thread sesi lain
+        self.track_alloc = track_alloc
+        if track_alloc and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextmanager
+    def stage(self, name):
+        if self.track_alloc:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            alloc = tracemalloc.get_traced_memory()[1] - base if self.track_alloc else None
+            self.stages.append((name, seconds, alloc))
+
+    def total(self):
+        return time.time() - self.started
+
+    def record(self):
+        return {
+            'ts': self.started,
+            'host': socket.gethostname(),
+            'pid': os.getpid(),
+            'page': self.page,
+            'fragment': self.fragment,
+            'total_s': round(self.total(), 6),
+            'memory': process_memory(),
+            'stages': [{'stage': name, 'seconds': round(seconds, 6), 'alloc_bytes': alloc}
+                       for name, seconds, alloc in self.stages],
+        }
+
+
+class ProfileStore:
+    """Riwayat rerun terakhir (dibagi antar sesi) + penulisan log JSON lines"""
+
+    def __init__(self, log_path=PROFILE_LOG, size=HISTORY_SIZE):
+        self.history = deque(maxlen=size)
+        self.log_path = Path(log_path)
+        self.lock = threading.Lock()
+
+    def add(self, profile):
+        record = profile.record()
+        with self.lock:
+            self.history.append(record)
+            self.log_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.log_path, 'a') as f:
+                f.write(json.dumps(record) + '\n')
+        return record
+
+    def summary(self):
+        """p50/p95 waktu (ms) dan alokasi (KB) per tahap atas riwayat rerun"""
+        with self.lock:
+            rows = [(s['stage'], s['seconds'], s['alloc_bytes'])
+                    for record in self.history for s in record['stages']]
+            # Total rerun penuh dan rerun per fragment dipisah
+            rows += [(f"TOTAL FRAGMENT {record['fragment']}" if record.get('fragment') else 'TOTAL RERUN',
+                      record['total_s'], None) for record in self.history]
+        if not rows:
+            return pd.DataFrame(columns=['Stage', 'Runs', 'p50_ms', 'p95_ms', 'p95_alloc_kb'])
+        df = pd.DataFrame(rows, columns=['Stage', 'Seconds', 'Alloc'])
+
+        def p95_alloc(values):
+            values = values.dropna()
+            return np.percentile(values, 95) / 1024 if len(values) else np.nan
+
+        return (df.groupby('Stage', sort=False)
+                  .agg(Runs=('Seconds', 'size'),
+                       p50_ms=('Seconds', lambda v: np.percentile(v, 50) * 1000),
+                       p95_ms=('Seconds', lambda v: np.percentile(v, 95) * 1000),
+                       p95_alloc_kb=('Alloc', p95_alloc))
+                  .reset_index()
+                  .round(2))
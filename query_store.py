@@ -0,0 +1,373 @@
+# QUERY STORE - SQLITE TERINDEKS
+# Rollup harian wait-time & appointment di SQLite; filter tanggal/departemen jadi range query terindeks
+
+import argparse
+import os
+import sqlite3
+import threading
+import time
+from itertools import repeat
+from pathlib import Path
+
+import numpy as np
+
+from data_loader import (APPT_COLUMNS, APPT_SOURCE, APPT_STATUSES, BATCH_ROWS,
+                         CUBE_SHAPE, DATA_DIR, DEPARTMENTS, LOAD_WORKERS, MAX_DOCTORS,
+                         N_HOURS, N_MONTHS, NO_DATE, POOL_KINDS, TRIAGE_CATEGORIES,
+                         WAIT_COLUMNS, WAIT_SOURCE, date_codes, iter_records, month_codes,
+                         parallel_map, record_slices, set_load_pool, source_files, wait_codes)
+from partitions import data_fingerprint, fingerprint
+
+STORE_NAME = 'store.sqlite'
+# Naikkan jika skema berubah, supaya store lama dibangun ulang
+STORE_VERSION = 3
+EPOCH = np.datetime64('1970-01-01', 'D')
+
+# Satu baris per (hari, dept, jam, triage, dokter) per file sumber: semua agregat dashboard
+# adalah sum/count, jadi rollup ini setara record-level untuk query dan jauh lebih kecil dari
+# data mentah. Primary key WITHOUT ROWID = index clustered (day, dept, hour, triage); kolom
+# part (file asal, lihat tabel parts) membuat partisi yang berubah bisa dihapus & diisi ulang
+# tanpa menyentuh partisi lain. Partisi harian tidak pernah berbagi hari, jadi tidak ada
+# baris ganda.
+SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE parts (
+    part INTEGER PRIMARY KEY,
+    source TEXT NOT NULL,
+    name TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    UNIQUE (source, name)
+);
+CREATE TABLE wait_cells (
+    day INTEGER NOT NULL,
+    dept INTEGER NOT NULL,
+    hour INTEGER NOT NULL,
+    triage INTEGER NOT NULL,
+    doctors INTEGER NOT NULL,
+    part INTEGER NOT NULL,
+    patients INTEGER NOT NULL,
+    wait_sum REAL NOT NULL,
+    PRIMARY KEY (day, dept, hour, triage, doctors, part)
+) WITHOUT ROWID;
+CREATE INDEX wait_cells_part ON wait_cells (part);
+CREATE TABLE appt_cells (
+    day INTEGER NOT NULL,
+    dept INTEGER NOT NULL,
+    status INTEGER NOT NULL,
+    part INTEGER NOT NULL,
+    n INTEGER NOT NULL,
+    PRIMARY KEY (day, dept, status, part)
+) WITHOUT ROWID;
+CREATE INDEX appt_cells_part ON appt_cells (part);
+"""
+
+UPSERT_WAIT = """
+INSERT INTO wait_cells (part, day, dept, hour, triage, doctors, patients, wait_sum)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (day, dept, hour, triage, doctors, part) DO UPDATE SET
+    patients = patients + excluded.patients,
+    wait_sum = wait_sum + excluded.wait_sum
+"""
+UPSERT_APPT = """
+INSERT INTO appt_cells (part, day, dept, status, n) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (day, dept, status, part) DO UPDATE SET n = n + excluded.n
+"""
+
+# Update in place menunggu writer lain (precompute/proses dashboard lain) selesai
+UPDATE_TIMEOUT = 600
+
+# ============================================================
+# BUILD
+# ============================================================
+
+def store_path(data_dir=None):
+    return (Path(data_dir) if data_dir is not None else DATA_DIR) / STORE_NAME
+
+
+def _rollup(columns, shape, weights=None):
+    """Kelompokkan kode per sel unik: (kolom kode per sel, count, sum weights)"""
+    base = columns[0].min()
+    shape = (int(columns[0].max() - base) + 1,) + shape
+    key = np.ravel_multi_index((columns[0].astype(np.int64) - base,) + columns[1:], shape)
+    cells, inverse = np.unique(key, return_inverse=True)
+    decoded = list(np.unravel_index(cells, shape))
+    decoded[0] = decoded[0] + base
+    counts = np.bincount(inverse)
+    sums = np.bincount(inverse, weights=weights) if weights is not None else None
+    return decoded, counts, sums
+
+
+def _wait_rows(records):
+    """Kolom baris wait_cells (array per kolom) dari satu batch"""
+    (dept, hour, _, triage, doctors), wait, date = wait_codes(records)
+    if not len(date):
+        return ()
+    (day, dept, hour, triage, doctors), counts, sums = _rollup(
+        (date, dept, hour, triage, doctors),
+        (len(DEPARTMENTS), N_HOURS, len(TRIAGE_CATEGORIES), MAX_DOCTORS + 1), wait)
+    return day, dept, hour, triage, doctors, counts, sums
+
+
+def _appt_rows(records):
+    """Kolom baris appt_cells (array per kolom) dari satu batch"""
+    status = records['Status']
+    # Departemen kosong disimpan sebagai dept -1: ikut total status, tidak ikut filter departemen
+    dept = records['Department'].astype(np.int64) + 1
+    date = records['Appointment_Date']
+    valid = (status >= 0) & (date != NO_DATE)
+    if not valid.any():
+        return ()
+    (day, dept, status), counts, _ = _rollup(
+        (date[valid], dept[valid], status[valid].astype(np.int64)),
+        (len(DEPARTMENTS) + 1, len(APPT_STATUSES)))
+    return day, dept - 1, status, counts
+
+
+def _slice_rows(path, row_groups, columns, rows, batch_rows=BATCH_ROWS):
+    """Rollup per batch untuk satu potongan file (dijalankan di worker pool)"""
+    return [rows(batch) for batch in iter_records(path, columns, batch_rows, row_groups)]
+
+
+# Sumber -> (kolom record, upsert, rollup batch)
+STORE_SOURCES = {
+    WAIT_SOURCE: (WAIT_COLUMNS, UPSERT_WAIT, _wait_rows),
+    APPT_SOURCE: (APPT_COLUMNS, UPSERT_APPT, _appt_rows),
+}
+
+
+def _sync_parts(conn, data_dir, batch_rows=BATCH_ROWS, workers=LOAD_WORKERS):
+    """Samakan isi store dengan file sumber: baris partisi yang hilang/berubah dihapus,
+    partisi baru/berubah di-rollup (paralel) lalu di-upsert berurutan sesuai urutan potongan.
+    Kembalikan jumlah partisi yang di-rollup."""
+    data_dir = Path(data_dir) if data_dir is not None else DATA_DIR
+    stored = {(source, name): (part, fp) for part, source, name, fp
+              in conn.execute("SELECT part, source, name, fingerprint FROM parts")}
+    current = {(source, path.relative_to(data_dir).as_posix()): (path, fingerprint(path))
+               for source in STORE_SOURCES for path in source_files(source, data_dir)}
+
+    for key, (part, fp) in stored.items():
+        if key not in current or current[key][1] != fp:
+            for table in ('wait_cells', 'appt_cells', 'parts'):
+                conn.execute(f"DELETE FROM {table} WHERE part = ?", (part,))
+
+    targets, jobs = [], []
+    for (source, name), (path, fp) in current.items():
+        if stored.get((source, name), (None, None))[1] == fp:
+            continue
+        part = conn.execute("INSERT INTO parts (source, name, fingerprint) VALUES (?, ?, ?)",
+                            (source, name, fp)).lastrowid
+        columns, upsert, rows = STORE_SOURCES[source]
+        for row_groups in record_slices(path, batch_rows):
+            targets.append((upsert, part))
+            jobs.append((path, row_groups, columns, rows, batch_rows))
+    for (upsert, part), batches in zip(targets, parallel_map(_slice_rows, jobs, workers)):
+        for cells in batches:
+            conn.executemany(upsert, zip(repeat(part), *(column.tolist() for column in cells)))
+
+    conn.execute("INSERT OR REPLACE INTO meta VALUES ('fingerprint', ?)",
+                 (data_fingerprint(data_dir),))
+    return len({part for _, part in targets})
+
+
+def build_store(data_dir=None, path=None, batch_rows=BATCH_ROWS, workers=LOAD_WORKERS):
+    """Bangun ulang store dari data mentah; ditulis ke file sementara lalu diganti atomik"""
+    path = Path(path) if path is not None else store_path(data_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.unlink(missing_ok=True)
+
+    conn = sqlite3.connect(tmp)
+    try:
+        conn.executescript("PRAGMA journal_mode = OFF; PRAGMA synchronous = OFF;" + SCHEMA)
+        conn.execute("INSERT INTO meta VALUES ('version', ?)", (str(STORE_VERSION),))
+        _sync_parts(conn, data_dir, batch_rows, workers)
+        conn.commit()
+        conn.execute("ANALYZE")
+    finally:
+        conn.close()
+    os.replace(tmp, path)
+    return path
+
+
+def update_store(data_dir=None, path=None, batch_rows=BATCH_ROWS, workers=LOAD_WORKERS):
+    """Perbarui store in place: hanya partisi yang fingerprint-nya berubah yang di-rollup.
+    Satu transaksi IMMEDIATE: pembaca tetap melihat isi lama sampai commit, dan writer kedua
+    menunggu lalu tidak mengulang pekerjaan yang sama. Kembalikan jumlah partisi yang di-rollup."""
+    path = Path(path) if path is not None else store_path(data_dir)
+    conn = sqlite3.connect(path, timeout=UPDATE_TIMEOUT, isolation_level=None)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        current = conn.execute("SELECT value FROM meta WHERE key = 'fingerprint'").fetchone()
+        if current is not None and current[0] == data_fingerprint(data_dir):
+            conn.execute("COMMIT")
+            return 0
+        changed = _sync_parts(conn, data_dir, batch_rows, workers)
+        conn.execute("COMMIT")
+        conn.execute("PRAGMA optimize")
+        return changed
+    finally:
+        conn.close()
+
+
+def ensure_store(data_dir=None, workers=LOAD_WORKERS):
+    """QueryStore yang sesuai data mentah saat ini; None tanpa data. Store usang diperbarui
+    per partisi, dibangun ulang penuh hanya jika belum ada atau versi skemanya lama."""
+    fingerprint = data_fingerprint(data_dir)
+    if fingerprint is None:
+        return None
+    path = store_path(data_dir)
+    if path.exists():
+        store = QueryStore(path)
+        version, current = store.meta.get('version'), store.fingerprint
+        store.close()
+        if version == str(STORE_VERSION):
+            if current != fingerprint:
+                update_store(data_dir, path, workers=workers)
+            return QueryStore(path)
+    build_store(data_dir, path, workers=workers)
+    return QueryStore(path)
+
+# ============================================================
+# QUERY
+# ============================================================
+
+def _in(column, values):
+    # Nilai selalu kode int hasil encode, aman di-inline ke SQL
+    return f"{column} IN ({', '.join(str(int(v)) for v in values)})"
+
+
+class QueryStore:
+    """Koneksi read-only ke store, dibagi ke semua thread sesi"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+        self.lock = threading.Lock()
+        self.meta = dict(self.conn.execute("SELECT key, value FROM meta"))
+        self.fingerprint = self.meta.get('fingerprint')
+        self.first_day, self.last_day = self.conn.execute(
+            """SELECT MIN(lo), MAX(hi) FROM (SELECT MIN(day) AS lo, MAX(day) AS hi FROM wait_cells
+                                             UNION ALL
+                                             SELECT MIN(day), MAX(day) FROM appt_cells)""").fetchone()
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    def date_range(self):
+        """(tanggal pertama, tanggal terakhir) data sebagai datetime.date"""
+        if self.first_day is None:
+            return None
+        return ((EPOCH + self.first_day).item(), (EPOCH + self.last_day).item())
+
+    def _where(self, start=None, end=None, departments=None, hours=None, triage=None):
+        """Klausa WHERE; rentang hari = satu range scan di prefix day index
+        (day, dept, hour, triage), sisanya disaring di baris yang terbaca"""
+        clauses = []
+        if start is not None or end is not None:
+            first = date_codes([start])[0] if start is not None else self.first_day
+            last = date_codes([end])[0] if end is not None else self.last_day
+            first, last = max(first, self.first_day), min(last, self.last_day)
+            clauses.append(f"day BETWEEN {int(first)} AND {int(last)}" if first <= last else '0')
+        if departments:
+            clauses.append(_in('dept', [DEPARTMENTS.index(d) for d in departments]))
+        if hours:
+            clauses.append(_in('hour', hours))
+        if triage:
+            clauses.append(_in('triage', [TRIAGE_CATEGORIES.index(t) for t in triage]))
+        return f"WHERE {' AND '.join(clauses)}" if clauses else ''
+
+    def summary(self, start=None, end=None, departments=None, hours=None, triage=None):
+        """Rata-rata wait & jumlah pasien untuk satu kombinasi filter"""
+        where = self._where(start, end, departments, hours, triage)
+        with self.lock:
+            total, count = self.conn.execute(
+                f"SELECT SUM(wait_sum), SUM(patients) FROM wait_cells {where}").fetchone()
+        count = count or 0
+        return (total / count if count else float('nan')), count
+
+    def daily(self, since=None):
+        """Agregat per (hari, dept, jam) dan (hari, dept, status) untuk hari > since.
+
+        Kolom wait: day, dept, hour, patients, wait_sum, staff_sum (jumlah dokter on shift
+        per pasien); kolom appointment: day, dept, status, n.
+        """
+        where = f"WHERE day > {int(since)}" if since is not None else ''
+        with self.lock:
+            wait = np.array(self.conn.execute(
+                f"""SELECT day, dept, hour, SUM(patients), SUM(wait_sum), SUM(doctors * patients)
+                    FROM wait_cells {where} GROUP BY 1, 2, 3""").fetchall(),
+                dtype=np.float64).reshape(-1, 6)
+            appts = np.array(self.conn.execute(
+                f"SELECT day, dept, status, SUM(n) FROM appt_cells {where} GROUP BY 1, 2, 3"
+            ).fetchall(), dtype=np.int64).reshape(-1, 4)
+        return wait, appts
+
+    def partials(self, start=None, end=None, departments=None):
+        """Partial aggregates (format sama dengan partitions.refresh, tanpa sketch) untuk
+        rentang tanggal & departemen; agregasi GROUP BY dijalankan di SQLite"""
+        where = self._where(start, end, departments)
+        with self.lock:
+            cells = np.array(self.conn.execute(
+                f"""SELECT dept, hour, (day + 3) % 7, triage, doctors, SUM(patients), SUM(wait_sum)
+                    FROM wait_cells {where} GROUP BY 1, 2, 3, 4, 5""").fetchall(),
+                dtype=np.float64).reshape(-1, 7)
+            appts = np.array(self.conn.execute(
+                f"SELECT day, dept, status, SUM(n) FROM appt_cells {where} GROUP BY 1, 2, 3"
+            ).fetchall(), dtype=np.int64).reshape(-1, 4)
+
+        index = tuple(cells[:, :5].astype(np.int64).T)
+        cube_sum = np.zeros(CUBE_SHAPE)
+        cube_count = np.zeros(CUBE_SHAPE, dtype=np.int64)
+        cube_sum[index] = cells[:, 6]
+        cube_count[index] = cells[:, 5].astype(np.int64)
+
+        day, dept, status, n = appts.T
+        n_status = len(APPT_STATUSES)
+        month = month_codes(EPOCH + day)
+        with_dept = dept >= 0
+        return {
+            'cube_sum': cube_sum,
+            'cube_count': cube_count,
+            'status_count': np.bincount(status, weights=n, minlength=n_status).astype(np.int64),
+            'dept_status': np.bincount(dept[with_dept] * n_status + status[with_dept],
+                                       weights=n[with_dept], minlength=len(DEPARTMENTS) * n_status
+                                       ).astype(np.int64).reshape(len(DEPARTMENTS), n_status),
+            'month_status': np.bincount(month * n_status + status, weights=n,
+                                        minlength=N_MONTHS * n_status
+                                        ).astype(np.int64).reshape(N_MONTHS, n_status),
+        }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Bangun / query store SQLite terindeks")
+    parser.add_argument('--data-dir', default=None)
+    parser.add_argument('--rebuild', action='store_true', help="Paksa bangun ulang store")
+    parser.add_argument('--start', help="Tanggal awal YYYY-MM-DD")
+    parser.add_argument('--end', help="Tanggal akhir YYYY-MM-DD")
+    parser.add_argument('--dept', nargs='*', default=[], help="Departemen")
+    parser.add_argument('--hours', nargs='*', type=int, default=[], help="Jam kedatangan")
+    parser.add_argument('--triage', nargs='*', default=[], help="Kategori triage")
+    parser.add_argument('--workers', type=int, default=LOAD_WORKERS,
+                        help="Jumlah worker build paralel (default: HOSPITAL_LOAD_WORKERS)")
+    parser.add_argument('--pool', choices=POOL_KINDS, default='process',
+                        help="Jenis pool paralel (default: process; dashboard memakai thread)")
+    args = parser.parse_args()
+    set_load_pool(args.pool)
+
+    start = time.perf_counter()
+    if args.rebuild:
+        build_store(args.data_dir, workers=args.workers)
+    store = ensure_store(args.data_dir, args.workers)
+    if store is None:
+        raise SystemExit("Data mentah tidak ditemukan")
+    print(f"Store {store.path} siap dalam {time.perf_counter() - start:.2f} s, "
+          f"periode {store.date_range()}")
+
+    start = time.perf_counter()
+    avg_wait, n_patients = store.summary(
+        np.datetime64(args.start) if args.start else None,
+        np.datetime64(args.end) if args.end else None,
+        args.dept, args.hours, args.triage)
+    print(f"Rata-rata wait {avg_wait:.1f} menit, {n_patients:,} pasien "
+          f"({(time.perf_counter() - start) * 1000:.2f} ms)")
@@ -0,0 +1,122 @@
+# QUEUE SIMULATOR - WHAT-IF STAFFING
+# Discrete-event simulation satu hari kedatangan pasien terhadap roster dokter per jam
+
+import heapq
+import os
+
+import numpy as np
+import pandas as pd
+
+from data_loader import DEFAULT_DAYS, LOAD_WORKERS, TRIAGE_CATEGORIES, pool_executor
+
+DEFAULT_SERVICE_MINUTES = 60
+SIM_WORKERS = int(os.environ.get("HOSPITAL_SIM_WORKERS", LOAD_WORKERS))
+
+# ============================================================
+# SINGLE REPLICATION
+# ============================================================
+
+def simulate_day(rates, mix, schedule, service_minutes, rng):
+    """Satu replikasi: kembalikan (jam kedatangan, wait menit) tiap pasien.
+
+    Antrian prioritas triage (Immediate dulu), tanpa preemption. Jumlah dokter
+    berubah di batas jam; setelah jam terakhir roster jam terakhir (minimal 1
+    dokter) lanjut sampai antrian habis, jadi setiap pasien punya wait.
+    """
+    hours = np.arange(len(rates))
+    counts = rng.poisson(rates)
+    arrival_hour = np.repeat(hours, counts)
+    arrivals = (arrival_hour + rng.random(counts.sum())) * 60
+    order = np.argsort(arrivals, kind='stable')
+    arrivals, arrival_hour = arrivals[order], arrival_hour[order]
+    priority = rng.choice(len(mix), size=len(arrivals), p=mix)
+    service = rng.exponential(service_minutes, size=len(arrivals))
+    wait = np.full(len(arrivals), np.nan)
+
+    def capacity(t):
+        hour = int(t // 60)
+        return schedule[hour] if hour < len(schedule) else max(schedule[-1], 1)
+
+    # Event: (waktu, jenis, pasien); jenis 0=selesai, 1=batas jam (termasuk tutup), 2=datang
+    events = [(t, 2, i) for i, t in enumerate(arrivals)]
+    events += [(h * 60.0, 1, -1) for h in range(1, len(schedule) + 1)]
+    heapq.heapify(events)
+    queue, busy = [], 0
+
+    while events:
+        now, kind, patient = heapq.heappop(events)
+        if kind == 0:
+            busy -= 1
+        elif kind == 2:
+            heapq.heappush(queue, (priority[patient], arrivals[patient], patient))
+        while queue and busy < capacity(now):
+            _, arrived, nxt = heapq.heappop(queue)
+            wait[nxt] = now - arrived
+            busy += 1
+            heapq.heappush(events, (now + service[nxt], 0, nxt))
+
+    return arrival_hour, wait
+
+
+def _run_batch(args):
+    rates, mix, schedule, service_minutes, seed, n = args
+    rng = np.random.default_rng(seed)
+    n_hours = len(rates)
+    waits = [[] for _ in range(n_hours)]
+    means = np.full((n, n_hours), np.nan)
+    for r in range(n):
+        hour, wait = simulate_day(rates, mix, schedule, service_minutes, rng)
+        for h in range(n_hours):
+            w = wait[hour == h]
+            waits[h].append(w)
+            if len(w):
+                means[r, h] = w.mean()
+    return [np.concatenate(w) for w in waits], means
+
+# ============================================================
+# MONTE CARLO
+# ============================================================
+
+def simulate_roster(hour_df, triage_df, schedule, replications=200,
+                    service_minutes=DEFAULT_SERVICE_MINUTES, days=DEFAULT_DAYS,
+                    workers=SIM_WORKERS, seed=0):
+    """Proyeksi distribusi wait per jam untuk roster `schedule` (dokter per baris hour_df).
+
+    Laju kedatangan per jam = Volume / days, campuran triage dari triage_df.
+    Replikasi dibagi ke pool_executor; hasil identik untuk seed yang sama
+    berapa pun jumlah worker.
+    """
+    rates = hour_df['Volume'].to_numpy(np.float64) / days
+    counts = triage_df.set_index('Category')['Count'].reindex(TRIAGE_CATEGORIES).fillna(0)
+    mix = counts.to_numpy(np.float64) / counts.sum()
+    schedule = [max(int(c), 0) for c in schedule]
+
+    # Batch tetap per seed anak -> hasil tidak bergantung jumlah worker
+    n_batches = min(replications, 32)
+    sizes = np.diff(np.linspace(0, replications, n_batches + 1).astype(int))
+    seeds = np.random.SeedSequence(seed).spawn(n_batches)
+    jobs = [(rates, mix, schedule, service_minutes, s, int(n)) for s, n in zip(seeds, sizes)]
+
+    if workers > 1 and n_batches > 1:
+        with pool_executor(min(workers, n_batches)) as pool:
+            results = list(pool.map(_run_batch, jobs))
+    else:
+        results = [_run_batch(job) for job in jobs]
+
+    n_hours = len(rates)
+    waits = [np.concatenate([res[0][h] for res in results]) for h in range(n_hours)]
+    means = np.vstack([res[1] for res in results])
+
+    def pct(values, q):
+        return float(np.percentile(values, q)) if len(values) else np.nan
+
+    summary = pd.DataFrame({
+        'Hour': hour_df['Hour'].to_numpy(),
+        'Doctors': schedule,
+        'Mean_Wait': [float(w.mean()) if len(w) else np.nan for w in waits],
+        'P50': [pct(w, 50) for w in waits],
+        'P90': [pct(w, 90) for w in waits],
+        'P95': [pct(w, 95) for w in waits],
+        'Patients_Per_Day': [len(w) / replications for w in waits],
+    })
+    return summary, means
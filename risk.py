@@ -0,0 +1,469 @@
+# NO-SHOW RISK - SCORING
+# Model logistik ringan (NumPy) atas fitur appointment: lead time, hari, jam, departemen, riwayat
+# pasien; scoring appointment book ke depan per batch -> expected waste per slot untuk overbooking
+#
+#   python risk.py --data-dir data --workers 4
+
+import argparse
+import hashlib
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from appointment_stream import WASTE_STATUSES
+from data_loader import (APPT_RISK_COLUMNS, APPT_SOURCE, APPT_STATUSES, BATCH_ROWS,
+                         BOOK_RISK_COLUMNS, BOOK_SOURCE, DATA_DIR, DAYS, DEPARTMENTS,
+                         LOAD_WORKERS, N_HOURS, NO_DATE, POOL_KINDS, file_columns, iter_records,
+                         parallel_map, record_slices, set_load_pool, source_files)
+from partitions import CACHE_DIRNAME, fingerprint
+
+RISK_DIRNAME = 'risk'
+# Naikkan jika isi tabel fitur / layout model berubah, supaya cache lama tidak dipakai
+FEATURES_VERSION = 2
+# Sampel latih maksimum (bottom-k kunci acak: sampel seragam dari gabungan semua file)
+TRAIN_ROWS = int(os.environ.get("HOSPITAL_RISK_TRAIN_ROWS", 200_000))
+# Bagian hari terakhir sampel yang dipakai validasi (split temporal)
+VALIDATION_SHARE = 0.2
+RIDGE = 1.0
+MAX_ITER = 25
+LEAD_CAP = 365
+# Bin histogram probabilitas risiko hasil scoring
+RISK_BINS = 20
+WASTE_CODES = [APPT_STATUSES.index(s) for s in WASTE_STATUSES]
+N_DEPTS = len(DEPARTMENTS)
+
+# Layout koefisien: fitur numerik lalu blok one-hot per kategori
+NUMERIC = ['intercept', 'lead_log', 'same_day', 'visits_log', 'waste_rate', 'new_patient']
+ONE_HOT = {'dept': N_DEPTS, 'weekday': len(DAYS), 'hour': N_HOURS}
+N_FEATURES = len(NUMERIC) + sum(ONE_HOT.values())
+SAMPLE_FIELDS = ['key', 'day', 'lead', 'hour', 'dept', 'patient', 'label',
+                 'prior_visits', 'prior_wasted']
+
+# Tabel fitur satu potongan/file: total riwayat per pasien ('patients' terurut, 'visits',
+# 'wasted') + sampel baris berfitur (SAMPLE_FIELDS). prior_* = riwayat pasien sebelum baris
+# itu di dalam potongan yang sama; riwayat dari potongan sebelumnya ditambahkan saat merge.
+
+# ============================================================
+# FEATURES
+# ============================================================
+
+def booking_features(records):
+    """Fitur dasar bervektor dari CodedRecords (log atau book); baris tanpa departemen atau
+    tanggal dibuang"""
+    day = records['Appointment_Date']
+    valid = (records['Department'] >= 0) & (day != NO_DATE) & (records['Booking_Date'] != NO_DATE)
+    if 'Status' in records.columns:
+        valid &= records['Status'] >= 0
+    day = day[valid]
+    lead = np.clip(day - records['Booking_Date'][valid], 0, LEAD_CAP)
+    features = {
+        'day': day,
+        'lead': lead.astype(np.int16),
+        'hour': (records['Start_Time'][valid] // 60 % N_HOURS).astype(np.int8),
+        'dept': records['Department'][valid],
+        'patient': records['Patient_ID'][valid],
+    }
+    if 'Status' in records.columns:
+        features['label'] = np.isin(records['Status'][valid], WASTE_CODES)
+    return features
+
+
+def history_lookup(history, patient):
+    """(kunjungan, terbuang) riwayat per pasien dari tabel terurut (patients, visits, wasted)"""
+    ids, visits, wasted = history
+    if not len(ids):
+        zeros = np.zeros(len(patient), np.int64)
+        return zeros, zeros
+    pos = np.minimum(np.searchsorted(ids, patient), len(ids) - 1)
+    hit = ids[pos] == patient
+    return np.where(hit, visits[pos], 0), np.where(hit, wasted[pos], 0)
+
+
+def _numeric(features, visits, wasted):
+    lead = features['lead'].astype(np.float64)
+    return [np.ones(len(lead)), np.log1p(lead), (lead == 0).astype(np.float64),
+            np.log1p(visits), wasted / np.maximum(visits, 1), (visits == 0).astype(np.float64)]
+
+
+def _codes(features):
+    return {'dept': features['dept'], 'weekday': (features['day'] + 3) % 7,
+            'hour': features['hour']}
+
+
+def design(features, visits, wasted):
+    """Matriks desain (n, N_FEATURES) untuk training"""
+    X = np.zeros((len(features['day']), N_FEATURES))
+    X[:, :len(NUMERIC)] = np.column_stack(_numeric(features, visits, wasted))
+    offset, rows = len(NUMERIC), np.arange(len(X))
+    for name, codes in _codes(features).items():
+        X[rows, offset + codes] = 1
+        offset += ONE_HOT[name]
+    return X
+
+
+def logits(features, visits, wasted, coef):
+    """X @ coef tanpa membentuk X: fitur numerik + lookup koefisien one-hot (scoring cepat)"""
+    z = sum(coef[i] * column for i, column in enumerate(_numeric(features, visits, wasted)))
+    offset = len(NUMERIC)
+    for name, codes in _codes(features).items():
+        z = z + coef[offset:offset + ONE_HOT[name]][codes]
+        offset += ONE_HOT[name]
+    return z
+
+
+def sigmoid(z):
+    return 1 / (1 + np.exp(-np.clip(z, -30, 30)))
+
+# ============================================================
+# FEATURE TABLES (INCREMENTAL)
+# ============================================================
+
+def _reduce_counts(ids, visits, wasted):
+    ids, inverse = np.unique(ids, return_inverse=True)
+    return (ids, np.bincount(inverse, weights=visits, minlength=len(ids)).astype(np.int64),
+            np.bincount(inverse, weights=wasted, minlength=len(ids)).astype(np.int64))
+
+
+def _prior_in_batch(patient, label):
+    """Jumlah kunjungan & terbuang pasien yang sama sebelum setiap baris di batch (urutan file)"""
+    order = np.argsort(patient, kind='stable')
+    sorted_ids, sorted_label = patient[order], label[order].astype(np.int64)
+    first = np.r_[True, sorted_ids[1:] != sorted_ids[:-1]]
+    group_start = np.maximum.accumulate(np.where(first, np.arange(len(order)), 0))
+    cum = np.cumsum(sorted_label) - sorted_label
+    visits, wasted = np.empty(len(order), np.int64), np.empty(len(order), np.int64)
+    visits[order] = np.arange(len(order)) - group_start
+    wasted[order] = cum - cum[group_start]
+    return visits, wasted
+
+
+def _bottom_k(sample, k):
+    if len(sample['key']) <= k:
+        return sample
+    keep = np.argpartition(sample['key'], k)[:k]
+    return {name: values[keep] for name, values in sample.items()}
+
+
+def _empty_sample():
+    return {'key': np.zeros(0), 'day': np.zeros(0, np.int32), 'lead': np.zeros(0, np.int16),
+            'hour': np.zeros(0, np.int8), 'dept': np.zeros(0, np.int8),
+            'patient': np.zeros(0, np.int64), 'label': np.zeros(0, bool),
+            'prior_visits': np.zeros(0, np.int64), 'prior_wasted': np.zeros(0, np.int64)}
+
+
+def _concat(samples):
+    return {name: np.concatenate([s[name] for s in samples]) for name in SAMPLE_FIELDS}
+
+
+def slice_features(path, row_groups, seed, train_rows=TRAIN_ROWS, batch_rows=BATCH_ROWS):
+    """Tabel fitur satu potongan log appointment (di worker): riwayat pasien dihitung
+    berurutan per batch, sampel dijaga <= train_rows lewat bottom-k"""
+    rng = np.random.default_rng(seed)
+    history = (np.zeros(0, np.int64), np.zeros(0, np.int64), np.zeros(0, np.int64))
+    sample = _empty_sample()
+    for batch in iter_records(path, APPT_RISK_COLUMNS, batch_rows, row_groups):
+        features = booking_features(batch)
+        patient, label = features['patient'], features['label']
+        before_visits, before_wasted = history_lookup(history, patient)
+        in_visits, in_wasted = _prior_in_batch(patient, label)
+        features.update(key=rng.random(len(patient)), prior_visits=before_visits + in_visits,
+                        prior_wasted=before_wasted + in_wasted)
+        history = _reduce_counts(np.concatenate([history[0], patient]),
+                                 np.concatenate([history[1], np.ones(len(patient))]),
+                                 np.concatenate([history[2], label]))
+        sample = _bottom_k(_concat([sample, features]), train_rows)
+    return {'patients': history[0], 'visits': history[1], 'wasted': history[2], **sample}
+
+
+def merge_tables(tables, train_rows=TRAIN_ROWS):
+    """Gabungkan tabel fitur berurutan (potongan satu file, atau file-file log): riwayat
+    tabel sebelumnya ditambahkan ke prior_* sampel tabel berikutnya"""
+    samples = [{name: table[name] for name in SAMPLE_FIELDS} for table in tables]
+    keys = np.unique(np.concatenate([np.zeros(0, np.int64)] + [s['patient'] for s in samples]))
+    visits, wasted = np.zeros(len(keys), np.int64), np.zeros(len(keys), np.int64)
+    for table, sample in zip(tables, samples):
+        pos = np.searchsorted(keys, sample['patient'])
+        sample['prior_visits'] = sample['prior_visits'] + visits[pos]
+        sample['prior_wasted'] = sample['prior_wasted'] + wasted[pos]
+        more_visits, more_wasted = history_lookup(
+            (table['patients'], table['visits'], table['wasted']), keys)
+        visits += more_visits
+        wasted += more_wasted
+    patients, visits, wasted = _reduce_counts(
+        *(np.concatenate([np.zeros(0, np.int64)] + [t[name] for t in tables])
+          for name in ('patients', 'visits', 'wasted')))
+    sample = _bottom_k(_concat(samples) if samples else _empty_sample(), train_rows)
+    return {'patients': patients, 'visits': visits, 'wasted': wasted, **sample}
+
+
+def _risk_dir(data_dir):
+    return (Path(data_dir) if data_dir is not None else DATA_DIR) / CACHE_DIRNAME / RISK_DIRNAME
+
+
+def _save(path, arrays):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp, 'wb') as f:
+        np.savez(f, **arrays)
+    os.replace(tmp, path)
+
+
+def _load(path):
+    if not path.exists():
+        return None
+    with np.load(path) as cached:
+        return {key: cached[key] for key in cached.files}
+
+
+def feature_tables(data_dir=None, train_rows=TRAIN_ROWS, workers=LOAD_WORKERS,
+                   batch_rows=BATCH_ROWS):
+    """Tabel fitur per file log (urut file), di-cache per fingerprint file: hanya file
+    baru/berubah yang dibaca ulang, potongannya dihitung paralel"""
+    cache_dir = _risk_dir(data_dir)
+    files = source_files(APPT_SOURCE, data_dir)
+    tables, paths, jobs = {}, {}, []
+    for path in files:
+        fp = fingerprint(path)
+        paths[path] = cache_dir / f"{fp}.{train_rows}.v{FEATURES_VERSION}.npz"
+        tables[path] = _load(paths[path])
+        if tables[path] is None:
+            jobs += [(path, row_groups, (int(fp, 16), i), train_rows, batch_rows)
+                     for i, row_groups in enumerate(record_slices(path, batch_rows))]
+
+    parts = {}
+    for job, table in zip(jobs, parallel_map(slice_features, jobs, workers)):
+        parts.setdefault(job[0], []).append(table)
+    for path, slices in parts.items():
+        tables[path] = merge_tables(slices, train_rows)
+        _save(paths[path], tables[path])
+    return [tables[path] for path in files]
+
+# ============================================================
+# MODEL
+# ============================================================
+
+def fit_logistic(X, y, ridge=RIDGE, max_iter=MAX_ITER, tol=1e-6):
+    """Regresi logistik L2 (intercept tidak dipenalti) dengan Newton-Raphson / IRLS"""
+    penalty = np.full(X.shape[1], ridge)
+    penalty[0] = 0
+    coef = np.zeros(X.shape[1])
+    for _ in range(max_iter):
+        p = sigmoid(X @ coef)
+        grad = X.T @ (p - y) + penalty * coef
+        hessian = (X * (p * (1 - p))[:, None]).T @ X + np.diag(penalty + 1e-9)
+        step = np.linalg.solve(hessian, grad)
+        coef -= step
+        if np.abs(step).max() < tol:
+            break
+    return coef
+
+
+def auc(y, p):
+    """Area under ROC (Mann-Whitney, rank rata-rata untuk nilai sama)"""
+    positives = int(y.sum())
+    negatives = len(y) - positives
+    if not positives or not negatives:
+        return float('nan')
+    ranks = pd.Series(p).rank().to_numpy()
+    return float((ranks[y].sum() - positives * (positives + 1) / 2) / (positives * negatives))
+
+
+def train_model(table):
+    """Latih di sampel tabel gabungan; validasi di VALIDATION_SHARE hari terakhir sampel"""
+    day, y = table['day'], table['label'].astype(np.float64)
+    if not len(day):
+        raise ValueError("Log appointment tidak punya baris berstatus untuk melatih model risiko")
+    X = design(table, table['prior_visits'], table['prior_wasted'])
+    valid = day >= np.quantile(day, 1 - VALIDATION_SHARE)
+    train = ~valid if (~valid).any() else valid
+    coef = fit_logistic(X[train], y[train])
+    p = sigmoid(X[valid] @ coef)
+    eps = 1e-12
+    return {
+        'coef': coef,
+        'auc': auc(y[valid].astype(bool), p),
+        'log_loss': float(-np.mean(y[valid] * np.log(p + eps) + (1 - y[valid]) * np.log(1 - p + eps))),
+        'base_rate': float(y.mean()),
+        'n_train': int(train.sum()),
+        'n_valid': int(valid.sum()),
+    }
+
+
+def risk_model(data_dir=None, train_rows=TRAIN_ROWS, workers=LOAD_WORKERS, batch_rows=BATCH_ROWS):
+    """(model, riwayat pasien) dari log appointment; model di-cache per fingerprint semua file log"""
+    tables = feature_tables(data_dir, train_rows, workers, batch_rows)
+    table = merge_tables(tables, train_rows)
+    history = (table['patients'], table['visits'], table['wasted'])
+
+    digest = hashlib.sha1(f"{train_rows}:{RIDGE}".encode())
+    for path in source_files(APPT_SOURCE, data_dir):
+        digest.update(f"{path.name}={fingerprint(path)};".encode())
+    path = _risk_dir(data_dir) / f"model.{digest.hexdigest()[:16]}.v{FEATURES_VERSION}.npz"
+    cached = _load(path)
+    if cached is not None:
+        model = {name: value if name == 'coef' else value.item() for name, value in cached.items()}
+    else:
+        model = train_model(table)
+        _save(path, model)
+    return model, history
+
+# ============================================================
+# SCORING
+# ============================================================
+
+def slice_scores(path, row_groups, coef, history, batch_rows=BATCH_ROWS):
+    """Jumlah booking, expected waste (sum p) & variansnya per (dept, jam, hari) satu potongan
+    appointment book, plus histogram risiko dan tanggal yang tercakup"""
+    n_cells = N_DEPTS * N_HOURS * len(DAYS)
+    booked, expected, variance = np.zeros(n_cells), np.zeros(n_cells), np.zeros(n_cells)
+    histogram, days = np.zeros(RISK_BINS), [np.zeros(0, np.int32)]
+    for batch in iter_records(path, BOOK_RISK_COLUMNS, batch_rows, row_groups):
+        features = booking_features(batch)
+        visits, wasted = history_lookup(history, features['patient'])
+        p = sigmoid(logits(features, visits, wasted, coef))
+        cell = ((features['dept'].astype(np.int64) * N_HOURS + features['hour']) * len(DAYS)
+                + (features['day'] + 3) % 7)
+        booked += np.bincount(cell, minlength=n_cells)
+        expected += np.bincount(cell, weights=p, minlength=n_cells)
+        variance += np.bincount(cell, weights=p * (1 - p), minlength=n_cells)
+        histogram += np.bincount(np.minimum((p * RISK_BINS).astype(np.int64), RISK_BINS - 1),
+                                 minlength=RISK_BINS)
+        days.append(np.unique(features['day']))
+    return {'booked': booked, 'expected': expected, 'variance': variance,
+            'histogram': histogram, 'days': np.unique(np.concatenate(days))}
+
+
+def score_book(model, history, data_dir=None, workers=LOAD_WORKERS, batch_rows=BATCH_ROWS):
+    """Skor seluruh appointment book per batch (paralel per potongan); hanya agregat per
+    slot yang disimpan, jadi memori tidak bergantung ukuran book"""
+    jobs = [(path, row_groups, model['coef'], history, batch_rows)
+            for path in source_files(BOOK_SOURCE, data_dir)
+            for row_groups in record_slices(path, batch_rows)]
+    total = None
+    for part in parallel_map(slice_scores, jobs, workers):
+        if total is None:
+            total = part
+            continue
+        for name in ('booked', 'expected', 'variance', 'histogram'):
+            total[name] = total[name] + part[name]
+        total['days'] = np.union1d(total['days'], part['days'])
+    shape = (N_DEPTS, N_HOURS, len(DAYS))
+    return {
+        'booked': total['booked'].reshape(shape),
+        'expected': total['expected'].reshape(shape),
+        'variance': total['variance'].reshape(shape),
+        'histogram': total['histogram'],
+        # Jumlah tanggal book per hari-minggu (pembagi "per hari klinik")
+        'dates': np.bincount((total['days'] + 3) % 7, minlength=len(DAYS)),
+    }
+
+# ============================================================
+# ENTRY POINTS
+# ============================================================
+
+def has_risk_data(data_dir=None):
+    """Log appointment punya kolom fitur risiko & appointment book tersedia"""
+    log, book = source_files(APPT_SOURCE, data_dir), source_files(BOOK_SOURCE, data_dir)
+    return (bool(log) and bool(book)
+            and all(set(APPT_RISK_COLUMNS) <= set(file_columns(p)) for p in log)
+            and all(set(BOOK_RISK_COLUMNS) <= set(file_columns(p)) for p in book))
+
+
+def risk_fingerprint(data_dir=None):
+    """Fingerprint log + appointment book; None jika data risiko tidak ada"""
+    if not has_risk_data(data_dir):
+        return None
+    digest = hashlib.sha1(f"{TRAIN_ROWS}".encode())
+    for source in (APPT_SOURCE, BOOK_SOURCE):
+        for path in source_files(source, data_dir):
+            digest.update(f"{source}/{path.name}={fingerprint(path)};".encode())
+    return digest.hexdigest()[:16]
+
+
+def no_show_risk(data_dir=None, train_rows=TRAIN_ROWS, workers=LOAD_WORKERS,
+                 batch_rows=BATCH_ROWS):
+    """Model + skor appointment book (lihat score_book); None tanpa data risiko"""
+    if not has_risk_data(data_dir):
+        return None
+    model, history = risk_model(data_dir, train_rows, workers, batch_rows)
+    return {'model': model, **score_book(model, history, data_dir, workers, batch_rows)}
+
+
+def risk_frames(result):
+    """Expected waste per slot (dept x jam) dan per departemen untuk keputusan overbooking.
+    Waste_Per_Day = expected appointment terbuang per hari klinik di book; Overbook = slot
+    tambahan yang aman (dibulatkan ke bawah)"""
+    n_days = max(int(result['dates'].sum()), 1)
+    booked, expected = result['booked'].sum(axis=2), result['expected'].sum(axis=2)
+
+    def frame(df, booked, expected):
+        df['Booked'] = booked.astype(np.int64)
+        df['Expected_Waste'] = np.round(expected, 1)
+        df['Risk_Pct'] = np.round(expected / np.maximum(booked, 1) * 100, 1)
+        df['Waste_Per_Day'] = np.round(expected / n_days, 2)
+        df['Overbook'] = np.floor(expected / n_days).astype(np.int64)
+        return df[df['Booked'] > 0].reset_index(drop=True)
+
+    dept, hour = np.meshgrid(np.arange(N_DEPTS), np.arange(N_HOURS), indexing='ij')
+    by_slot = frame(pd.DataFrame({'Department': np.array(DEPARTMENTS)[dept.ravel()],
+                                  'Hour': hour.ravel()}), booked.ravel(), expected.ravel())
+    by_dept = frame(pd.DataFrame({'Department': DEPARTMENTS}), booked.sum(axis=1),
+                    expected.sum(axis=1))
+    return by_slot, by_dept
+
+
+def risk_matrix(result):
+    """Expected waste per hari klinik, departemen x jam (NaN = tidak ada booking)"""
+    n_days = max(int(result['dates'].sum()), 1)
+    booked, expected = result['booked'].sum(axis=2), result['expected'].sum(axis=2)
+    hours = np.flatnonzero(booked.sum(axis=0))
+    values = np.where(booked > 0, expected / n_days, np.nan)[:, hours]
+    return pd.DataFrame(np.round(values, 2), index=DEPARTMENTS, columns=hours)
+
+
+def risk_totals(result):
+    """Ringkasan: booking, expected waste (+- 1 sd), rekomendasi overbook per hari & kualitas model"""
+    model = result['model']
+    by_slot, _ = risk_frames(result)
+    return {
+        'booked': int(result['booked'].sum()),
+        'expected': float(result['expected'].sum()),
+        'sd': float(np.sqrt(result['variance'].sum())),
+        'days': int(result['dates'].sum()),
+        'overbook_per_day': int(by_slot['Overbook'].sum()),
+        'auc': model['auc'],
+        'base_rate': model['base_rate'],
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Skor risiko no-show/cancel appointment book")
+    parser.add_argument('--data-dir', default=None)
+    parser.add_argument('--train-rows', type=int, default=TRAIN_ROWS)
+    parser.add_argument('--workers', type=int, default=LOAD_WORKERS)
+    parser.add_argument('--batch-rows', type=int, default=BATCH_ROWS)
+    parser.add_argument('--pool', choices=POOL_KINDS, default='process',
+                        help="Jenis pool paralel (default: process; dashboard memakai thread)")
+    args = parser.parse_args()
+    set_load_pool(args.pool)
+
+    start = time.perf_counter()
+    result = no_show_risk(args.data_dir, args.train_rows, args.workers, args.batch_rows)
+    if result is None:
+        raise SystemExit("Perlu log appointment dengan Patient_ID/Booking_Date/Start_Time "
+                         f"dan file {BOOK_SOURCE}.parquet/.csv")
+    totals = risk_totals(result)
+    model = result['model']
+    print(f"Risiko dihitung dalam {time.perf_counter() - start:.2f} s")
+    print(f"  Model: AUC {model['auc']:.3f}, log-loss {model['log_loss']:.3f} "
+          f"({model['n_train']:,} latih / {model['n_valid']:,} validasi)")
+    print(f"  Book: {totals['booked']:,} appointment, expected waste {totals['expected']:,.0f} "
+          f"+- {totals['sd']:,.0f}, overbook {totals['overbook_per_day']} slot/hari")
+    by_slot, by_dept = risk_frames(result)
+    print()
+    print(by_dept.to_string(index=False))
+    print()
+    print(by_slot.nlargest(10, 'Waste_Per_Day').to_string(index=False))
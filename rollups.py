@@ -0,0 +1,192 @@
+# DAILY ROLLUPS - PREFIX SUM
+# Kumulatif per hari untuk metrik rentang tanggal O(1): total [start, end] = cum[end + 1] - cum[start]
+
+import threading
+
+import numpy as np
+import pandas as pd
+
+from data_loader import APPT_STATUSES, DAYS, DEPARTMENTS, N_HOURS, date_codes
+
+# Nama -> (bentuk per hari, dtype). Status appointment punya slot ekstra untuk departemen kosong.
+FIELDS = {
+    'patients': ((len(DEPARTMENTS), N_HOURS), np.int64),
+    'wait_sum': ((len(DEPARTMENTS), N_HOURS), np.float64),
+    'staff_sum': ((len(DEPARTMENTS), N_HOURS), np.float64),
+    'weekday_patients': ((len(DEPARTMENTS), len(DAYS)), np.int64),
+    'weekday_wait_sum': ((len(DEPARTMENTS), len(DAYS)), np.float64),
+    'status': ((len(DEPARTMENTS) + 1, len(APPT_STATUSES)), np.int64),
+}
+
+
+def _blocks(wait, appts, first, last):
+    """Array padat per hari first..last (hari tanpa data = nol) dari hasil QueryStore.daily"""
+    blocks = {name: np.zeros((last - first + 1,) + shape, dtype)
+              for name, (shape, dtype) in FIELDS.items()}
+    day = wait[:, 0].astype(np.int64)
+    index = (day - first, wait[:, 1].astype(np.int64), wait[:, 2].astype(np.int64))
+    blocks['patients'][index] = wait[:, 3]
+    blocks['wait_sum'][index] = wait[:, 4]
+    blocks['staff_sum'][index] = wait[:, 5]
+    # Satu hari selalu satu hari-minggu; jumlahkan semua jam ke kolom hari-minggunya
+    weekday = (day - first, index[1], (day + 3) % 7)
+    np.add.at(blocks['weekday_patients'], weekday, wait[:, 3].astype(np.int64))
+    np.add.at(blocks['weekday_wait_sum'], weekday, wait[:, 4])
+
+    day, dept, status, n = appts.T
+    blocks['status'][day - first, np.where(dept >= 0, dept, len(DEPARTMENTS)), status] = n
+    return blocks
+
+
+def _mean(total, count):
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.round(total / count, 1)
+
+
+class DailyRollup:
+    """Prefix sum per hari atas dept × jam, dept × hari-minggu, dan status appointment.
+
+    Array dialokasikan dengan kapasitas cadangan (tumbuh 2x) sehingga hari baru
+    ditambahkan in place: hanya baris baru yang dihitung, riwayat tidak disalin
+    ulang kecuali kapasitas habis.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.first_day = None
+        self.n_days = 0
+        self.fingerprint = None
+        self.cum = {name: np.zeros((1,) + shape, dtype) for name, (shape, dtype) in FIELDS.items()}
+
+    @property
+    def last_day(self):
+        return self.first_day + self.n_days - 1 if self.n_days else None
+
+    def _extend(self, first, blocks):
+        if self.first_day is None:
+            self.first_day = first
+        n_new = len(blocks['patients'])
+        needed = self.n_days + n_new + 1
+        for name, block in blocks.items():
+            cum = self.cum[name]
+            if len(cum) < needed:
+                grown = np.zeros((max(2 * len(cum), needed),) + cum.shape[1:], cum.dtype)
+                grown[:self.n_days + 1] = cum[:self.n_days + 1]
+                self.cum[name] = cum = grown
+            cum[self.n_days + 1:needed] = cum[self.n_days] + np.cumsum(block, axis=0)
+        self.n_days += n_new
+
+    def _consistent(self, store):
+        """Hari yang sudah ada tidak berubah di store (jumlah pasien & wait sama)"""
+        avg_wait, count = store.summary(end=np.datetime64(int(self.last_day), 'D'))
+        total = self.cum['wait_sum'][self.n_days].sum()
+        return (count == self.cum['patients'][self.n_days].sum()
+                and np.isclose(avg_wait * count if count else 0.0, total))
+
+    def sync(self, store):
+        """Samakan dengan store: tambahkan hari baru in place, bangun ulang jika hari lama
+        berubah. Kembalikan jumlah hari yang ditambahkan."""
+        with self.lock:
+            if store.fingerprint == self.fingerprint:
+                return 0
+            if self.n_days and not self._consistent(store):
+                self._reset()
+            since = self.last_day
+            first = since + 1 if since is not None else store.first_day
+            last = store.last_day
+            added = 0
+            if first is not None and last is not None and last >= first:
+                wait, appts = store.daily(since)
+                self._extend(first, _blocks(wait, appts, first, last))
+                added = last - first + 1
+            self.fingerprint = store.fingerprint
+            return added
+
+    def to_arrays(self):
+        """Prefix sum terpakai (tanpa kapasitas cadangan) untuk bagian shared snapshot"""
+        with self.lock:
+            if self.first_day is None:
+                return {}
+            arrays = {f'rollup:{name}': cum[:self.n_days + 1] for name, cum in self.cum.items()}
+            arrays['rollup:first_day'] = np.array([self.first_day], dtype=np.int64)
+            return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays, fingerprint):
+        """Rollup di atas array snapshot read-only (mmap, dibagi antar proses); None jika
+        snapshot tidak memuatnya. Hari baru dari sync disalin ke array privat karena
+        kapasitasnya pas (jalur tumbuh 2x di _extend)."""
+        if 'rollup:first_day' not in arrays:
+            return None
+        rollup = cls()
+        rollup.first_day = int(arrays['rollup:first_day'][0])
+        rollup.cum = {name: arrays[f'rollup:{name}'] for name in FIELDS}
+        rollup.n_days = len(rollup.cum['patients']) - 1
+        rollup.fingerprint = fingerprint
+        return rollup
+
+    def daily_patients(self, since=0):
+        """Jumlah pasien per hari (hari, dept, jam) untuk hari ke-since.. (indeks sejak first_day)"""
+        with self.lock:
+            cum = self.cum['patients'][since:self.n_days + 1]
+            return np.diff(cum, axis=0) if len(cum) else cum
+
+    def total_patients(self, n_days):
+        """Total pasien n_days hari pertama"""
+        with self.lock:
+            return int(self.cum['patients'][min(n_days, self.n_days)].sum())
+
+    # ========================================================
+    # RANGE QUERY
+    # ========================================================
+
+    def _window(self, name, start, end):
+        """Total per dept untuk [start, end] (tanggal, inklusif): dua lookup + selisih"""
+        with self.lock:
+            if not self.n_days:
+                return np.zeros(FIELDS[name][0], FIELDS[name][1])
+            first = max(int(date_codes([start])[0]) - self.first_day, 0)
+            last = min(int(date_codes([end])[0]) - self.first_day, self.n_days - 1)
+            cum = self.cum[name]
+            return cum[last + 1] - cum[first] if first <= last else np.zeros_like(cum[0])
+
+    def _range(self, name, start, end, departments=None):
+        total = self._window(name, start, end)
+        if departments:
+            return total[[DEPARTMENTS.index(d) for d in departments]].sum(axis=0)
+        return total.sum(axis=0)
+
+    def hour_frame(self, start, end, departments=None):
+        """hour_df (Hour, Wait_Time, Volume, Staff) untuk rentang tanggal"""
+        count = self._range('patients', start, end, departments)
+        seen = count > 0
+        return pd.DataFrame({
+            'Hour': np.arange(N_HOURS)[seen],
+            'Wait_Time': _mean(self._range('wait_sum', start, end, departments), count)[seen],
+            'Volume': count[seen],
+            'Staff': _mean(self._range('staff_sum', start, end, departments), count)[seen],
+        })
+
+    def day_frame(self, start, end, departments=None):
+        """day_df (Day, Wait_Time, Volume) untuk rentang tanggal"""
+        count = self._range('weekday_patients', start, end, departments)
+        seen = count > 0
+        return pd.DataFrame({
+            'Day': np.array(DAYS)[seen],
+            'Wait_Time': _mean(self._range('weekday_wait_sum', start, end, departments), count)[seen],
+            'Volume': count[seen],
+        })
+
+    def status_counts(self, start, end, departments=None):
+        """Jumlah appointment per status (urutan APPT_STATUSES) untuk rentang tanggal"""
+        return self._range('status', start, end, departments)
+
+    def count_cube(self, start, end, departments=None):
+        """cube_count dept × jam untuk erlang.arrival_rates (sumbu hari/triage/dokter diringkas)"""
+        counts = self._window('patients', start, end)
+        if departments:
+            counts = counts * np.isin(DEPARTMENTS, departments)[:, None]
+        return {'cube_count': counts[:, :, None, None, None]}
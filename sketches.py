@@ -0,0 +1,68 @@
+# QUANTILE SKETCHES - DISTRIBUSI WAKTU TUNGGU
+# Histogram log-bucket (gaya DDSketch) per sel: dibangun satu pass, merge = penjumlahan
+
+import numpy as np
+
+# Error relatif maksimum untuk setiap persentil
+SKETCH_ALPHA = 0.02
+GAMMA = (1 + SKETCH_ALPHA) / (1 - SKETCH_ALPHA)
+MAX_WAIT = 24 * 60  # menit; nilai di atasnya masuk bucket terakhir
+
+# Bucket 0 untuk wait < 1 menit, bucket i >= 1 untuk (GAMMA^(i-1), GAMMA^i]
+N_BINS = 2 + int(np.ceil(np.log(MAX_WAIT) / np.log(GAMMA)))
+
+PERCENTILES = {'P50': 0.50, 'P90': 0.90, 'P95': 0.95}
+
+
+def bin_index(values):
+    """Bucket log untuk setiap nilai (vektorisasi). Hanya untuk nilai finite: NaN tidak
+    punya bucket, jadi disaring dulu oleh build_sketches."""
+    values = np.asarray(values, dtype=np.float64)
+    # Operasi in place: satu buffer float64 sementara untuk batch besar
+    with np.errstate(divide='ignore', invalid='ignore'):
+        index = np.log(values)
+    index /= np.log(GAMMA)
+    np.ceil(index, out=index)
+    index += 1
+    index[values < 1] = 0
+    return np.clip(index, 0, N_BINS - 1, out=index).astype(np.int32)
+
+
+def bin_values():
+    """Nilai representatif tiap bucket (titik tengah relatif, error <= SKETCH_ALPHA)"""
+    upper = GAMMA ** np.arange(N_BINS - 1)
+    return np.concatenate([[0.0], 2 * upper / (GAMMA + 1)])
+
+
+def build_sketches(cells, n_cells, values):
+    """Histogram per sel dalam satu bincount: hasil berbentuk (n_cells, N_BINS).
+    Nilai non-finite (NaN/inf = wait tidak terukur) dibuang, tidak dipaksa ke bucket
+    mana pun: persentil hanya merangkum wait yang benar-benar tercatat."""
+    values = np.asarray(values)
+    finite = np.isfinite(values)
+    if not finite.all():
+        cells, values = cells[finite], values[finite]
+    flat = cells.astype(np.int64)
+    flat *= N_BINS
+    flat += bin_index(values)
+    counts = np.bincount(flat, minlength=n_cells * N_BINS)
+    return counts.astype(np.int32).reshape(n_cells, N_BINS)
+
+
+def quantiles(sketch, qs):
+    """Persentil dari histogram (..., N_BINS); NaN untuk sel kosong"""
+    cum = np.cumsum(sketch, axis=-1)
+    total = cum[..., -1:]
+    out = []
+    for q in qs:
+        # Bucket pertama yang cumulative count-nya mencapai rank q
+        index = np.argmax(cum >= np.maximum(q * total, 1), axis=-1)
+        value = bin_values()[index]
+        out.append(np.where(total[..., 0] > 0, value, np.nan))
+    return np.stack(out, axis=-1)
+
+
+def marginal_quantiles(sketch, axis, qs=tuple(PERCENTILES.values())):
+    """Persentil per nilai satu dimensi: merge sketch semua sel lain lalu baca quantile"""
+    cell_axes = tuple(i for i in range(sketch.ndim - 1) if i != axis)
+    return quantiles(sketch.sum(axis=cell_axes), qs)
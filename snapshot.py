@@ -0,0 +1,201 @@
+# DASHBOARD SNAPSHOT - FORMAT FILE
+# Satu file versioned berisi semua frame, array agregat, dan hasil bootstrap; dibaca via mmap
+
+import fcntl
+import json
+import mmap
+import os
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+
+SNAPSHOT_DIR = Path(os.environ.get("HOSPITAL_SNAPSHOT_DIR", "snapshots"))
+LATEST_NAME = 'LATEST'
+LOCK_NAME = '.publish.lock'
+
+MAGIC = b'HDSNAP01'
+ALIGN = 64
+
+FRAME_NAMES = ['dept_df', 'hour_df', 'day_df', 'staff_df', 'triage_df', 'appt_df']
+
+# ============================================================
+# WRITE
+# ============================================================
+
+def _frame_bytes(df):
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def _pad(n):
+    return -n % ALIGN
+
+
+def _json_value(value):
+    """Nilai numpy di hasil stats.findings -> tipe JSON"""
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Tidak bisa disimpan di header snapshot: {type(value).__name__}")
+
+
+def write_snapshot(frames, arrays, out_dir=None, fingerprint=None, shared=None, findings=None):
+    """Tulis snapshot ke <out_dir>/dashboard-<versi>.snap lalu arahkan LATEST ke file itu.
+    `shared`: array record-level tambahan (mis. prefix sum harian) yang ikut di-mmap
+    oleh semua proses dashboard, terpisah dari partial aggregates `arrays`.
+    `findings`: hasil bootstrap stats.findings (disimpan di header sebagai JSON)."""
+    out_dir = Path(out_dir) if out_dir is not None else SNAPSHOT_DIR
+    out_dir.mkdir(parents=True, exist_ok=True)
+    created = datetime.now(timezone.utc)
+    # Suffix acak: dua publish di detik yang sama tidak menimpa file satu sama lain
+    version = f"{created:%Y%m%dT%H%M%SZ}-{uuid.uuid4().hex[:8]}"
+
+    blocks, frame_index, array_index, shared_index = [], {}, {}, {}
+    offset = 0
+
+    def add(payload):
+        nonlocal offset
+        start = offset
+        blocks.append(payload)
+        blocks.append(b'\0' * _pad(len(payload)))
+        offset += len(payload) + _pad(len(payload))
+        return start
+
+    for name, df in zip(FRAME_NAMES, frames):
+        payload = _frame_bytes(df)
+        frame_index[name] = [add(payload), len(payload)]
+    for index, source in ((array_index, arrays), (shared_index, shared or {})):
+        for name, values in source.items():
+            values = np.ascontiguousarray(values)
+            index[name] = [add(values.tobytes()), values.dtype.str, list(values.shape)]
+
+    header = json.dumps({
+        'version': version,
+        'created': created.isoformat(),
+        'fingerprint': fingerprint,
+        'frames': frame_index,
+        'arrays': array_index,
+        'shared': shared_index,
+        'findings': findings,
+    }, default=_json_value).encode()
+    # Payload dimulai di batas ALIGN supaya array bisa di-mmap tanpa copy
+    prefix = MAGIC + len(header).to_bytes(8, 'little') + header
+    prefix += b'\0' * _pad(len(prefix))
+
+    path = out_dir / f"dashboard-{version}.snap"
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp, 'wb') as f:
+        f.write(prefix)
+        for block in blocks:
+            f.write(block)
+    os.replace(tmp, path)
+
+    # Pembaca melihat LATEST lama atau baru, tidak pernah file setengah tertulis
+    latest_tmp = out_dir / f".{LATEST_NAME}.{os.getpid()}.tmp"
+    latest_tmp.write_text(path.name)
+    os.replace(latest_tmp, out_dir / LATEST_NAME)
+    return path
+
+
+@contextmanager
+def publish_lock(out_dir=None):
+    """Lock eksklusif per direktori snapshot (flock, lintas proses di host yang sama):
+    hanya satu proses yang membangun & mem-publish versi baru"""
+    out_dir = Path(out_dir) if out_dir is not None else SNAPSHOT_DIR
+    out_dir.mkdir(parents=True, exist_ok=True)
+    with open(out_dir / LOCK_NAME, 'a') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+# ============================================================
+# READ
+# ============================================================
+
+def latest_snapshot(snapshot_dir=None):
+    """Path snapshot terbaru menurut LATEST, atau None"""
+    snapshot_dir = Path(snapshot_dir) if snapshot_dir is not None else SNAPSHOT_DIR
+    pointer = snapshot_dir / LATEST_NAME
+    if not pointer.exists():
+        return None
+    path = snapshot_dir / pointer.read_text().strip()
+    return path if path.exists() else None
+
+
+def _mapped_arrays(buffer, base, index):
+    return {
+        name: np.frombuffer(buffer, dtype=np.dtype(dtype), count=int(np.prod(shape)),
+                            offset=base + offset).reshape(shape)
+        for name, (offset, dtype, shape) in index.items()
+    }
+
+
+def load_snapshot(path):
+    """Buka snapshot via mmap: array agregat zero-copy (read-only), frame dari Arrow IPC.
+    Halaman mmap dibagi page cache ke semua proses yang membuka file yang sama."""
+    with open(path, 'rb') as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if buffer[:len(MAGIC)] != MAGIC:
+        raise ValueError(f"Bukan file snapshot dashboard: {path}")
+    header_len = int.from_bytes(buffer[len(MAGIC):len(MAGIC) + 8], 'little')
+    start = len(MAGIC) + 8
+    header = json.loads(buffer[start:start + header_len])
+    base = start + header_len + _pad(start + header_len)
+
+    data = pa.py_buffer(buffer)
+    frames = tuple(
+        pa.ipc.open_stream(data.slice(base + offset, length)).read_all().to_pandas()
+        for offset, length in (header['frames'][name] for name in FRAME_NAMES)
+    )
+    return {
+        'version': header['version'],
+        'created': header['created'],
+        'fingerprint': header.get('fingerprint'),
+        'frames': frames,
+        'arrays': _mapped_arrays(buffer, base, header['arrays']),
+        # Snapshot lama tidak punya bagian shared & findings
+        'shared': _mapped_arrays(buffer, base, header.get('shared', {})),
+        'findings': header.get('findings'),
+    }
+
+
+def _read_header(path):
+    """Header JSON snapshot saja (tanpa membaca payload)"""
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"Bukan file snapshot dashboard: {path}")
+        header_len = int.from_bytes(f.read(8), 'little')
+        return json.loads(f.read(header_len))
+
+
+def snapshot_fingerprint(path):
+    """Fingerprint data snapshot dari header saja (tanpa membaca payload)"""
+    return _read_header(path).get('fingerprint')
+
+
+def prune_snapshots(keep, snapshot_dir=None):
+    """Hapus snapshot lama, sisakan `keep` terbaru menurut waktu tulis di header
+    (snapshot LATEST tidak pernah dihapus; file yang headernya tidak terbaca dibiarkan)"""
+    snapshot_dir = Path(snapshot_dir) if snapshot_dir is not None else SNAPSHOT_DIR
+    latest = latest_snapshot(snapshot_dir)
+    snapshots = []
+    for path in snapshot_dir.glob('dashboard-*.snap'):
+        try:
+            created = datetime.fromisoformat(_read_header(path)['created'])
+        except (OSError, ValueError, KeyError):
+            continue
+        snapshots.append((created, path))
+    snapshots.sort(reverse=True)
+    for _, path in snapshots[keep:]:
+        if path != latest:
+            path.unlink(missing_ok=True)
@@ -0,0 +1,329 @@
+# STATIC EXPORT - BUNDLE HTML
+# Render kedua halaman + enam dimensi detail dashboard menjadi HTML statis (tanpa Python saat dilihat)
+#
+#   python static_export.py --out export          # mis. dari cron setelah precompute.py
+#
+# Plotly.js disertakan sekali (plotly.min.js, dipakai bersama semua halaman); data figure
+# disimpan sebagai JSON gzip+base64 dan dibuka di browser dengan DecompressionStream,
+# sehingga bundle bisa dibuka langsung dari file:// atau disajikan file server biasa.
+# Setiap file juga ditulis versi .gz untuk server dengan precompressed serving (gzip_static).
+# Bundle ditulis ke .<out>.versions/<versi>; <out> adalah symlink yang dipindah atomik ke versi baru.
+
+import argparse
+import base64
+import gzip
+import html
+import os
+import re
+import shutil
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+from snapshot import publish_lock
+
+DASHBOARD = Path(__file__).with_name('streamlit_dashboard.py')
+EXPORT_DIR = Path(os.environ.get("HOSPITAL_EXPORT_DIR", "export"))
+EXPORT_TIMEOUT = 300
+PLOTLY_JS = 'plotly.min.js'
+
+PAGE_RADIO = "Pilih Halaman:"
+DIMENSION_SELECT = "Pilih dimensi analisis:"
+
+# Elemen interaktif tidak punya padanan statis
+SKIPPED = {'selectbox', 'multiselect', 'slider', 'number_input', 'button', 'toggle',
+           'radio', 'date_input', 'form', 'image', 'empty'}
+ALERTS = {'error', 'warning', 'info', 'success'}
+
+# ============================================================
+# MARKDOWN (subset yang dipakai dashboard)
+# ============================================================
+
+def _inline(text):
+    text = re.sub(r'\*\*(.+?)\*\*', r'<b>\1</b>', text)
+    text = re.sub(r'(?<![\w*])\*(?!\s)(.+?)(?<!\s)\*(?![\w*])', r'<i>\1</i>', text)
+    return re.sub(r'`([^`]+)`', r'<code>\1</code>', text)
+
+
+def markdown_html(text, allow_html=False):
+    """Markdown sederhana -> HTML: heading, list, paragraf, hard break, hr, bold/italic/code"""
+    out, para, items = [], [], []
+    in_html = ordered = False
+
+    def flush():
+        if para:
+            out.append('<p>' + ''.join(para).rstrip() + '</p>')
+            para.clear()
+        if items:
+            tag = 'ol' if ordered else 'ul'
+            out.append(f'<{tag}>' + ''.join(f'<li>{item}</li>' for item in items) + f'</{tag}>')
+            items.clear()
+
+    for raw in text.strip('\n').split('\n'):
+        line = raw.strip()
+        # Blok HTML (diawali tag) diteruskan apa adanya sampai baris kosong
+        if allow_html and (in_html or line.startswith('<')):
+            if not in_html:
+                flush()
+            in_html = bool(line)
+            out.append(raw)
+            continue
+        body = _inline(line if allow_html else html.escape(line, quote=False))
+        heading = re.match(r'(#{1,6})\s+(.*)', body)
+        if not line:
+            flush()
+        elif re.fullmatch(r'-{3,}|\*{3,}', line):
+            flush()
+            out.append('<hr>')
+        elif heading:
+            flush()
+            level = len(heading.group(1))
+            out.append(f'<h{level}>{heading.group(2)}</h{level}>')
+        elif re.match(r'[-*]\s+|\d+\.\s+', line):
+            number = line[0].isdigit()
+            if para or (items and number != ordered):
+                flush()
+            ordered = number
+            items.append(re.sub(r'^([-*]|\d+\.)\s+', '', body))
+        else:
+            if items:
+                flush()
+            para.append(body + ('<br>' if raw.endswith('  ') else ' '))
+    flush()
+    return '\n'.join(out)
+
+# ============================================================
+# ELEMENT TREE -> HTML
+# ============================================================
+
+def compress_figure(spec):
+    """JSON figure Plotly -> gzip + base64 (mtime 0 supaya export deterministik)"""
+    return base64.b64encode(gzip.compress(spec.encode(), compresslevel=9, mtime=0)).decode()
+
+
+def _metric(node):
+    proto = node.proto
+    color = proto.DESCRIPTOR.fields_by_name['color'].enum_type.values_by_number[proto.color].name
+    arrow = {'UP': '▲', 'DOWN': '▼'}.get(
+        proto.DESCRIPTOR.fields_by_name['direction'].enum_type.values_by_number[proto.direction].name, '')
+    delta = (f'<div class="metric-delta {color.lower()}">{arrow} {html.escape(proto.delta)}</div>'
+             if proto.delta else '')
+    return (f'<div class="metric"><div class="metric-label">{html.escape(proto.label)}</div>'
+            f'<div class="metric-value">{html.escape(proto.body)}</div>{delta}</div>')
+
+
+def render(node):
+    """HTML statis untuk satu node tree AppTest (rekursif)"""
+    kind = getattr(node, 'type', '')
+    if kind in SKIPPED:
+        return ''
+    if kind == 'markdown':
+        return markdown_html(node.proto.body, node.proto.allow_html)
+    if kind == 'caption':
+        return f'<div class="caption">{markdown_html(node.proto.body, node.proto.allow_html)}</div>'
+    if kind == 'title':
+        return f'<h1>{html.escape(node.value)}</h1>'
+    if kind in ALERTS:
+        return f'<div class="alert {kind}">{markdown_html(node.proto.body)}</div>'
+    if kind == 'metric':
+        return _metric(node)
+    if kind == 'plotly_chart':
+        return f'<div class="figure" data-figure="{compress_figure(node.proto.spec)}"></div>'
+    if kind == 'dataframe':
+        return node.value.to_html(index=False, classes='table', border=0, na_rep='-')
+
+    children = [render(child) for child in getattr(node, 'children', {}).values()]
+    inner = '\n'.join(child for child in children if child)
+    if not inner:
+        return ''
+    if kind == 'expander':
+        return f'<details><summary>{html.escape(node.label)}</summary>{inner}</details>'
+    if kind == 'column':
+        return f'<div class="col" style="flex: {node.proto.weight:.4f}">{inner}</div>'
+    if all(getattr(child, 'type', '') == 'column' for child in node.children.values()):
+        return f'<div class="row">{inner}</div>'
+    return inner
+
+# ============================================================
+# PAGES
+# ============================================================
+
+def _widget(widgets, label):
+    return next(widget for widget in widgets if widget.label == label)
+
+
+def render_pages(timeout=EXPORT_TIMEOUT):
+    """Jalankan dashboard headless: [(nama file, judul, body HTML)] untuk setiap halaman/dimensi"""
+    from streamlit.testing.v1 import AppTest
+
+    def run(at):
+        at.run()
+        if at.exception:
+            raise RuntimeError(f"Dashboard gagal dirender: {at.exception[0].message}")
+        return at
+
+    at = run(AppTest.from_file(str(DASHBOARD), default_timeout=timeout))
+    radio = _widget(at.sidebar.radio, PAGE_RADIO)
+    home, detail = radio.options[0], radio.options[1]
+    pages = [('index.html', home, render(at.main))]
+
+    radio.set_value(detail)
+    run(at)
+    options = _widget(at.selectbox, DIMENSION_SELECT).options
+    for i, option in enumerate(options, 1):
+        _widget(at.selectbox, DIMENSION_SELECT).set_value(option)
+        run(at)
+        pages.append((f'detail-{i}.html', option, render(at.main)))
+    return pages
+
+
+STYLE = """
+body { font-family: "Source Sans Pro", system-ui, sans-serif; margin: 0; color: #31333f; }
+nav { position: sticky; top: 0; z-index: 10; background: #f0f2f6; padding: 10px 24px;
+      display: flex; flex-wrap: wrap; gap: 6px 18px; font-size: 15px; }
+nav a { color: #31333f; text-decoration: none; }
+nav a.active { font-weight: bold; color: #1e3a8a; }
+main { max-width: 1280px; margin: 0 auto; padding: 16px 24px 40px; }
+.row { display: flex; gap: 16px; align-items: flex-start; }
+.col { min-width: 0; }
+.metric { padding: 8px 0; }
+.metric-label { font-size: 14px; }
+.metric-value { font-size: 36px; }
+.metric-delta { font-size: 14px; display: inline-block; padding: 0 6px; border-radius: 8px; }
+.metric-delta.red { color: #ff2b2b; background: #ffecec; }
+.metric-delta.green { color: #09ab3b; background: #e8f9ee; }
+.metric-delta.gray { color: #808495; background: #f0f2f6; }
+.alert { padding: 12px 16px; border-radius: 8px; margin: 12px 0; }
+.alert.error { background: #ffecec; color: #7d353b; }
+.alert.warning { background: #fffce7; color: #926c05; }
+.alert.info { background: #e8f0fe; color: #0054a3; }
+.alert.success { background: #e8f9ee; color: #177233; }
+.caption { font-size: 14px; color: #808495; }
+.figure { min-height: 420px; }
+.table { border-collapse: collapse; font-size: 14px; margin: 8px 0; }
+.table th, .table td { padding: 4px 10px; border-bottom: 1px solid #e6e9ef; text-align: right; }
+details { border: 1px solid #e6e9ef; border-radius: 8px; padding: 8px 16px; margin: 12px 0; }
+summary { cursor: pointer; }
+footer { color: #808495; font-size: 13px; text-align: center; padding: 24px; }
+"""
+
+# Figure dibuka (gzip -> JSON) dan digambar saat mendekati viewport
+SCRIPT = """
+async function inflate(data) {
+  const bytes = Uint8Array.from(atob(data), c => c.charCodeAt(0));
+  const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream('gzip'));
+  return JSON.parse(await new Response(stream).text());
+}
+async function draw(el) {
+  const fig = await inflate(el.dataset.figure);
+  delete el.dataset.figure;
+  Plotly.newPlot(el, fig.data, fig.layout, {responsive: true, displaylogo: false});
+}
+const observer = new IntersectionObserver(entries => entries.forEach(entry => {
+  if (entry.isIntersecting) { observer.unobserve(entry.target); draw(entry.target); }
+}), {rootMargin: '400px'});
+document.querySelectorAll('[data-figure]').forEach(el => observer.observe(el));
+"""
+
+
+def page_html(name, title, body, pages, exported):
+    active = ' class="active"'
+    links = ''.join(f'<a href="{file}"{active if file == name else ""}>{html.escape(label)}</a>'
+                    for file, label, _ in pages)
+    return f"""<!DOCTYPE html>
+<html lang="id">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>{html.escape(title)} · Analisis Waktu Tunggu RS</title>
+<style>{STYLE}</style>
+<script src="{PLOTLY_JS}"></script>
+</head>
+<body>
+<nav>{links}</nav>
+<main>
+{body}
+</main>
+<footer>Ekspor statis {exported:%Y-%m-%d %H:%M} · data tidak diperbarui sampai ekspor berikutnya</footer>
+<script>{SCRIPT}</script>
+</body>
+</html>
+"""
+
+
+def _write(path, text):
+    """Tulis file + versi .gz (precompressed) secara atomik"""
+    data = text.encode()
+    for target, payload in [(path, data),
+                            (path.with_name(path.name + '.gz'),
+                             gzip.compress(data, compresslevel=9, mtime=0))]:
+        tmp = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+        tmp.write_bytes(payload)
+        os.replace(tmp, target)
+
+
+def _versions_dir(out_dir):
+    return out_dir.with_name(f".{out_dir.name}.versions")
+
+
+def _prune_versions(versions, keep):
+    """Hapus versi bundle selain `keep` (nama direktori); staging yang sedang ditulis
+    (nama diawali titik) tidak disentuh"""
+    for path in versions.iterdir():
+        if path.is_dir() and not path.name.startswith('.') and path.name not in keep:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def export_bundle(out_dir=None, timeout=EXPORT_TIMEOUT):
+    """Render semua halaman ke direktori versi baru, lalu arahkan symlink out_dir ke versi
+    itu secara atomik; kembalikan path bundle (symlink)"""
+    from plotly.offline import get_plotlyjs
+
+    out_dir = Path(out_dir) if out_dir is not None else EXPORT_DIR
+    pages = render_pages(timeout)
+    exported = datetime.now()
+
+    versions = _versions_dir(out_dir)
+    version = f"{exported:%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}"
+    staging = versions / f".{version}.tmp"
+    staging.mkdir(parents=True)
+    _write(staging / PLOTLY_JS, get_plotlyjs())
+    for name, title, body in pages:
+        _write(staging / name, page_html(name, title, body, pages, exported))
+    os.replace(staging, versions / version)
+
+    # Server membaca lewat symlink: selalu bundle lama atau baru utuh, tidak pernah campuran
+    # atau kosong (seperti LATEST di snapshot.py). Versi sebelumnya disisakan untuk klien
+    # yang masih memuat halaman darinya.
+    with publish_lock(versions):
+        previous = os.readlink(out_dir) if out_dir.is_symlink() else None
+        if out_dir.exists() and not out_dir.is_symlink():
+            # Layout lama (direktori biasa): dipindah sekali ke direktori versi
+            os.replace(out_dir, versions / f"{exported:%Y%m%dT%H%M%S}-legacy")
+        link = out_dir.with_name(f".{out_dir.name}.{os.getpid()}.link")
+        link.unlink(missing_ok=True)
+        link.symlink_to(Path(versions.name) / version)
+        os.replace(link, out_dir)
+        _prune_versions(versions, {version} | ({Path(previous).name} if previous else set()))
+    return out_dir
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Ekspor dashboard ke bundle HTML statis")
+    parser.add_argument('--out', default=None, help="Direktori bundle (default: HOSPITAL_EXPORT_DIR)")
+    parser.add_argument('--data-dir', default=None, help="Direktori data mentah (default: HOSPITAL_DATA_DIR)")
+    parser.add_argument('--timeout', type=float, default=EXPORT_TIMEOUT,
+                        help="Batas waktu render per halaman (detik)")
+    args = parser.parse_args()
+    if args.data_dir:
+        # Dibaca data_loader saat dashboard di-import oleh AppTest
+        os.environ['HOSPITAL_DATA_DIR'] = args.data_dir
+
+    start = time.perf_counter()
+    path = export_bundle(args.out, args.timeout)
+    files = sorted(p for p in path.iterdir() if not p.name.endswith('.gz'))
+    size = sum(p.stat().st_size for p in files)
+    gz = sum(p.with_name(p.name + '.gz').stat().st_size for p in files)
+    print(f"{len(files) - 1} halaman diekspor ke {path} ({time.perf_counter() - start:.1f} s, "
+          f"{size / 2**20:.1f} MB, {gz / 2**20:.1f} MB gzip)")
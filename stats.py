@@ -0,0 +1,211 @@
+# STATISTIK TEMUAN - BOOTSTRAP CI
+# Korelasi dokter vs wait, selisih Senin-Jumat, dan gap departemen terhadap target dengan selang kepercayaan
+
+import argparse
+import os
+import time
+import zlib
+from pathlib import Path
+
+import numpy as np
+
+from data_loader import (DAYS, DEPARTMENTS, LOAD_WORKERS, POOL_KINDS, TARGET_WAIT,
+                         WAIT_COLUMNS, WAIT_SOURCE, iter_records, parallel_map, pool_executor,
+                         record_slices, set_load_pool, source_files, wait_codes)
+
+# Record dibagi acak ke N_BUCKETS bucket; resample bootstrap = bobot multinomial atas bucket.
+# Statistik per bucket adalah sufficient statistic eksak, jadi tidak ada pembulatan wait.
+N_BUCKETS = 1024
+N_RESAMPLES = int(os.environ.get("HOSPITAL_BOOTSTRAP_RESAMPLES", 2000))
+CONFIDENCE = 0.95
+# Resample per batch (satu seed anak per batch -> hasil sama berapa pun jumlah worker)
+RESAMPLE_BATCH = 500
+# Di bawah ukuran ini (resample x bucket) pool lebih lambat dari berurutan
+PARALLEL_MIN_CELLS = 4_000_000
+
+MONDAY, FRIDAY = DAYS.index('Senin'), DAYS.index('Jumat')
+
+# Kolom matriks statistik bucket
+MOMENTS = ['n', 'd', 'dd', 'w', 'ww', 'dw']
+COLUMNS = (MOMENTS
+           + [f'day_n:{d}' for d in DAYS] + [f'day_w:{d}' for d in DAYS]
+           + [f'dept_n:{d}' for d in DEPARTMENTS] + [f'dept_w:{d}' for d in DEPARTMENTS])
+N_DAYS, N_DEPTS = len(DAYS), len(DEPARTMENTS)
+DAY_N = len(MOMENTS)
+DAY_W = DAY_N + N_DAYS
+DEPT_N = DAY_W + N_DAYS
+DEPT_W = DEPT_N + N_DEPTS
+
+# ============================================================
+# BUCKET STATISTICS
+# ============================================================
+
+def batch_buckets(records, bucket):
+    """Matriks (N_BUCKETS, len(COLUMNS)) sufficient statistic satu batch"""
+    (dept, _, day, _, doctors), wait, _ = wait_codes(records)
+    d = doctors.astype(np.float64)
+    w = wait.astype(np.float64)
+    bucket = bucket[:len(w)]
+
+    def per_bucket(weights=None):
+        return np.bincount(bucket, weights=weights, minlength=N_BUCKETS)
+
+    def per_group(codes, n_groups, weights=None):
+        cell = bucket * n_groups + codes
+        return np.bincount(cell, weights=weights,
+                           minlength=N_BUCKETS * n_groups).reshape(N_BUCKETS, n_groups)
+
+    return np.column_stack([
+        per_bucket(), per_bucket(d), per_bucket(d * d),
+        per_bucket(w), per_bucket(w * w), per_bucket(d * w),
+        per_group(day, N_DAYS), per_group(day, N_DAYS, w),
+        per_group(dept, N_DEPTS), per_group(dept, N_DEPTS, w),
+    ])
+
+
+def slice_buckets(path, row_groups, seed=0):
+    """Statistik bucket satu potongan file; bucket acak di-seed dari nama file + row group"""
+    first = row_groups[0] if row_groups else 0
+    rng = np.random.default_rng([seed, zlib.crc32(Path(path).name.encode()), first])
+    total = np.zeros((N_BUCKETS, len(COLUMNS)))
+    for batch in iter_records(path, WAIT_COLUMNS, row_groups=row_groups):
+        bucket = rng.integers(0, N_BUCKETS, len(batch))
+        # Baris dengan kategori kosong dibuang wait_codes; bucket sisanya tetap acak
+        total += batch_buckets(batch, bucket)
+    return total
+
+
+def bucket_stats(data_dir=None, workers=LOAD_WORKERS, seed=0):
+    """Statistik bucket seluruh data wait-time; None jika data mentah tidak ada"""
+    jobs = [(path, row_groups, seed)
+            for path in source_files(WAIT_SOURCE, data_dir)
+            for row_groups in record_slices(path)]
+    if not jobs:
+        return None
+    total = np.zeros((N_BUCKETS, len(COLUMNS)))
+    for stats in parallel_map(slice_buckets, jobs, workers):
+        total += stats
+    return total
+
+# ============================================================
+# ESTIMATORS (vektorisasi atas baris = resample)
+# ============================================================
+
+def _mean(total, count):
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return total / count
+
+
+def correlation(totals):
+    """Pearson doctors-on-shift vs wait dari momen (..., len(COLUMNS))"""
+    n, d, dd, w, ww, dw = (totals[..., i] for i in range(len(MOMENTS)))
+    cov = dw / n - (d / n) * (w / n)
+    var_d = dd / n - (d / n) ** 2
+    var_w = ww / n - (w / n) ** 2
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return cov / np.sqrt(var_d * var_w)
+
+
+def day_means(totals):
+    return _mean(totals[..., DAY_W:DEPT_N], totals[..., DAY_N:DAY_W])
+
+
+def monday_friday_gap(totals):
+    """Rata-rata wait Senin - Jumat (menit)"""
+    means = day_means(totals)
+    return means[..., MONDAY] - means[..., FRIDAY]
+
+
+def dept_gaps(totals):
+    """Rata-rata wait per departemen - TARGET_WAIT (menit)"""
+    return _mean(totals[..., DEPT_W:], totals[..., DEPT_N:DEPT_W]) - TARGET_WAIT
+
+# ============================================================
+# BOOTSTRAP
+# ============================================================
+
+def _resample_batch(stats, seed, n):
+    """Total statistik untuk n resample: bobot multinomial (n, N_BUCKETS) @ stats"""
+    rng = np.random.default_rng(seed)
+    n_buckets = len(stats)
+    weights = rng.multinomial(n_buckets, np.full(n_buckets, 1 / n_buckets), size=n)
+    return weights @ stats
+
+
+def resample(stats, resamples=N_RESAMPLES, workers=LOAD_WORKERS, seed=0):
+    """Matriks (resamples, len(COLUMNS)) total bootstrap; batch dibagi ke pool_executor
+    jika cukup besar, hasil identik untuk seed yang sama berapa pun jumlah worker"""
+    n_batches = -(-resamples // RESAMPLE_BATCH)
+    sizes = np.diff(np.linspace(0, resamples, n_batches + 1).astype(int))
+    seeds = np.random.SeedSequence(seed).spawn(n_batches)
+    jobs = [(stats, s, int(n)) for s, n in zip(seeds, sizes)]
+
+    if workers > 1 and n_batches > 1 and resamples * len(stats) >= PARALLEL_MIN_CELLS:
+        with pool_executor(min(workers, n_batches)) as pool:
+            results = list(pool.map(_resample_batch, *zip(*jobs)))
+    else:
+        results = [_resample_batch(*job) for job in jobs]
+    return np.vstack(results)
+
+
+def _interval(point, samples, confidence=CONFIDENCE):
+    """Estimasi + CI persentil (kolom terakhir = statistik)"""
+    alpha = (1 - confidence) / 2
+    low, high = np.nanquantile(samples, [alpha, 1 - alpha], axis=0)
+    return {'estimate': point, 'low': low, 'high': high}
+
+
+def findings(stats, resamples=N_RESAMPLES, workers=LOAD_WORKERS, seed=0,
+             confidence=CONFIDENCE):
+    """Estimasi & bootstrap CI korelasi, selisih Senin-Jumat, dan gap departemen"""
+    totals = stats.sum(axis=0)
+    samples = resample(stats, resamples, workers, seed)
+    gaps = dept_gaps(totals)
+    gap_ci = _interval(gaps, dept_gaps(samples), confidence)
+    seen = totals[DEPT_N:DEPT_W] > 0
+    return {
+        'n_records': int(totals[0]),
+        'resamples': resamples,
+        'confidence': confidence,
+        'correlation': _interval(correlation(totals), correlation(samples), confidence),
+        'monday_friday_gap': _interval(monday_friday_gap(totals), monday_friday_gap(samples),
+                                       confidence),
+        'day_means': day_means(totals),
+        'dept_gaps': {
+            'Department': np.array(DEPARTMENTS)[seen],
+            **{key: values[seen] for key, values in gap_ci.items()},
+        },
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Bootstrap CI temuan dashboard dari data record-level")
+    parser.add_argument('--data-dir', default=None)
+    parser.add_argument('--resamples', type=int, default=N_RESAMPLES)
+    parser.add_argument('--workers', type=int, default=LOAD_WORKERS)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--pool', choices=POOL_KINDS, default='process',
+                        help="Jenis pool paralel (default: process; dashboard memakai thread)")
+    args = parser.parse_args()
+    set_load_pool(args.pool)
+
+    start = time.perf_counter()
+    stats = bucket_stats(args.data_dir, args.workers, args.seed)
+    if stats is None:
+        raise SystemExit("Data wait-time mentah tidak ditemukan")
+    scanned = time.perf_counter()
+    result = findings(stats, args.resamples, args.workers, args.seed)
+    print(f"{result['n_records']:,} record, {args.resamples} resample "
+          f"(scan {scanned - start:.2f} s, bootstrap {time.perf_counter() - scanned:.2f} s)")
+
+    level = f"{result['confidence']:.0%}"
+    corr = result['correlation']
+    print(f"Korelasi dokter vs wait: {corr['estimate']:+.3f} "
+          f"(CI {level}: {corr['low']:+.3f} .. {corr['high']:+.3f})")
+    gap = result['monday_friday_gap']
+    print(f"Selisih Senin - Jumat: {gap['estimate']:+.1f} menit "
+          f"(CI {level}: {gap['low']:+.1f} .. {gap['high']:+.1f})")
+    gaps = result['dept_gaps']
+    for name, estimate, low, high in zip(gaps['Department'], gaps['estimate'],
+                                         gaps['low'], gaps['high']):
+        print(f"  {name:<18} {estimate:+6.1f} menit vs target ({low:+.1f} .. {high:+.1f})")
@@ -1,12 +1,31 @@
-
 # DASHBOARD ANALISIS WAKTU TUNGGU RUMAH SAKIT
 # Diagnostic Dashboard - Identifikasi Penyebab
 
+import functools
+
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
+
+import figures
+from appointment_stream import SLOT_HOURS, appointment_breakdowns
+from cube import CUBE_DIMS, filtered_frames, query, slice_cube
+from data_loader import (APPT_DROP_REASONS, DEFAULT_DAYS, DEPARTMENTS, TARGET_WAIT,
+                         WAIT_DROP_REASONS, build_frames, builtin_frames)
+from erlang import recommend_staffing
+from figures import FigureCache, filter_key
+from live_stream import EVENT_LOG, EventTail
+from metrics import MetricCache, Metrics
+from occupancy import occupancy_frames, occupancy_totals, slot_occupancy
+from risk import no_show_risk, risk_fingerprint, risk_frames, risk_matrix, risk_totals
+from partitions import data_fingerprint, refresh
+from profiling import ProfileStore, RerunProfile, process_memory
+from query_store import ensure_store
+from queue_sim import DEFAULT_SERVICE_MINUTES, simulate_roster
+from forecast import (HORIZON, DemandForecast, forecast_cube, forecast_day_frame,
+                      forecast_hour_frame)
+from rollups import DailyRollup
+from snapshot import latest_snapshot, load_snapshot, snapshot_fingerprint
+from stats import bucket_stats, findings
 
 # ============================================================
 # PAGE CONFIGURATION
@@ -65,52 +84,284 @@ st.markdown("""
 # ============================================================
 
 @st.cache_data
-def load_data():
-    """Load semua data hasil analisis"""
-    
-    dept_df = pd.DataFrame({
-        'Department': ['Neurology', 'Internal Medicine', 'General Surgery',
-                       'Orthopedics', 'Cardiology', 'Emergency', 'Oncology',
-                       'Pediatrics', 'Obstetrics', 'Radiology'],
-        'Avg_Wait': [165, 161, 161, 155, 153, 149, 149, 146, 146, 138],
-        'Total_Patients': [498, 504, 506, 492, 483, 485, 528, 526, 480, 489]
-    })
-    
-    hour_df = pd.DataFrame({
-        'Hour': list(range(7, 18)),
-        'Wait_Time': [151, 150, 155, 150, 152, 153, 149, 152, 153, 156, 151],
-        'Volume': [157, 575, 535, 550, 545, 578, 564, 542, 562, 377, 106],
-        'Staff': [4.9, 5.0, 5.1, 4.9, 4.9, 4.9, 5.0, 4.9, 5.0, 5.0, 5.3]
-    })
-    
-    day_df = pd.DataFrame({
-        'Day': ['Senin', 'Selasa', 'Rabu', 'Kamis', 'Jumat', 'Sabtu', 'Minggu'],
-        'Wait_Time': [155, 151, 153, 151, 148, 152, 154],
-        'Volume': [715, 757, 691, 655, 710, 741, 722]
-    })
-    
-    staff_df = pd.DataFrame({
-        'Doctors': [2, 3, 4, 5, 6, 7],
-        'Wait_Time': [146.8, 152.7, 152.2, 152.1, 153.5, 154.9],
-        'Patients': [112, 731, 1488, 1806, 700, 154]
-    })
-    
-    triage_df = pd.DataFrame({
-        'Category': ['Immediate', 'Emergency', 'Urgent', 'Semi-urgent', 'Non-urgent'],
-        'Wait_Time': [107, 110, 129, 149, 175],
-        'Count': [93, 399, 958, 1477, 2064],
-        'Percentage': [1.9, 8.0, 19.2, 29.6, 41.4]
-    })
-    
-    appt_df = pd.DataFrame({
-        'Status': ['Hadir', 'Dibatalkan', 'No-Show'],
-        'Count': [86032, 18254, 6615],
-        'Percentage': [77.2, 16.4, 5.9]
-    })
-    
-    return dept_df, hour_df, day_df, staff_df, triage_df, appt_df
-
-dept_df, hour_df, day_df, staff_df, triage_df, appt_df = load_data()
+def load_data(fingerprint):
+    """Load semua data hasil analisis (cache di-key dengan fingerprint partisi data)"""
+    
+    if fingerprint is None:
+        return builtin_frames(), None
+    
+    # Hanya partisi baru/berubah yang diagregasi ulang
+    totals = refresh()
+    return build_frames(totals), totals
+
+@st.cache_resource(max_entries=2)
+def open_snapshot(path):
+    """Snapshot hasil precompute.py, di-mmap sekali per proses dan dibagi ke semua sesi.
+    Versi lama dilepas dari cache saat versi baru terbuka sehingga mapping-nya ikut lepas."""
+    return load_snapshot(path)
+
+def close_store(store):
+    if store is not None:
+        store.close()
+
+@st.cache_resource(max_entries=1, on_release=close_store)
+def open_store(fingerprint):
+    """Store SQLite terindeks untuk filter tanggal/departemen (hanya partisi yang berubah
+    diperbarui); koneksi versi sebelumnya ditutup saat versi baru dibuka"""
+    return ensure_store()
+
+@st.cache_data(max_entries=64)
+def store_partials(fingerprint, start, end, departments):
+    """Partial aggregates hasil range query terindeks di store"""
+    return open_store(fingerprint).partials(start, end, list(departments))
+
+@st.cache_resource
+def daily_rollup():
+    """Prefix sum harian, diperpanjang in place saat hari baru masuk; dibagi ke semua sesi"""
+    return DailyRollup()
+
+@st.cache_resource(max_entries=2)
+def shared_rollup(path):
+    """Prefix sum harian dari bagian shared snapshot (mmap, dibagi antar proses);
+    snapshot tanpa bagian itu memakai rollup privat proses"""
+    snapshot = open_snapshot(path)
+    return DailyRollup.from_arrays(snapshot['shared'], snapshot['fingerprint']) or daily_rollup()
+
+@st.cache_resource
+def demand_forecast():
+    """State Holt-Winters semua seri dept × jam, dilanjutkan dengan hari baru dari rollup"""
+    return DemandForecast()
+
+@st.cache_resource
+def profile_store():
+    """Riwayat profiling rerun, dibagi ke semua sesi dalam proses"""
+    return ProfileStore()
+
+@st.cache_resource
+def figure_cache():
+    """Cache LRU figure Plotly, dibagi ke semua sesi dalam proses"""
+    return FigureCache()
+
+@st.cache_resource
+def metric_cache():
+    """Memo metrik headline per versi frame sumber, dibagi ke semua sesi dalam proses"""
+    return MetricCache()
+
+prof = RerunProfile(page=st.session_state.get('page'),
+                    track_alloc=st.session_state.get('debug_profile', False))
+
+# Snapshot precompute.py (cron) dipakai hanya jika dibangun dari data saat ini; selain itu
+# agregasi incremental langsung dari partisi. Dashboard tidak pernah mem-publish snapshot.
+with prof.stage("load_data"):
+    fingerprint = data_fingerprint()
+    snapshot_path = latest_snapshot()
+    if snapshot_path is not None and snapshot_fingerprint(snapshot_path) != fingerprint:
+        snapshot_path = None
+    if snapshot_path is not None:
+        snapshot = open_snapshot(str(snapshot_path))
+        (dept_df, hour_df, day_df, staff_df, triage_df, appt_df) = snapshot['frames']
+        cube = snapshot['arrays'] or None
+        data_version = snapshot['version']
+        snapshot_findings = snapshot['findings']
+    else:
+        data_version = fingerprint or 'builtin'
+        (dept_df, hour_df, day_df, staff_df, triage_df, appt_df), cube = load_data(fingerprint)
+        snapshot_findings = None
+    # Filter tanggal/departemen butuh data record-level
+    store = open_store(fingerprint) if fingerprint is not None else None
+    rollup = None
+    if store is not None:
+        rollup = shared_rollup(str(snapshot_path)) if snapshot_path is not None else daily_rollup()
+        rollup.sync(store)
+        demand_forecast().sync(rollup)
+
+@st.cache_data
+def run_simulation(hour_df, triage_df, schedule, replications, service_minutes, days):
+    """Hasil Monte Carlo di-cache per kombinasi roster & parameter"""
+    summary, _ = simulate_roster(hour_df, triage_df, schedule, replications,
+                                 service_minutes, days)
+    return summary
+
+@st.cache_resource
+def event_tail(path):
+    """Satu tailer per proses; offset file & window dibagi ke semua sesi"""
+    return EventTail(path)
+
+# Data per view dihitung saat view pertama kali dibuka, lalu di-cache per (versi data, filter)
+@st.cache_data(max_entries=64)
+def filtered_view(version, key, _cube):
+    """Frame dan cube count hasil cross-filter"""
+    filters = dict(key)
+    return filtered_frames(_cube, filters), {'cube_count': slice_cube(_cube['cube_count'], filters)}
+
+@st.cache_data(max_entries=64)
+def staffing(version, key, days, _dept_df, _hour_df, _cube):
+    """Rekomendasi Erlang-C (hanya view Per Jam)"""
+    return recommend_staffing(_dept_df, _hour_df, days, cube=_cube)
+
+@st.cache_data(max_entries=64)
+def forecast_staffing(version, key, service_minutes, _dept_df, _hour_df, _cube):
+    """Rekomendasi Erlang-C dari forecast minggu depan (hanya view Per Jam)"""
+    per_cell, _, _ = recommend_staffing(_dept_df, _hour_df, HORIZON, cube=_cube,
+                                        service_minutes=service_minutes)
+    return per_cell
+
+@st.cache_data
+def waste_breakdowns(version, _cube):
+    """Breakdown waste per bulan & departemen (hanya view Root Cause)"""
+    return appointment_breakdowns(_cube)
+
+@st.cache_data
+def slot_occupancy_view(fingerprint):
+    """Total & breakdown jam-dokter dari rekonstruksi jadwal (hanya view Root Cause);
+    None jika log appointment tidak punya kolom jadwal"""
+    result = slot_occupancy()
+    return None if result is None else (occupancy_totals(result), occupancy_frames(result))
+
+@st.cache_data
+def no_show_risk_view(fingerprint):
+    """Skor risiko appointment book (hanya view Root Cause); model & tabel fitur
+    di-cache di disk, jadi data baru hanya memproses file baru"""
+    result = no_show_risk()
+    return risk_totals(result), risk_frames(result), risk_matrix(result)
+
+@st.cache_data
+def bootstrap_findings(fingerprint):
+    """Estimasi + bootstrap CI dari data record-level (hanya view Per Hari & Korelasi)"""
+    return findings(bucket_stats())
+
+def bootstrap_result():
+    """Bootstrap CI dari snapshot precompute; tanpa snapshot dihitung sekali per versi data"""
+    if snapshot_findings is not None:
+        return snapshot_findings
+    with prof.stage("bootstrap"):
+        return bootstrap_findings(fingerprint)
+
+def confidence_caption(result, name, fmt, unit="", filtered=False):
+    """Caption selang kepercayaan bootstrap satu temuan. CI selalu dari seluruh data:
+    jika filter aktif, caption menyebut bahwa chart di sebelahnya memakai subset."""
+    ci = result[name]
+    scope = "seluruh data, bukan filter aktif di chart" if filtered else "seluruh data"
+    st.caption(f"CI {result['confidence']:.0%} bootstrap: {ci['low']:{fmt}} .. "
+               f"{ci['high']:{fmt}}{unit} ({result['resamples']:,} resample, "
+               f"{result['n_records']:,} record {scope})")
+
+def gap_conclusion(gap, confidence):
+    """Kesimpulan selisih Senin − Jumat dari CI bootstrap: signifikan hanya jika CI tidak
+    melewati 0"""
+    interval = (f"{gap['estimate']:+.1f} menit, CI {confidence:.0%} "
+                f"{gap['low']:+.1f} .. {gap['high']:+.1f}")
+    if gap['low'] > 0:
+        return f"Selisih Senin − Jumat ({interval}) signifikan: weekend backlog effect terlihat."
+    if gap['high'] < 0:
+        return (f"Selisih Senin − Jumat ({interval}) signifikan, tetapi Senin justru lebih cepat: "
+                "tidak ada weekend backlog effect.")
+    return (f"Selisih Senin − Jumat ({interval}) tidak signifikan (CI melewati 0): "
+            "belum ada bukti weekend backlog effect.")
+
+def view_metrics(**frames):
+    """Metrik untuk frame yang digambar sebuah view (cross-filter/rentang tanggal); memo
+    privat supaya entri headline di cache bersama tidak tergantikan"""
+    return Metrics(frames)
+
+def fmt(value, spec="", unit=""):
+    """Format angka metrik; None/NaN (frame kosong, pembagi 0) ditampilkan n/a"""
+    return "n/a" if value is None or value != value else f"{value:{spec}}{unit}"
+
+def correlation_text(value):
+    """Korelasi headline untuk teks temuan; NaN = frame tanpa Wait_Std (data bawaan)"""
+    if value != value:
+        return "tidak tersedia (butuh data record-level)"
+    return f"{value:+.3f}" + (" (≈ 0)" if abs(value) < 0.1 else "")
+
+# ============================================================
+# CHART HELPERS
+# ============================================================
+
+def show_chart(fig, name, key=()):
+    """st.plotly_chart dengan timing serialisasi + kirim figure ke browser.
+    Key elemen eksplisit (nama + key filter): dua chart dengan figure identik di satu
+    halaman (mis. heatmap rekomendasi historis & forecast yang sama) tidak bentrok ID."""
+    with prof.stage(f"serialize:{name}"):
+        st.plotly_chart(fig, use_container_width=True, key=f"chart:{name}:{key}")
+
+def chart(name, build, *args, key=()):
+    """Ambil figure dari cache bersama (versi data, view, key filter); build hanya saat miss"""
+    with prof.stage(f"figure:{name}"):
+        fig = figure_cache().get((data_version, name, key), lambda: build(*args))
+    show_chart(fig, name, key)
+
+def next_week_forecast(view_key):
+    """Forecast Holt-Winters minggu depan; None tanpa rollup, dengan cross-filter
+    (forecast hanya per departemen × jam), atau sebelum dua minggu data"""
+    if rollup is None or view_key:
+        return None
+    with prof.stage("forecast"):
+        return demand_forecast().forecast()
+
+def date_range_slider(key, view_key):
+    """Slider rentang tanggal di dalam periode sidebar; None jika rentang penuh.
+
+    Hanya tanpa cross-filter: prefix sum harian tidak punya sumbu triage/dokter.
+    """
+    if rollup is None or view_key or period_start == period_end:
+        return None
+    start, end = st.slider("Rentang tanggal", min_value=period_start, max_value=period_end,
+                           value=(period_start, period_end), format="DD MMM YYYY",
+                           key=f"{key}:{period_start}:{period_end}")
+    return None if (start, end) == (period_start, period_end) else (start, end)
+
+def profiled_fragment(name, **fragment_kwargs):
+    """st.fragment dengan profil sendiri: rerun fragment tidak melewati footer/profil halaman"""
+    def decorate(func):
+        @st.fragment(**fragment_kwargs)
+        @functools.wraps(func)
+        def run(*args, **kwargs):
+            global prof
+            outer = prof
+            prof = RerunProfile(page=st.session_state.get('page'), fragment=name,
+                                track_alloc=st.session_state.get('debug_profile', False))
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profile_store().add(prof)
+                prof = outer
+        return run
+    return decorate
+
+# ============================================================
+# LIVE MODE
+# ============================================================
+
+LIVE_REFRESH_SECONDS = 10
+
+@profiled_fragment("live", run_every=LIVE_REFRESH_SECONDS)
+def live_panel():
+    """Panel metrik live; hanya fragment ini yang dijalankan ulang tiap refresh"""
+    tail = event_tail(str(EVENT_LOG))
+    tail.poll()
+    live = tail.summary()
+    overall = live.iloc[-1]
+    depts = live.iloc[:len(DEPARTMENTS)]
+    
+    def minutes(value):
+        return "-" if pd.isna(value) else f"{value:.0f} menit"
+    
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("⏱️ Wait 15 menit terakhir", minutes(overall['Avg_Wait 15 menit']),
+                delta=f"{overall['Patients 15 menit']} pasien", delta_color="off")
+    col2.metric("⏱️ Wait 1 jam terakhir", minutes(overall['Avg_Wait 1 jam']),
+                delta=f"{overall['Patients 1 jam']} pasien", delta_color="off")
+    col3.metric("📊 Departemen > target (1 jam)",
+                f"{(depts['Avg_Wait 1 jam'] > TARGET_WAIT).sum()}/{(depts['Patients 1 jam'] > 0).sum()}")
+    col4.metric("🧍 Sedang menunggu", f"{overall['Menunggu']}",
+                delta=f"hari ini {minutes(overall['Avg_Wait hari ini'])}", delta_color="off")
+    if tail.malformed or tail.metrics.stale:
+        st.caption(f"⚠️ Dilewati: {tail.malformed} baris event tidak valid, "
+                   f"{tail.metrics.stale} event dari hari sebelumnya")
+
+    with st.expander("Detail per departemen & triage"):
+        st.dataframe(live.round(1), hide_index=True, use_container_width=True)
 
 # ============================================================
 # SIDEBAR
@@ -122,11 +373,55 @@ with st.sidebar:
     
     page = st.radio(
         "Pilih Halaman:",
-        ["🏠 Ringkasan Eksekutif", "🔍 Analisis Detail"]
+        ["🏠 Ringkasan Eksekutif", "🔍 Analisis Detail"],
+        key='page'
     )
     
+    st.toggle("🐞 Debug profiling", key='debug_profile',
+              help="Tampilkan p50/p95 waktu & alokasi per tahap rerun")
+    
+    live_mode = st.toggle("📡 Mode live", key='live_mode', disabled=not EVENT_LOG.exists(),
+                          help=f"Metrik bergulir dari file event {EVENT_LOG}")
+    
     st.markdown("---")
     
+    # Filter data: range query terindeks di store, menggantikan frame & cube seluruh periode
+    period_start = period_end = None
+    period_departments = []
+    period_filtered = False
+    period_days = DEFAULT_DAYS
+    if store is not None and store.date_range() is not None:
+        st.markdown("### 🗓️ Filter Data")
+        first_day, last_day = store.date_range()
+        period = st.date_input("Periode", (first_day, last_day),
+                               min_value=first_day, max_value=last_day)
+        period_departments = st.multiselect("Departemen", DEPARTMENTS, key='store_departments')
+        
+        # Rentang yang baru dipilih separuh (satu tanggal) diperlakukan sebagai satu hari
+        period_start, period_end = (period[0], period[-1]) if period else (first_day, last_day)
+        if (period_start, period_end) != (first_day, last_day) or period_departments:
+            with prof.stage("store_query"):
+                totals = store_partials(fingerprint, period_start, period_end,
+                                        tuple(period_departments))
+                (dept_df, hour_df, day_df, staff_df, triage_df, appt_df) = build_frames(totals)
+            cube = totals
+            period_filtered = True
+            data_version = f"{fingerprint}|{period_start}..{period_end}|{','.join(period_departments)}"
+            period_days = (period_end - period_start).days + 1
+            st.caption(f"{int(totals['cube_count'].sum()):,} pasien, "
+                       f"{int(totals['status_count'].sum()):,} appointment terpilih")
+        
+        st.markdown("---")
+    
+    # Record yang dibuang dari agregat (kolom kosong/tidak valid) dilaporkan per alasan
+    dropped = [f"{int(n):,} {label} tanpa {reason}"
+               for key, label, reasons in [('wait_dropped', 'pasien', WAIT_DROP_REASONS),
+                                           ('appt_dropped', 'appointment', APPT_DROP_REASONS)]
+               if cube is not None and key in cube
+               for reason, n in zip(reasons, cube[key]) if n]
+    if dropped:
+        st.caption("⚠️ Tidak dihitung (data tidak valid): " + ", ".join(dropped))
+    
     st.markdown("### 📋 Info Dataset")
     st.info("""
     **Dataset 1:** Hospital Wait Time
@@ -150,196 +445,220 @@ with st.sidebar:
     PySpark | Streamlit | Plotly
     """)
 
+# Angka headline dihitung lazy dari frame setelah filter sidebar: hanya metrik yang dibaca
+# halaman aktif, dan hanya jika frame sumbernya berubah sejak dihitung terakhir
+headline = Metrics((dept_df, hour_df, day_df, staff_df, triage_df, appt_df), metric_cache())
+
 # ============================================================
 # PAGE 1: RINGKASAN EKSEKUTIF
 # ============================================================
 
-if page == "🏠 Ringkasan Eksekutif":
-    
-    st.markdown('<p class="big-title">🏥 Analisis Waktu Tunggu Rumah Sakit</p>', 
-                unsafe_allow_html=True)
-    
-    st.markdown("""
-    <div class="question-box">
-    <b>🎯 Pertanyaan Bisnis:</b><br>
-    "Apa penyebab utama tingginya waktu tunggu pasien di rumah sakit?"
-    </div>
-    """, unsafe_allow_html=True)
-    
-    # Key Metrics
+@profiled_fragment("executive:metrics")
+def key_metrics():
+    """Headline metrics halaman eksekutif"""
     st.markdown("## 📊 Kondisi Saat Ini")
     
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        st.metric("⏱️ Waktu Tunggu", "152 menit", 
-                  delta="+32 min dari target", delta_color="inverse")
+        st.metric("⏱️ Waktu Tunggu", fmt(headline['avg_wait'], '.0f', " menit"), 
+                  delta=fmt(headline['wait_gap'], '+.0f', " min dari target"),
+                  delta_color="inverse")
     
     with col2:
-        st.metric("🎯 Target Standar", "120 menit", 
+        st.metric("🎯 Target Standar", f"{headline['target_wait']} menit", 
                   delta="Standar industri")
     
     with col3:
-        st.metric("📊 Status Departemen", "10/10", 
-                  delta="100% di atas target", delta_color="inverse")
+        st.metric("📊 Status Departemen",
+                  f"{headline['depts_above_target']}/{headline['n_departments']}", 
+                  delta=f"{headline['depts_above_pct']}% di atas target", delta_color="inverse")
     
     with col4:
-        st.metric("🚨 Akar Masalah", "22.3%", 
+        st.metric("🚨 Akar Masalah", f"{headline['waste_pct']}%", 
                   delta="Appointment waste")
+
+@profiled_fragment("executive:root_cause")
+def root_cause_summary():
+    """Ringkasan appointment waste + donut status appointment"""
+    col1, col2 = st.columns([1, 1])
+    statuses = "\n".join(f"        - **{status}:** {count:,} ({pct}%)"
+                          for status, (count, pct) in headline['status_stats'].items())
     
-    st.markdown("---")
-    
-    # JAWABAN
-    st.markdown("## 🔍 JAWABAN: 5 Penyebab Utama + 1 Root Cause")
+    with col1:
+        st.error(f"""
+        ### 📉 Penyebab Fundamental
+        
+        Dari {headline['total_appointments']:,} appointments:
+{statuses}
+        - **TOTAL WASTE:** {headline['waste_count']:,} ({headline['waste_pct']}%)
+        
+        **Dampak:**
+        - {headline['wasted_doctor_hours']:,.0f} jam-dokter terbuang
+        - Kapasitas efektif -{headline['waste_pct']}%
+        - Slot kosong tidak dapat dipulihkan
+        - Pasien walk-in terakumulasi
+        
+        **Ini menjelaskan kenapa:**
+        Menambah dokter TIDAK efektif! Masalahnya bukan kekurangan sumber daya, tapi **UTILISASI YANG RENDAH**.
+        """)
     
-    st.markdown("""
+    with col2:
+        chart("appt", figures.appointment_donut, appt_df)
+
+def cause_cards():
+    """Kartu temuan 5 penyebab dari headline"""
+    above, n_depts = headline['depts_above_target'], headline['n_departments']
+    wait_low, wait_high = headline['dept_wait_range']
+    (low_dept, low_gap), (high_dept, high_gap) = headline['dept_gap_extremes']
+    st.markdown(f"""
     <div class="cause-card">
     <h3>1️⃣ MASALAH SISTEMIK (Hospital-Wide)</h3>
-    <p><b>Temuan:</b> SEMUA 10 departemen melebihi target 120 menit</p>
+    <p><b>Temuan:</b> {'SEMUA' if above == n_depts else f'{above} dari'} {n_depts} departemen melebihi target {headline['target_wait']} menit</p>
     <ul>
-        <li>Rentang: 138-165 menit</li>
-        <li>Gap terkecil: Radiology +18 menit</li>
-        <li>Gap terbesar: Neurology +45 menit</li>
+        <li>Rentang: {wait_low:.0f}-{wait_high:.0f} menit</li>
+        <li>Gap terkecil: {low_dept} {low_gap:+.0f} menit</li>
+        <li>Gap terbesar: {high_dept} {high_gap:+.0f} menit</li>
     </ul>
     <p><b>💡 Kesimpulan:</b> Masalah bukan di departemen spesifik, tapi di <b>SISTEM OPERASIONAL</b> yang mempengaruhi seluruh rumah sakit.</p>
     </div>
     """, unsafe_allow_html=True)
     
-    st.markdown("""
+    staff_low, staff_high = headline['staff_range']
+    volume_low, volume_high = headline['volume_range']
+    peak = " dan ".join(f"{hour:02d}:00" for hour in headline['peak_hours'])
+    st.markdown(f"""
     <div class="cause-card">
     <h3>2️⃣ POLA STAFFING TIDAK DINAMIS</h3>
-    <p><b>Temuan:</b> Jumlah dokter flat (4.9-5.3) di semua jam</p>
+    <p><b>Temuan:</b> Jumlah dokter flat ({staff_low:.1f}-{staff_high:.1f}) di semua jam</p>
     <ul>
-        <li>Variasi staffing: 8%</li>
-        <li>Variasi volume pasien: 442% (106-578 pasien/jam)</li>
-        <li>Peak hours: Jam 09:00 dan 16:00</li>
+        <li>Variasi staffing: {fmt(headline['staffing_variation_pct'], unit='%')}</li>
+        <li>Variasi volume pasien: {fmt(headline['volume_variation_pct'], unit='%')} ({volume_low}-{volume_high} pasien/jam)</li>
+        <li>Peak hours: Jam {peak}</li>
     </ul>
     <p><b>💡 Kesimpulan:</b> Staffing tidak responsif terhadap demand → <b>Understaffed di jam sibuk, overstaffed di jam sepi</b></p>
     </div>
     """, unsafe_allow_html=True)
     
-    st.markdown("""
+    days = headline['day_stats']
+    best = headline['best_day']
+    st.markdown(f"""
     <div class="cause-card">
     <h3>3️⃣ WEEKEND BACKLOG</h3>
     <p><b>Temuan:</b> Hari Senin memiliki waktu tunggu tertinggi</p>
     <ul>
-        <li>Senin: 155 menit dengan 715 pasien</li>
-        <li>Minggu: 722 pasien (volume tertinggi)</li>
-        <li>Jumat: 148 menit dengan 710 pasien (performa terbaik)</li>
+        <li>Senin: {fmt(days['Senin'][0], '.0f', ' menit')} dengan {days['Senin'][1]:,} pasien</li>
+        <li>Minggu: {days['Minggu'][1]:,} pasien</li>
+        <li>{best}: {days[best][0]:.0f} menit dengan {days[best][1]:,} pasien (performa terbaik)</li>
     </ul>
     <p><b>💡 Kesimpulan:</b> Pasien terakumulasi selama weekend dan datang bersamaan di Senin tanpa mekanisme khusus untuk menangani lonjakan.</p>
     </div>
     """, unsafe_allow_html=True)
     
-    st.markdown("""
+    (high_doctors, high_wait), (low_doctors, low_wait) = headline['shift_extremes']
+    st.markdown(f"""
     <div class="cause-card">
     <h3>4️⃣ ALOKASI SUMBER DAYA TIDAK EFEKTIF</h3>
-    <p><b>Temuan:</b> Korelasi dokter vs waktu tunggu = +0.014 (≈ 0)</p>
+    <p><b>Temuan:</b> Korelasi dokter vs waktu tunggu = {correlation_text(headline['correlation'])}</p>
     <ul>
-        <li>Shift 7 dokter: 154.9 menit (TERTINGGI)</li>
-        <li>Shift 2 dokter: 146.8 menit (terendah)</li>
+        <li>Shift {high_doctors} dokter: {high_wait:.1f} menit (TERTINGGI)</li>
+        <li>Shift {low_doctors} dokter: {low_wait:.1f} menit (terendah)</li>
         <li>Paradoks: Lebih banyak dokter ≠ waktu tunggu lebih rendah</li>
     </ul>
     <p><b>💡 Kesimpulan:</b> Dokter ditempatkan secara reaktif di jam yang sudah sibuk, bukan proaktif berdasarkan prediksi.</p>
     </div>
     """, unsafe_allow_html=True)
     
-    st.markdown("""
+    triage = headline['triage_stats']
+    non_urgent = headline['non_urgent_pct']
+    st.markdown(f"""
     <div class="cause-card">
-    <h3>5️⃣ 71% PASIEN NON-URGENT MEMENUHI SISTEM</h3>
+    <h3>5️⃣ {non_urgent}% PASIEN NON-URGENT MEMENUHI SISTEM</h3>
     <p><b>Temuan:</b> Mayoritas pasien tidak memerlukan sumber daya klinik utama</p>
     <ul>
-        <li>Non-urgent: 41.4% (wait 175 menit)</li>
-        <li>Semi-urgent: 29.6% (wait 149 menit)</li>
-        <li>Total: 71% pasien untuk kasus simple</li>
+        <li>Non-urgent: {triage['Non-urgent'][0]}% (wait {fmt(triage['Non-urgent'][1], '.0f', ' menit')})</li>
+        <li>Semi-urgent: {triage['Semi-urgent'][0]}% (wait {fmt(triage['Semi-urgent'][1], '.0f', ' menit')})</li>
+        <li>Total: {non_urgent}% pasien untuk kasus simple</li>
     </ul>
     <p><b>💡 Kesimpulan:</b> Pasien non-urgent mengantri bersama pasien urgent, menciptakan kemacetan dan mengonsumsi sumber daya yang seharusnya untuk emergency.</p>
     </div>
     """, unsafe_allow_html=True)
+
+def executive_page():
+    
+    st.markdown('<p class="big-title">🏥 Analisis Waktu Tunggu Rumah Sakit</p>', 
+                unsafe_allow_html=True)
+    
+    st.markdown("""
+    <div class="question-box">
+    <b>🎯 Pertanyaan Bisnis:</b><br>
+    "Apa penyebab utama tingginya waktu tunggu pasien di rumah sakit?"
+    </div>
+    """, unsafe_allow_html=True)
+    
+    if live_mode:
+        st.markdown("## 📡 Live: Kondisi Saat Ini")
+        live_panel()
+    
+    # Key Metrics
+    key_metrics()
     
     st.markdown("---")
     
-    # ROOT CAUSE
-    st.markdown("## 🚨 ROOT CAUSE: Appointment Waste 22.3%")
+    # JAWABAN
+    st.markdown("## 🔍 JAWABAN: 5 Penyebab Utama + 1 Root Cause")
     
-    col1, col2 = st.columns([1, 1])
+    if headline['avg_wait'] is None:
+        st.info("Tidak ada kunjungan pasien pada filter ini")
+    else:
+        cause_cards()
     
-    with col1:
-        st.error("""
-        ### 📉 Penyebab Fundamental
-        
-        Dari 110,901 appointments:
-        - **Hadir:** 86,032 (77.2%)
-        - **Dibatalkan:** 18,254 (16.4%)
-        - **No-Show:** 6,615 (5.9%)
-        - **TOTAL WASTE:** 24,869 (22.3%)
-        
-        **Dampak:**
-        - 12,434 jam-dokter terbuang
-        - Kapasitas efektif -22.3%
-        - Slot kosong tidak dapat dipulihkan
-        - Pasien walk-in terakumulasi
-        
-        **Ini menjelaskan kenapa:**
-        Menambah dokter TIDAK efektif! Masalahnya bukan kekurangan sumber daya, tapi **UTILISASI YANG RENDAH**.
-        """)
+    st.markdown("---")
     
-    with col2:
-        fig_waste = go.Figure(data=[go.Pie(
-            labels=appt_df['Status'],
-            values=appt_df['Count'],
-            hole=0.5,
-            marker_colors=['#10b981', '#f59e0b', '#dc2626'],
-            textinfo='label+percent'
-        )])
-        
-        total_appts = appt_df['Count'].sum()
-        fig_waste.update_layout(
-            title="Distribusi Status Appointment",
-            annotations=[dict(text=f'{total_appts:,}<br>Total', x=0.5, y=0.5, 
-                              font_size=16, showarrow=False)],
-            height=400
-        )
-        
-        st.plotly_chart(fig_waste, use_container_width=True)
+    # ROOT CAUSE
+    st.markdown(f"## 🚨 ROOT CAUSE: Appointment Waste {headline['waste_pct']}%")
+    
+    root_cause_summary()
     
     st.markdown("---")
     
     # Keterkaitan
     st.markdown("## 🔗 Keterkaitan Antar Penyebab")
     
-    st.info("""
+    days = headline['day_stats']
+    non_urgent = headline['non_urgent_pct']
+    st.info(f"""
     Kelima penyebab **SALING TERKAIT** dalam siklus setan:
     
-    **Appointment Waste 22.3%** (root cause)
+    **Appointment Waste {headline['waste_pct']}%** (root cause)
     → Kapasitas efektif berkurang
     → Pasien tidak dapat appointment → menjadi walk-in
-    → Walk-in + 71% non-urgent → kemacetan
+    → Walk-in + {non_urgent}% non-urgent → kemacetan
     → Kemacetan di semua departemen (sistemik)
     → Management: tambah dokter di jam sibuk (reaktif)
-    → Root cause tidak ditangani → tambah dokter tidak efektif (korelasi ≈ 0)
+    → Root cause tidak ditangani → tambah dokter tidak efektif (korelasi {correlation_text(headline['correlation'])})
     → Weekend backlog memperparah
     → Waktu tunggu tetap tinggi
     → Pasien frustrasi → lebih sering cancel/no-show
     → Kembali ke awal (**Siklus Setan**)
     """)
     
-    st.success("""
+    st.success(f"""
     ## ✅ Kesimpulan Diagnostic
     
     **JAWABAN PERTANYAAN BISNIS:**
     
     Penyebab utama tingginya waktu tunggu adalah **kombinasi dari 5 faktor** yang saling terkait:
     
-    1. **Masalah sistemik** (100% departemen di atas target)
-    2. **Staffing tidak dinamis** (8% variasi vs 442% demand)
-    3. **Weekend backlog** (Senin 155 min, surge tidak di-handle)
-    4. **Alokasi sumber daya tidak efektif** (korelasi ≈ 0)
-    5. **71% non-urgent memenuhi sistem** (no flow separation)
+    1. **Masalah sistemik** ({headline['depts_above_pct']}% departemen di atas target)
+    2. **Staffing tidak dinamis** ({fmt(headline['staffing_variation_pct'], unit='%')} variasi vs {fmt(headline['volume_variation_pct'], unit='%')} demand)
+    3. **Weekend backlog** (Senin {fmt(days['Senin'][0], '.0f', ' min')}, surge tidak di-handle)
+    4. **Alokasi sumber daya tidak efektif** (korelasi {correlation_text(headline['correlation'])})
+    5. **{non_urgent}% non-urgent memenuhi sistem** (no flow separation)
     
-    **ROOT CAUSE yang mendasari semua penyebab:** **Appointment Waste 22.3%**
+    **ROOT CAUSE yang mendasari semua penyebab:** **Appointment Waste {headline['waste_pct']}%**
     
-    Pembaziran 24,869 appointments (12,434 jam-dokter) menciptakan siklus setan yang memperburuk semua penyebab lainnya.
+    Pembaziran {headline['waste_count']:,} appointments ({headline['wasted_doctor_hours']:,.0f} jam-dokter) menciptakan siklus setan yang memperburuk semua penyebab lainnya.
     
     📊 **Lihat analisis detail di halaman "Analisis Detail"**
     """)
@@ -348,288 +667,393 @@ if page == "🏠 Ringkasan Eksekutif":
 # PAGE 2: ANALISIS DETAIL
 # ============================================================
 
-else:  # Analisis Detail
+@profiled_fragment("view:dept")
+def dept_view(dept_df, view_key):
+    st.markdown("### 🏥 Penyebab #1: Masalah Sistemik")
     
-    st.markdown("## 🔍 Analisis Detail per Penyebab")
+    if dept_df.empty:
+        st.info("Tidak ada kunjungan pada filter ini")
+        return
+    chart("dept", figures.dept_chart, dept_df, key=view_key)
     
-    st.info("Pilih dimensi analisis untuk melihat data dan visualisasi detail")
+    col1, col2 = st.columns(2)
     
-    dimension = st.selectbox(
-        "Pilih dimensi analisis:",
-        ["1️⃣ Masalah Sistemik (Departemen)", 
-         "2️⃣ Staffing Tidak Dinamis (Per Jam)",
-         "3️⃣ Weekend Backlog (Per Hari)", 
-         "4️⃣ Alokasi Sumber Daya (Korelasi)",
-         "5️⃣ Non-Urgent Congest (Triage)",
-         "🚨 Root Cause (Appointment Waste)"]
-    )
+    with prof.stage("dept:nlargest/nsmallest"):
+        worst = dept_df.nlargest(2, 'Avg_Wait')
+        best = dept_df.nsmallest(1, 'Avg_Wait')
     
-    # Departemen
-    if "Departemen" in dimension:
-        st.markdown("### 🏥 Penyebab #1: Masalah Sistemik")
-        
-        fig_dept = px.bar(
-            dept_df.sort_values('Avg_Wait'),
-            x='Avg_Wait',
-            y='Department',
-            orientation='h',
-            color='Avg_Wait',
-            color_continuous_scale='RdYlGn_r',
-            text='Avg_Wait',
-            title='Waktu Tunggu per Departemen',
-            labels={'Avg_Wait': 'Waktu Tunggu (menit)'}
-        )
-        
-        fig_dept.add_vline(x=120, line_dash="dash", line_color="green", 
-                           annotation_text="Target: 120 min")
-        fig_dept.update_traces(texttemplate='%{text:.0f} min', textposition='outside')
-        fig_dept.update_layout(height=500, showlegend=False)
-        
-        st.plotly_chart(fig_dept, use_container_width=True)
-        
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            st.error(f"""
-            **Terburuk:**
-            - {dept_df.nlargest(1, 'Avg_Wait')['Department'].values[0]}: 
-              {dept_df.nlargest(1, 'Avg_Wait')['Avg_Wait'].values[0]:.0f} menit (+45 min)
-            - {dept_df.nlargest(2, 'Avg_Wait').iloc[1]['Department']}: 
-              {dept_df.nlargest(2, 'Avg_Wait').iloc[1]['Avg_Wait']:.0f} menit (+41 min)
-            """)
-        
-        with col2:
-            st.success(f"""
-            **Terbaik (masih > target):**
-            - {dept_df.nsmallest(1, 'Avg_Wait')['Department'].values[0]}: 
-              {dept_df.nsmallest(1, 'Avg_Wait')['Avg_Wait'].values[0]:.0f} menit (+18 min)
-            """)
-        
-        st.warning("""
-        **💡 Kesimpulan:**
-        
-        SEMUA 10 departemen melebihi target → **MASALAH SISTEMIK**
-        
-        Penyebab bukan di skill dokter atau peralatan spesifik departemen, 
-        melainkan di sistem operasional yang mempengaruhi seluruh rumah sakit.
-        """)
+    with col1:
+        st.error("**Terburuk:**\n" + "\n".join(
+            f"- {row.Department}: {row.Avg_Wait:.0f} menit ({row.Avg_Wait - TARGET_WAIT:+.0f} min)"
+            for row in worst.itertuples()))
     
-    # Per Jam
-    elif "Per Jam" in dimension:
-        st.markdown("### ⏰ Penyebab #2: Staffing Tidak Dinamis")
-        
-        fig_hour = make_subplots(specs=[[{"secondary_y": True}]])
-        
-        fig_hour.add_trace(
-            go.Scatter(x=hour_df['Hour'], y=hour_df['Wait_Time'], 
-                       name="Wait Time", line=dict(color='red', width=3),
-                       mode='lines+markers'),
-            secondary_y=False,
-        )
-        
-        fig_hour.add_trace(
-            go.Bar(x=hour_df['Hour'], y=hour_df['Volume'], 
-                   name="Volume Pasien", marker_color='lightblue', opacity=0.6),
-            secondary_y=True,
-        )
-        
-        fig_hour.add_trace(
-            go.Scatter(x=hour_df['Hour'], y=hour_df['Staff'], 
-                       name="Jumlah Dokter", line=dict(color='green', width=2, dash='dash'),
-                       mode='lines+markers'),
-            secondary_y=False,
-        )
-        
-        fig_hour.add_hline(y=120, line_dash="dash", line_color="green", 
-                           annotation_text="Target", secondary_y=False)
-        
-        fig_hour.update_layout(
-            title="Pola Per Jam: Wait Time vs Volume vs Staffing",
-            height=500
-        )
-        
-        fig_hour.update_yaxes(title_text="Wait Time (min) / Dokter", secondary_y=False)
-        fig_hour.update_yaxes(title_text="Volume Pasien", secondary_y=True)
-        
-        st.plotly_chart(fig_hour, use_container_width=True)
-        
-        st.warning("""
-        **💡 Kesimpulan:**
-        
-        Staffing flat (4.9-5.3 dokter) tidak mengikuti fluktuasi demand (106-578 pasien).
-        
-        - Variasi staffing: 8%
-        - Variasi volume: 442%
-        - Hasil: Understaffed di jam sibuk, overstaffed di jam sepi
-        """)
+    with col2:
+        label = "masih > target" if best['Avg_Wait'].iloc[0] > TARGET_WAIT else "≤ target"
+        st.success(f"**Terbaik ({label}):**\n" + "\n".join(
+            f"- {row.Department}: {row.Avg_Wait:.0f} menit ({row.Avg_Wait - TARGET_WAIT:+.0f} min)"
+            for row in best.itertuples()))
     
-    # Per Hari
-    elif "Per Hari" in dimension:
-        st.markdown("### 📅 Penyebab #3: Weekend Backlog")
-        
-        fig_day = go.Figure()
-        
-        fig_day.add_trace(go.Bar(
-            x=day_df['Day'], y=day_df['Wait_Time'],
-            marker_color=['#dc2626' if d == 'Senin' else '#3b82f6' for d in day_df['Day']],
-            text=day_df['Wait_Time'],
-            texttemplate='%{text:.0f} min',
-            textposition='outside',
-            name='Wait Time'
-        ))
-        
-        fig_day.add_hline(y=120, line_dash="dash", line_color="green")
+    metrics = view_metrics(dept_df=dept_df)
+    above, n_depts = metrics['depts_above_target'], metrics['n_departments']
+    st.warning(f"""
+    **💡 Kesimpulan:**
+    
+    {'SEMUA' if above == n_depts else f'{above} dari'} {n_depts} departemen melebihi target → **MASALAH SISTEMIK**
+    
+    Penyebab bukan di skill dokter atau peralatan spesifik departemen, 
+    melainkan di sistem operasional yang mempengaruhi seluruh rumah sakit.
+    """)
+
+@profiled_fragment("view:hour")
+def hour_view(dept_df, hour_df, triage_df, view_cube, view_key):
+    st.markdown("### ⏰ Penyebab #2: Staffing Tidak Dinamis")
+    
+    fc = next_week_forecast(view_key)
+    days = period_days
+    date_range = date_range_slider('hour_range', view_key)
+    if date_range is not None:
+        with prof.stage("rollup:hour"):
+            hour_df = rollup.hour_frame(*date_range, period_departments)
+            view_cube = rollup.count_cube(*date_range, period_departments)
+        view_key = (date_range,)
+        days = (date_range[1] - date_range[0]).days + 1
+    
+    if hour_df.empty:
+        st.info("Tidak ada kunjungan pada filter ini")
+        return
+    
+    with prof.stage("erlang"):
+        staff_per_dept, staff_reco, service_minutes = staffing(data_version, view_key, days,
+                                                               dept_df, hour_df, view_cube)
+    
+    # Forecast total minggu depan diskalakan ke jumlah hari chart (bar volume = total periode)
+    hour_forecast = None if fc is None else forecast_hour_frame(fc, period_departments,
+                                                                days / HORIZON)
+    chart("hour", figures.hour_chart, hour_df, staff_reco, hour_forecast, key=view_key)
+    
+    metrics = view_metrics(hour_df=hour_df)
+    staff_low, staff_high = metrics['staff_range']
+    volume_low, volume_high = metrics['volume_range']
+    st.warning(f"""
+    **💡 Kesimpulan:**
+    
+    Staffing flat ({staff_low:.1f}-{staff_high:.1f} dokter) tidak mengikuti fluktuasi demand ({volume_low:,}-{volume_high:,} pasien).
+    
+    - Variasi staffing: {fmt(metrics['staffing_variation_pct'], unit='%')}
+    - Variasi volume: {fmt(metrics['volume_variation_pct'], unit='%')}
+    - Hasil: Understaffed di jam sibuk, overstaffed di jam sepi
+    """)
+    
+    with st.expander("🧮 Rekomendasi Staffing per Departemen (Erlang-C)"):
+        st.caption(f"Model M/M/c, durasi layanan estimasi {service_minutes:.0f} menit, "
+                   f"target rata-rata wait ≤ {TARGET_WAIT} menit")
+        chart("reco", figures.staffing_heatmap, staff_per_dept, key=view_key)
         
-        fig_day.update_layout(
-            title="Waktu Tunggu per Hari",
-            yaxis_title="Waktu Tunggu (menit)",
-            height=400
+        if fc is not None:
+            st.caption(f"Rekomendasi proaktif untuk {HORIZON} hari ke depan dari forecast "
+                       "Holt-Winters volume per departemen × jam")
+            staff_next = forecast_staffing(data_version, view_key, service_minutes, dept_df,
+                                           hour_df, forecast_cube(fc, period_departments))
+            chart("reco_forecast", figures.staffing_heatmap, staff_next, key=view_key)
+    
+    # Simulasi what-if roster dokter
+    with st.expander("🧪 Simulasi Roster Dokter (What-if)"):
+        roster_simulator(hour_df, triage_df, view_key, days)
+
+@profiled_fragment("view:roster")
+def roster_simulator(hour_df, triage_df, view_key, days):
+    """Form roster what-if; submit hanya menjalankan ulang fragment ini"""
+    with st.form("roster_form"):
+        roster = st.data_editor(
+            pd.DataFrame({'Hour': hour_df['Hour'],
+                          'Doctors': hour_df['Staff'].round().astype(int)}),
+            disabled=['Hour'], hide_index=True, use_container_width=True
         )
+        scol1, scol2, scol3 = st.columns(3)
+        replications = scol1.number_input("Replikasi", 50, 1000, 200, step=50)
+        service_minutes = scol2.number_input("Durasi layanan (menit)", 5, 240,
+                                             DEFAULT_SERVICE_MINUTES)
+        days = scol3.number_input("Jumlah hari data", 1, 3650, days)
         
-        st.plotly_chart(fig_day, use_container_width=True)
-        
-        fig_vol = px.bar(day_df, x='Day', y='Volume', 
-                         color='Volume', color_continuous_scale='Blues',
-                         text='Volume', title="Volume Pasien per Hari")
-        fig_vol.update_traces(textposition='outside')
-        fig_vol.update_layout(showlegend=False, height=400)
+        if st.form_submit_button("▶️ Jalankan simulasi"):
+            st.session_state['roster_sim'] = (tuple(roster['Doctors']), replications,
+                                              service_minutes, days)
+    
+    if 'roster_sim' in st.session_state:
+        schedule, replications, service_minutes, days = st.session_state['roster_sim']
+        current = tuple(hour_df['Staff'].round().astype(int))
+        sim_now = run_simulation(hour_df, triage_df, current, replications,
+                                 service_minutes, days)
+        sim_new = run_simulation(hour_df, triage_df, schedule, replications,
+                                 service_minutes, days)
         
-        st.plotly_chart(fig_vol, use_container_width=True)
+        chart("sim", figures.simulation_chart, sim_now, sim_new, replications,
+              key=(view_key, current, st.session_state['roster_sim']))
+        st.dataframe(sim_new.round(1), hide_index=True, use_container_width=True)
+
+@profiled_fragment("view:day")
+def day_view(day_df, view_key):
+    st.markdown("### 📅 Penyebab #3: Weekend Backlog")
+    
+    fc = next_week_forecast(view_key)
+    days = period_days
+    date_range = date_range_slider('day_range', view_key)
+    if date_range is not None:
+        with prof.stage("rollup:day"):
+            day_df = rollup.day_frame(*date_range, period_departments)
+        view_key = (date_range,)
+        days = (date_range[1] - date_range[0]).days + 1
+    
+    chart("day", figures.day_chart, day_df, key=view_key)
+    
+    day_forecast = None if fc is None else forecast_day_frame(fc, period_departments,
+                                                              days / HORIZON)
+    chart("vol", figures.volume_chart, day_df, day_forecast, key=view_key)
+    
+    filtered = bool(view_key) or period_filtered
+    result = bootstrap_result() if fingerprint is not None else None
+    if result is not None:
+        st.metric("Selisih Senin − Jumat", f"{result['monday_friday_gap']['estimate']:+.1f} menit",
+                  help="Rata-rata wait Senin dikurangi Jumat dari data record-level")
+        confidence_caption(result, 'monday_friday_gap', '+.1f', " menit", filtered)
+    
+    if day_df.empty:
+        st.info("Tidak ada kunjungan pada filter ini")
+        return
+    worst = day_df.loc[day_df['Wait_Time'].idxmax()]
+    best = day_df.loc[day_df['Wait_Time'].idxmin()]
+    if result is None:
+        conclusion = "Signifikansi selisih Senin − Jumat butuh data record-level (bootstrap CI)."
+    else:
+        conclusion = gap_conclusion(result['monday_friday_gap'], result['confidence'])
+        if filtered:
+            conclusion += " CI dihitung dari seluruh data, bukan filter aktif."
+    st.warning(f"""
+    **💡 Kesimpulan:**
+    
+    **{worst['Day']}:** {worst['Wait_Time']:.0f} min, {int(worst['Volume']):,} pasien (terburuk)  
+    **{best['Day']}:** {best['Wait_Time']:.0f} min, {int(best['Volume']):,} pasien (terbaik)  
+    
+    {conclusion}
+    """)
+
+@profiled_fragment("view:corr")
+def correlation_view(staff_df, view_key):
+    st.markdown("### 👥 Penyebab #4: Alokasi Sumber Daya Tidak Efektif")
+    
+    if staff_df.empty:
+        st.info("Tidak ada kunjungan pada filter ini")
+        return
+    chart("corr", figures.correlation_chart, staff_df, key=view_key)
+    
+    # Koefisien & paradoks dari frame yang sama dengan scatter (ikut cross-filter)
+    metrics = view_metrics(staff_df=staff_df)
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        # Tanpa filter sama dengan kartu Ringkasan Eksekutif; bootstrap hanya menambah CI
+        correlation = metrics['correlation']
+        st.metric("Correlation Coefficient",
+                  "-" if correlation != correlation else f"{correlation:+.3f}",
+                  help="Pearson dokter on shift vs waktu tunggu; mendekati 0 = tidak ada korelasi")
+        if fingerprint is not None:
+            confidence_caption(bootstrap_result(), 'correlation', '+.3f',
+                               filtered=bool(view_key) or period_filtered)
+    
+    (high_doctors, high_wait), (low_doctors, low_wait) = metrics['shift_extremes']
+    with col2:
+        st.metric("Paradoks", f"{high_doctors} dokter = {high_wait:.1f} min", 
+                  delta="Tertinggi!", delta_color="inverse")
+    
+    st.error(f"""
+    **Paradoks:**
+    
+    Shift dengan {high_doctors} dokter: {high_wait:.1f} menit (TERTINGGI)  
+    Shift dengan {low_doctors} dokter: {low_wait:.1f} menit (terendah)
+    
+    **Kenapa?** Dokter banyak di shift yang sudah sibuk + kasus kompleks (reaktif), bukan berdasarkan prediksi (proaktif).
+    """)
+
+@profiled_fragment("view:triage")
+def triage_view(triage_df, view_key):
+    st.markdown("### 🚨 Penyebab #5: Non-Urgent Congest Sistem")
+    
+    if not triage_df['Count'].sum():
+        st.info("Tidak ada kunjungan pada filter ini")
+        return
+    col1, col2 = st.columns([2, 1])
+    
+    with col1:
+        chart("triage", figures.triage_chart, triage_df, key=view_key)
+    
+    with col2:
+        chart("pie", figures.triage_pie, triage_df, key=view_key)
+    
+    metrics = view_metrics(triage_df=triage_df)
+    triage = metrics['triage_stats']
+    non_urgent_wait = triage['Non-urgent'][1]
+    st.error(f"""
+    **Masalah:**
+    
+    {metrics['non_urgent_pct']}% pasien (Non-urgent {triage['Non-urgent'][0]}% + Semi-urgent {triage['Semi-urgent'][0]}%) seharusnya tidak perlu sumber daya klinik utama.
+    
+    Non-urgent wait: {fmt(non_urgent_wait, '.0f', ' menit')} ({fmt(non_urgent_wait - TARGET_WAIT, '+.0f', ' min')} dari target)
+    """)
+
+@profiled_fragment("view:root_cause")
+def root_cause_view(appt_df):
+    st.markdown(f"### 🚨 ROOT CAUSE: Appointment Waste {headline['waste_pct']}%")
+    
+    # Jam-dokter eksak dari jadwal (sweep-line) jika log punya jam mulai/selesai & dokter
+    occupancy = None
+    if fingerprint is not None:
+        with prof.stage("occupancy"):
+            occupancy = slot_occupancy_view(fingerprint)
+    
+    col1, col2 = st.columns([1, 1])
+    
+    with col1:
+        chart("appt", figures.appointment_donut, appt_df)
+    
+    with col2:
+        productive = appt_df[appt_df['Status'] == 'Hadir']['Count'].values[0]
+        waste = appt_df[appt_df['Status'] != 'Hadir']['Count'].sum()
         
-        st.warning("""
-        **💡 Kesimpulan:**
+        if occupancy is None:
+            chart("compare", figures.compare_chart, productive, waste)
+        else:
+            chart("slot_hours", figures.slot_hours_chart, occupancy[0])
+    
+    waste_pct = appt_df[appt_df['Status'] != 'Hadir']['Percentage'].sum()
+    
+    if occupancy is None:
+        st.error(f"""
+        **Dampak:**
         
-        **Senin:** 155 min, 715 pasien (terburuk)  
-        **Jumat:** 148 min, 710 pasien (terbaik)  
+        - Total waste: {waste:,} appointments ({waste_pct:.1f}%)
+        - {waste * SLOT_HOURS:,.0f} jam-dokter terbuang (estimasi {SLOT_HOURS:g} jam per slot)
+        - Kapasitas efektif -{waste_pct:.1f}%
         
-        Dengan volume hampir sama, selisih 7 menit menunjukkan weekend backlog effect yang signifikan.
+        **Ini menjelaskan** mengapa menambah dokter tidak efektif!
         """)
-    
-    # Korelasi
-    elif "Korelasi" in dimension:
-        st.markdown("### 👥 Penyebab #4: Alokasi Sumber Daya Tidak Efektif")
+    else:
+        totals = occupancy[0]
+        scheduled = totals['Produktif'] + totals['Terbuang'] + totals['Idle']
+        lost_pct = (totals['Terbuang_Bersih'] + totals['Idle']) / scheduled * 100 if scheduled else 0.0
+        st.error(f"""
+        **Dampak (rekonstruksi jadwal dokter):**
         
-        fig_corr = px.scatter(
-            staff_df, x='Doctors', y='Wait_Time', size='Patients',
-            color='Wait_Time', color_continuous_scale='RdYlGn_r',
-            title="Korelasi: Jumlah Dokter vs Waktu Tunggu",
-            labels={'Doctors': 'Jumlah Dokter', 'Wait_Time': 'Waktu Tunggu (menit)'}
-        )
+        - Total waste: {waste:,} appointments ({waste_pct:.1f}%)
+        - {totals['Terbuang']:,.0f} jam-dokter dari slot cancel/no-show, {totals['Backfill']:,.0f} di antaranya terisi walk-in
+        - {totals['Terbuang_Bersih']:,.0f} jam-dokter benar-benar terbuang + {totals['Idle']:,.0f} jam idle di sela jadwal
+        - Kapasitas efektif -{lost_pct:.1f}%
         
-        fig_corr.add_hline(y=120, line_dash="dash", line_color="green")
-        fig_corr.update_layout(height=500, showlegend=False)
+        **Ini menjelaskan** mengapa menambah dokter tidak efektif!
+        """)
         
-        st.plotly_chart(fig_corr, use_container_width=True)
+        with st.expander("⏱️ Occupancy Slot Dokter per Departemen & Jam"):
+            by_dept, by_hour, _ = occupancy[1]
+            chart("slot_dept", figures.slot_breakdown_chart, by_dept, 'Department',
+                  "Jam-Dokter per Departemen")
+            chart("slot_hour", figures.slot_breakdown_chart, by_hour, 'Hour',
+                  "Jam-Dokter per Jam")
+    
+    # Breakdown per bulan & departemen (hanya dengan data record-level)
+    if cube is not None:
+        by_month, by_dept = waste_breakdowns(data_version, cube)
         
-        col1, col2 = st.columns(2)
+        col1, col2 = st.columns([1, 1])
         
         with col1:
-            st.metric("Correlation Coefficient", "+0.014", 
-                      help="Mendekati 0 = tidak ada korelasi")
+            chart("month", figures.month_waste_chart, by_month)
         
         with col2:
-            st.metric("Paradoks", "7 dokter = 154.9 min", 
-                      delta="Tertinggi!", delta_color="inverse")
-        
-        st.error("""
-        **Paradoks:**
-        
-        Shift dengan 7 dokter: 154.9 menit (TERTINGGI)  
-        Shift dengan 2 dokter: 146.8 menit (terendah)
+            chart("dept_waste", figures.dept_waste_chart, by_dept)
+    
+    # Risiko waste appointment mendatang (log dengan riwayat pasien & appointment book)
+    with prof.stage("risk"):
+        book_version = risk_fingerprint() if fingerprint is not None else None
+        risk = no_show_risk_view(book_version) if book_version is not None else None
+    
+    if risk is not None:
+        totals, (by_slot, _), matrix = risk
+        st.markdown("#### 🎯 Risiko Waste Appointment Mendatang")
+        st.info(f"""
+        **Appointment book:** {totals['booked']:,} appointment dalam {totals['days']} hari
         
-        **Kenapa?** Dokter banyak di shift yang sudah sibuk + kasus kompleks (reaktif), bukan berdasarkan prediksi (proaktif).
+        - Expected terbuang: {totals['expected']:,.0f} ± {totals['sd']:,.0f} appointment
+          ({totals['expected'] / max(totals['booked'], 1) * 100:.1f}%, historis {totals['base_rate'] * 100:.1f}%)
+        - Overbooking aman: {totals['overbook_per_day']:,} slot tambahan per hari
+        - Model: AUC validasi {totals['auc']:.2f}
         """)
+        chart("risk", figures.risk_heatmap, matrix)
+        with st.expander("📋 Slot dengan Expected Waste Tertinggi"):
+            st.dataframe(by_slot.nlargest(15, 'Waste_Per_Day'), hide_index=True,
+                         use_container_width=True)
+
+@profiled_fragment("detail")
+def detail_page():
+    """Selectbox dimensi & cross-filter hanya menjalankan ulang fragment ini"""
+    st.markdown("## 🔍 Analisis Detail per Penyebab")
     
-    # Triage
-    elif "Triage" in dimension:
-        st.markdown("### 🚨 Penyebab #5: Non-Urgent Congest Sistem")
-        
-        col1, col2 = st.columns([2, 1])
-        
-        with col1:
-            fig_triage = px.bar(
-                triage_df, x='Wait_Time', y='Category', orientation='h',
-                color='Wait_Time', color_continuous_scale='RdYlGn_r',
-                text='Wait_Time', title="Wait Time per Kategori Triage"
-            )
-            
-            fig_triage.add_vline(x=120, line_dash="dash", line_color="green")
-            fig_triage.update_traces(texttemplate='%{text:.0f} min', textposition='outside')
-            fig_triage.update_layout(showlegend=False, height=400)
+    st.info("Pilih dimensi analisis untuk melihat data dan visualisasi detail")
+    
+    dimension = st.selectbox(
+        "Pilih dimensi analisis:",
+        ["1️⃣ Masalah Sistemik (Departemen)", 
+         "2️⃣ Staffing Tidak Dinamis (Per Jam)",
+         "3️⃣ Weekend Backlog (Per Hari)", 
+         "4️⃣ Alokasi Sumber Daya (Korelasi)",
+         "5️⃣ Non-Urgent Congest (Triage)",
+         "🚨 Root Cause (Appointment Waste)"]
+    )
+    
+    # Cross-filter dari cube (hanya tersedia dengan data record-level)
+    frames = (dept_df, hour_df, day_df, staff_df, triage_df, appt_df)
+    view_cube = cube
+    view_key = ()
+    if cube is not None:
+        with st.expander("🎛️ Cross-filter (Departemen × Jam × Hari × Triage × Dokter)"):
+            fcol1, fcol2, fcol3 = st.columns(3)
+            filters = {
+                'Department': fcol1.multiselect("Departemen", CUBE_DIMS['Department']),
+                'Day': fcol2.multiselect("Hari", CUBE_DIMS['Day']),
+                'Triage': fcol3.multiselect("Triage", CUBE_DIMS['Triage']),
+                'Hour': fcol1.multiselect("Jam", hour_df['Hour'].tolist()),
+                'Doctors': fcol2.multiselect("Dokter on shift", staff_df['Doctors'].tolist()),
+            }
             
-            st.plotly_chart(fig_triage, use_container_width=True)
-        
-        with col2:
-            fig_pie = px.pie(
-                triage_df, values='Count', names='Category',
-                title="Distribusi Pasien", hole=0.4
-            )
-            st.plotly_chart(fig_pie, use_container_width=True)
-        
-        st.error("""
-        **Masalah:**
-        
-        71% pasien (Non-urgent 41.4% + Semi-urgent 29.6%) seharusnya tidak perlu sumber daya klinik utama.
-        
-        Non-urgent wait: 175 menit (+55 min dari target)
-        """)
+            if any(filters.values()):
+                avg_wait, n_patients = query(cube, filters)
+                fcol3.metric("Waktu tunggu kombinasi", 
+                             f"{avg_wait:.0f} menit" if n_patients else "-",
+                             delta=f"{n_patients:,} pasien", delta_color="off")
+                view_key = filter_key(filters)
+                frames, view_cube = filtered_view(data_version, view_key, cube)
+    
+    view_dept, view_hour, view_day, view_staff, view_triage, view_appt = frames
     
-    # Root Cause
+    if "Departemen" in dimension:
+        dept_view(view_dept, view_key)
+    elif "Per Jam" in dimension:
+        hour_view(view_dept, view_hour, view_triage, view_cube, view_key)
+    elif "Per Hari" in dimension:
+        day_view(view_day, view_key)
+    elif "Korelasi" in dimension:
+        correlation_view(view_staff, view_key)
+    elif "Triage" in dimension:
+        triage_view(view_triage, view_key)
     else:
-        st.markdown("### 🚨 ROOT CAUSE: Appointment Waste 22.3%")
-        
-        col1, col2 = st.columns([1, 1])
-        
-        with col1:
-            fig_appt = go.Figure(data=[go.Pie(
-                labels=appt_df['Status'],
-                values=appt_df['Count'],
-                hole=0.5,
-                marker_colors=['#10b981', '#f59e0b', '#dc2626'],
-                pull=[0, 0.1, 0.1]
-            )])
-            
-            total = appt_df['Count'].sum()
-            fig_appt.update_layout(
-                title="Status Appointment",
-                annotations=[dict(text=f'{total:,}<br>Total', x=0.5, y=0.5, 
-                                  font_size=16, showarrow=False)],
-                height=400
-            )
-            
-            st.plotly_chart(fig_appt, use_container_width=True)
-        
-        with col2:
-            productive = appt_df[appt_df['Status'] == 'Hadir']['Count'].values[0]
-            waste = appt_df[appt_df['Status'] != 'Hadir']['Count'].sum()
-            
-            fig_compare = go.Figure(data=[
-                go.Bar(x=['Produktif', 'Terbuang'], 
-                       y=[productive, waste],
-                       marker_color=['#10b981', '#dc2626'],
-                       text=[productive, waste],
-                       texttemplate='%{text:,}',
-                       textposition='outside')
-            ])
-            
-            fig_compare.update_layout(
-                title="Slot Produktif vs Terbuang",
-                yaxis_title="Jumlah Appointments",
-                height=400,
-                showlegend=False
-            )
-            
-            st.plotly_chart(fig_compare, use_container_width=True)
-        
-        st.error("""
-        **Dampak:**
-        
-        - Total waste: 24,869 appointments (22.3%)
-        - 12,434 jam-dokter terbuang
-        - Kapasitas efektif -22.3%
-        
-        **Ini menjelaskan** mengapa menambah dokter tidak efektif!
-        """)
+        root_cause_view(view_appt)
+
+# ============================================================
+# ROUTING
+# ============================================================
+
+if page == "🏠 Ringkasan Eksekutif":
+    executive_page()
+else:  # Analisis Detail
+    detail_page()
 
 # ============================================================
 # FOOTER
@@ -642,3 +1066,25 @@ Big Data Analytics Project |
 Cahya Lintang Ayu Langitan (23523056) | 
 Powered by PySpark + Streamlit + Plotly
 """)
+
+# ============================================================
+# PROFILING
+# ============================================================
+
+profile_store().add(prof)
+
+if st.session_state.get('debug_profile'):
+    with st.sidebar:
+        st.markdown("---")
+        st.markdown("### 🐞 Profiling Rerun")
+        st.caption(f"Rerun ini: {prof.total() * 1000:.0f} ms | log: {profile_store().log_path}")
+        memory = process_memory()
+        if memory is not None:
+            st.caption(f"Memori proses: RSS {memory['rss_mb']:.0f} MB | shared "
+                       f"{memory['shared_mb']:.0f} MB | private {memory['private_mb']:.0f} MB")
+        st.dataframe(profile_store().summary(), hide_index=True, use_container_width=True)
+        
+        stats = figure_cache().stats()
+        st.markdown("### 🗂️ Cache Figure")
+        st.caption(f"{stats['entries']}/{stats['maxsize']} figure | hit rate {stats['hit_rate']:.0%}")
+        st.dataframe(pd.DataFrame([stats]), hide_index=True, use_container_width=True)
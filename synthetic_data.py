@@ -0,0 +1,248 @@
+# SYNTHETIC DATA - GENERATOR
+# Record wait-time & appointment sintetis dengan distribusi ringkasan bawaan dashboard (5k - 50M baris)
+#
+#   python synthetic_data.py --rows 5000000 --out bench_data/5M
+
+import argparse
+import json
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+
+from appointment_stream import SLOT_HOURS
+from data_loader import (APPT_SOURCE, APPT_STATUSES, BATCH_ROWS, BOOK_SOURCE, DEPARTMENTS,
+                         TRIAGE_CATEGORIES, WAIT_SOURCE, builtin_frames)
+
+PERIOD_START = np.datetime64('2024-01-01', 'D')  # Senin
+PERIOD_WEEKS = 13
+# Appointment per pasien wait-time di dataset asli (110,901 / 4,991)
+APPT_PER_PATIENT = 110_901 / 4_991
+# Bentuk distribusi gamma wait time (CV = 1 / sqrt(k))
+WAIT_SHAPE = 4.0
+DOCTOR_SD = 1.0
+# Label status mentah (bahasa Inggris) seperti data sumber; dipetakan lewat STATUS_ALIASES
+RAW_STATUSES = ['Attended', 'Cancelled', 'No-Show']
+# Jadwal dokter: slot berurutan mulai jam buka; sebagian booking 2 slot (overlap/double booking)
+SLOT_MINUTES = int(SLOT_HOURS * 60)
+CLINIC_OPEN = 8 * 60
+SLOTS_PER_DOCTOR = 16
+LONG_SLOT_P = 0.05
+# Riwayat pasien & lead time booking: status ditarik dulu (marginal tetap sama dengan data
+# bawaan), lalu pasien & lead time bergantung pada status -> sinyal untuk risk.py
+VISITS_PER_PATIENT = 10
+RISKY_PATIENTS = 0.2
+RISKY_P = {'attended': 0.12, 'wasted': 0.5}
+LEAD_DAYS = {'attended': 7, 'wasted': 21}
+# Appointment book ke depan: BOOK_DAYS hari setelah periode log
+BOOK_DAYS = 7
+META_NAME = 'synthetic.json'
+# Naikkan jika kolom/urutan data berubah supaya direktori lama dibangkitkan ulang
+SCHEMA_VERSION = 3
+
+# ============================================================
+# DISTRIBUSI
+# ============================================================
+
+def _weights(values):
+    values = np.asarray(values, dtype=np.float64)
+    return values / values.sum()
+
+
+def distributions():
+    """Parameter generator dari 6 frame bawaan load_data()"""
+    dept_df, hour_df, day_df, staff_df, triage_df, appt_df = builtin_frames()
+    dept_df = dept_df.set_index('Department').reindex(DEPARTMENTS)
+    triage_df = triage_df.set_index('Category').reindex(TRIAGE_CATEGORIES)
+    overall = np.average(dept_df['Avg_Wait'], weights=dept_df['Total_Patients'])
+    return {
+        'overall': overall,
+        'dept_p': _weights(dept_df['Total_Patients']),
+        # Faktor multiplikatif per dimensi relatif terhadap rata-rata keseluruhan
+        'dept_factor': dept_df['Avg_Wait'].to_numpy(np.float64) / overall,
+        'hours': hour_df['Hour'].to_numpy(np.int8),
+        'hour_p': _weights(hour_df['Volume']),
+        'hour_factor': hour_df['Wait_Time'].to_numpy(np.float64) / overall,
+        'hour_staff': hour_df['Staff'].to_numpy(np.float64),
+        'day_p': _weights(day_df['Volume']),
+        'day_factor': day_df['Wait_Time'].to_numpy(np.float64) / overall,
+        'triage_p': _weights(triage_df['Count']),
+        'triage_factor': triage_df['Wait_Time'].to_numpy(np.float64) / overall,
+        'status_p': _weights(appt_df.set_index('Status').reindex(APPT_STATUSES)['Count']),
+    }
+
+# ============================================================
+# GENERATOR
+# ============================================================
+
+def _dictionary(codes, labels):
+    import pyarrow as pa
+    return pa.DictionaryArray.from_arrays(pa.array(codes, pa.int8()), pa.array(labels))
+
+
+def _dates(rng, weekday):
+    """Tanggal dalam periode dengan hari-minggu yang sudah ditentukan"""
+    week = rng.integers(0, PERIOD_WEEKS, len(weekday))
+    return (PERIOD_START + week * 7 + weekday).astype('datetime64[ns]')
+
+
+def wait_chunk(rng, n, dist, offset, total):
+    """Satu chunk record wait-time sebagai kolom (pyarrow-ready); urutan baris acak"""
+    dept = rng.choice(len(DEPARTMENTS), n, p=dist['dept_p'])
+    hour = rng.choice(len(dist['hours']), n, p=dist['hour_p'])
+    weekday = rng.choice(len(dist['day_p']), n, p=dist['day_p'])
+    triage = rng.choice(len(TRIAGE_CATEGORIES), n, p=dist['triage_p'])
+    mean = (dist['overall'] * dist['dept_factor'][dept] * dist['hour_factor'][hour]
+            * dist['day_factor'][weekday] * dist['triage_factor'][triage])
+    wait = rng.gamma(WAIT_SHAPE, mean / WAIT_SHAPE)
+    doctors = np.clip(np.rint(rng.normal(dist['hour_staff'][hour], DOCTOR_SD)), 1, 12)
+    return {
+        'Patient_ID': None,
+        'Visit_Date': _dates(rng, weekday),
+        'Department': (dept, DEPARTMENTS),
+        'Arrival_Hour': dist['hours'][hour],
+        'Triage_Category': (triage, TRIAGE_CATEGORIES),
+        'Doctors_On_Shift': doctors.astype(np.int8),
+        'Wait_Time': np.round(wait, 1).astype(np.float32),
+    }
+
+
+def _schedule(rng, n, offset, total, first_day, n_days):
+    """Kolom jadwal terurut per tanggal: baris ke-r jatuh di hari r x n_days / total,
+    lalu mengisi slot dokter-dokter hari itu secara berurutan"""
+    rows = offset + np.arange(n, dtype=np.int64)
+    day = rows * n_days // total
+    rank = rows + (day * total // -n_days)
+    doctor = rank // SLOTS_PER_DOCTOR
+    date = first_day + day
+    start = (date.astype('datetime64[m]') + CLINIC_OPEN
+             + rank % SLOTS_PER_DOCTOR * SLOT_MINUTES)
+    length = np.where(rng.random(n) < LONG_SLOT_P, 2 * SLOT_MINUTES, SLOT_MINUTES)
+    return {
+        'Appointment_Date': date.astype('datetime64[ns]'),
+        'Department': (doctor % len(DEPARTMENTS), DEPARTMENTS),
+        'Doctor_ID': doctor.astype(np.int32),
+        'Start_Time': start.astype('datetime64[ns]'),
+        'End_Time': (start + length).astype('datetime64[ns]'),
+    }
+
+
+def _bookings(rng, date, wasted, n_patients):
+    """Pasien & tanggal booking: appointment terbuang lebih sering milik pasien berisiko
+    (RISKY_PATIENTS pertama) dan dibooking lebih jauh hari"""
+    n = len(date)
+    n_risky = max(int(n_patients * RISKY_PATIENTS), 1)
+    risky = rng.random(n) < np.where(wasted, RISKY_P['wasted'], RISKY_P['attended'])
+    patient = np.where(risky, rng.integers(0, n_risky, n),
+                       rng.integers(n_risky, max(n_patients, n_risky + 1), n))
+    lead = rng.geometric(1 / np.where(wasted, LEAD_DAYS['wasted'], LEAD_DAYS['attended'])) - 1
+    return {
+        'Patient_ID': patient.astype(np.int64),
+        'Booking_Date': (date.astype('datetime64[D]') - lead).astype('datetime64[ns]'),
+    }
+
+
+def appt_chunk(rng, n, dist, offset, total):
+    """Satu chunk log appointment (status diketahui), terurut per tanggal"""
+    columns = _schedule(rng, n, offset, total, PERIOD_START, PERIOD_WEEKS * 7)
+    status = rng.choice(len(RAW_STATUSES), n, p=dist['status_p'])
+    columns['Status'] = (status, RAW_STATUSES)
+    columns.update(_bookings(rng, columns['Appointment_Date'], status > 0, dist['patients']))
+    return columns
+
+
+def book_chunk(rng, n, dist, offset, total):
+    """Satu chunk appointment book ke depan (tanpa status): BOOK_DAYS hari setelah periode
+    log; status tersembunyi tetap ditarik supaya pasien & lead time punya pola yang sama"""
+    columns = _schedule(rng, n, offset, total, PERIOD_START + PERIOD_WEEKS * 7, BOOK_DAYS)
+    wasted = rng.choice(len(RAW_STATUSES), n, p=dist['status_p']) > 0
+    columns.update(_bookings(rng, columns['Appointment_Date'], wasted, dist['patients']))
+    return columns
+
+
+def _table(columns, offset, n):
+    import pyarrow as pa
+    arrays = {}
+    for name, values in columns.items():
+        if values is None:
+            # ID berurutan per record (wait-time: satu kunjungan per pasien)
+            arrays[name] = pa.array(np.arange(offset, offset + n, dtype=np.int64))
+        elif isinstance(values, tuple):
+            arrays[name] = _dictionary(*values)
+        else:
+            arrays[name] = pa.array(values)
+    return pa.table(arrays)
+
+
+def write_source(path, chunk, rows, seed, dist, batch_rows=BATCH_ROWS):
+    """Tulis `rows` record per chunk (memori konstan); Parquet atau CSV menurut suffix.
+    Setiap chunk punya seed anak sendiri dari SeedSequence `seed`, jadi hasil deterministik."""
+    import pyarrow.parquet as pq
+
+    path = Path(path)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    sizes = np.diff(np.r_[np.arange(0, rows, batch_rows), rows])
+    seeds = seed.spawn(len(sizes))
+    writer, offset = None, 0
+    try:
+        for n, child in zip(sizes, seeds):
+            columns = chunk(np.random.default_rng(child), int(n), dist, offset, rows)
+            table = _table(columns, offset, int(n))
+            if path.suffix == '.parquet':
+                if writer is None:
+                    writer = pq.ParquetWriter(tmp, table.schema)
+                writer.write_table(table, row_group_size=batch_rows)
+            else:
+                table.to_pandas().to_csv(tmp, mode='a', header=offset == 0, index=False)
+            offset += int(n)
+    finally:
+        if writer is not None:
+            writer.close()
+    os.replace(tmp, path)
+    return path
+
+
+def generate(out_dir, rows, appt_rows=None, fmt='parquet', seed=0, book_rows=None):
+    """Tulis wait_times.<fmt>, appointments.<fmt> & appointment_book.<fmt> ke out_dir;
+    kembalikan metadata. Direktori yang sudah berisi data dengan parameter sama dipakai ulang."""
+    out_dir = Path(out_dir)
+    appt_rows = int(round(rows * APPT_PER_PATIENT)) if appt_rows is None else appt_rows
+    # Default: volume satu minggu log
+    book_rows = appt_rows // PERIOD_WEEKS if book_rows is None else book_rows
+    meta = {'rows': rows, 'appt_rows': appt_rows, 'book_rows': book_rows, 'format': fmt,
+            'seed': seed, 'schema': SCHEMA_VERSION}
+    meta_path = out_dir / META_NAME
+    if meta_path.exists() and json.loads(meta_path.read_text()) == meta:
+        return meta
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    meta_path.unlink(missing_ok=True)
+    dist = distributions()
+    dist['patients'] = max(appt_rows // VISITS_PER_PATIENT, 1)
+    seeds = np.random.SeedSequence(seed).spawn(3)
+    write_source(out_dir / f"{WAIT_SOURCE}.{fmt}", wait_chunk, rows, seeds[0], dist)
+    write_source(out_dir / f"{APPT_SOURCE}.{fmt}", appt_chunk, appt_rows, seeds[1], dist)
+    if book_rows:
+        write_source(out_dir / f"{BOOK_SOURCE}.{fmt}", book_chunk, book_rows, seeds[2], dist)
+    meta_path.write_text(json.dumps(meta))
+    return meta
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Bangkitkan data mentah sintetis")
+    parser.add_argument('--rows', type=int, default=5_000, help="Jumlah record wait-time")
+    parser.add_argument('--appt-rows', type=int, default=None,
+                        help="Jumlah record appointment (default: rasio dataset asli)")
+    parser.add_argument('--book-rows', type=int, default=None,
+                        help="Jumlah appointment book ke depan (default: volume 1 minggu, 0 = tidak ada)")
+    parser.add_argument('--format', choices=['parquet', 'csv'], default='parquet')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', default='data')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    meta = generate(args.out, args.rows, args.appt_rows, args.format, args.seed, args.book_rows)
+    print(f"{meta['rows']:,} wait-time + {meta['appt_rows']:,} appointment + "
+          f"{meta['book_rows']:,} booking ke depan ditulis ke {args.out} "
+          f"({time.perf_counter() - start:.1f} s)")
@@ -0,0 +1,22 @@
+# FIXTURE BERSAMA
+# Modul repo di-import dari root; data sintetis kecil dibangkitkan sekali per sesi test
+
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+SYNTHETIC_ROWS = 20_000
+
+
+@pytest.fixture(scope='session')
+def synthetic_dir(tmp_path_factory):
+    """Direktori data mentah sintetis (wait-time, appointment, appointment book)"""
+    from synthetic_data import generate
+
+    data_dir = tmp_path_factory.mktemp('data')
+    generate(data_dir, SYNTHETIC_ROWS)
+    return data_dir
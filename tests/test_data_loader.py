@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import data_loader
+from data_loader import (APPT_STATUSES, DAYS, DEPARTMENTS, NO_DATE, POOL_KINDS,
+                         TRIAGE_CATEGORIES, WAIT_DROP_REASONS, CodedRecords, appt_partials,
+                         builtin_frames, date_codes, encode, parallel_map, set_load_pool,
+                         wait_codes, wait_partials)
+
+
+def wait_records(n=6):
+    return CodedRecords({
+        'Visit_Date': np.full(n, 19723, np.int32),
+        'Department': np.zeros(n, np.int8),
+        'Arrival_Hour': np.arange(n, dtype=np.int8),
+        'Triage_Category': np.zeros(n, np.int8),
+        'Doctors_On_Shift': np.full(n, 3, np.int8),
+        'Wait_Time': np.full(n, 60, np.float32),
+    })
+
+
+def test_date_codes_maps_nat_to_no_date():
+    dates = np.array(['2024-01-01', 'NaT', '1970-01-01'], dtype='datetime64[ns]')
+    assert date_codes(dates).tolist() == [19723, NO_DATE, 0]
+
+
+def test_encode_uses_shared_vocab_and_aliases():
+    codes = encode(pd.Series(['No Show', 'Attended', None, 'Cancelled']), APPT_STATUSES,
+                   {'No Show': 'No-Show', 'Attended': 'Hadir', 'Cancelled': 'Dibatalkan'})
+    assert codes.tolist() == [2, 0, -1, 1]
+
+
+def test_invalid_wait_records_are_dropped_and_counted_once():
+    records = wait_records()
+    records['Visit_Date'][0] = NO_DATE
+    records['Department'][1] = -1
+    records['Triage_Category'][1] = -1   # alasan kedua pada record yang sama tidak dihitung lagi
+    records['Triage_Category'][2] = -1
+    records['Wait_Time'][3] = np.nan
+    codes, wait, date = wait_codes(records)
+    assert len(wait) == len(date) == 2 and all(len(c) == 2 for c in codes)
+
+    partials = wait_partials(records)
+    assert dict(zip(WAIT_DROP_REASONS, partials['wait_dropped'].tolist())) == {
+        'Visit_Date': 1, 'Department': 1, 'Triage_Category': 1, 'Wait_Time': 1}
+    assert partials['cube_count'].sum() == 2
+    assert partials['wait_sketch'].sum() == 2
+
+
+def test_appointments_without_date_or_status_are_counted():
+    records = CodedRecords({
+        'Appointment_Date': np.array([19723, NO_DATE, 19724, 19725], np.int32),
+        'Department': np.array([0, 0, -1, 1], np.int8),
+        'Status': np.array([0, 1, 2, -1], np.int8),
+    })
+    partials = appt_partials(records)
+    assert partials['appt_dropped'].tolist() == [1, 1]
+    # Tanpa departemen tetap ikut total status, tidak ikut breakdown departemen
+    assert partials['status_count'].tolist() == [1, 0, 1]
+    assert partials['dept_status'].sum() == 1
+
+
+def test_builtin_frames_follow_schema_vocab():
+    dept_df, _, day_df, _, triage_df, appt_df = builtin_frames()
+    assert dept_df['Department'].tolist() == DEPARTMENTS
+    assert day_df['Day'].tolist() == DAYS
+    assert triage_df['Category'].tolist() == TRIAGE_CATEGORIES
+    assert appt_df['Status'].tolist() == APPT_STATUSES
+
+
+def _square_or_fail(path, row_groups, value):
+    if value < 0:
+        raise ValueError("negatif")
+    return value * value
+
+
+@pytest.mark.parametrize('kind', POOL_KINDS)
+def test_parallel_map_keeps_job_order(kind, monkeypatch):
+    monkeypatch.setattr(data_loader, 'LOAD_POOL', kind)
+    jobs = [('f.parquet', [i], i) for i in range(10)]
+    assert list(parallel_map(_square_or_fail, jobs, workers=3)) == [i * i for i in range(10)]
+    with pytest.raises(RuntimeError, match='row group 4'):
+        list(parallel_map(_square_or_fail, jobs[:4] + [('f.parquet', [4], -1)], workers=3))
+    with pytest.raises(ValueError):
+        set_load_pool('fork')
@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from erlang import erlang_c, estimate_service_minutes, min_doctors, staffing_grid
+
+
+def test_erlang_c_known_values():
+    # λ=10/jam, μ=4/jam -> beban 2.5 Erlang
+    p_wait = erlang_c(2.5, np.arange(1, 5))
+    assert p_wait[:2].tolist() == [1.0, 1.0]          # c <= beban: tidak stabil
+    assert p_wait[2] == pytest.approx(0.7022, abs=1e-4)
+    assert p_wait[3] == pytest.approx(0.3199, abs=1e-4)
+
+
+def test_mm1_expected_wait():
+    # M/M/1: Wq = ρ / (μ - λ); λ=3/jam, μ=4/jam -> 0.75 jam
+    wq, _ = staffing_grid(3.0, 15.0, max_doctors=2)
+    assert wq[0] == pytest.approx(45.0)
+
+
+def test_min_doctors_needs_several_servers():
+    # λ=10/jam, layanan 15 menit: c=3 -> Wq ≈ 21 menit, c=4 -> Wq ≈ 3.2 menit
+    assert min_doctors([10.0], 15.0, target=5)[0] == 4
+    assert min_doctors([10.0], 15.0, target=30)[0] == 3
+    assert min_doctors([0.0, 1000.0], 15.0, target=5, max_doctors=10).tolist()[0] == 0
+    assert np.isnan(min_doctors([1000.0], 15.0, target=5, max_doctors=10)[0])
+
+
+def test_service_estimate_recovers_model_service_time():
+    days, service = 30, 10.0
+    staff = np.array([2, 3, 4, 3])
+    rates = np.array([9.0, 15.0, 20.0, 12.0])
+    wq, _ = staffing_grid(rates, service, max_doctors=4)
+    hour_df = pd.DataFrame({'Hour': [8, 9, 10, 11], 'Volume': rates * days, 'Staff': staff,
+                            'Wait_Time': wq[np.arange(4), staff - 1]})
+    assert estimate_service_minutes(hour_df, days) == pytest.approx(service, rel=0.03)
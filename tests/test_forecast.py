@@ -0,0 +1,123 @@
+import numpy as np
+import pytest
+
+from data_loader import DAYS, DEPARTMENTS, N_HOURS
+from forecast import (HORIZON, MIN_DAYS, N_SERIES, SEASON, DemandForecast,
+                      forecast_day_frame, forecast_hour_frame)
+from partitions import PARTIAL_BUILDERS, split_by_day
+from query_store import ensure_store
+from rollups import DailyRollup
+
+FIRST_DAY = int(np.datetime64('2024-01-01', 'D').astype(np.int64))
+
+
+class SeriesRollup:
+    """Pengganti DailyRollup di atas array volume harian (hari, dept, jam)"""
+
+    def __init__(self, counts, first_day=FIRST_DAY):
+        self.counts = counts
+        self.first_day = first_day
+        self.n_days = len(counts)
+
+    def daily_patients(self, since=0):
+        return self.counts[since:]
+
+    def total_patients(self, n_days):
+        return int(self.counts[:n_days].sum())
+
+
+def volumes(n_days, seed=0):
+    """Volume Poisson dengan pola mingguan & trend kecil, (hari, dept, jam)"""
+    rng = np.random.default_rng(seed)
+    weekday = (FIRST_DAY + np.arange(n_days) + 3) % SEASON
+    rate = (5 + 3 * np.sin(weekday)[:, None, None] + 0.02 * np.arange(n_days)[:, None, None]
+            + rng.random((1, len(DEPARTMENTS), N_HOURS)))
+    return rng.poisson(rate).astype(np.float64)
+
+
+def assert_same_state(actual, expected):
+    assert (actual.first_day, actual.n_days, actual.total) == (
+        expected.first_day, expected.n_days, expected.total)
+    for name in ('level', 'trend', 'season', 'sse'):
+        np.testing.assert_allclose(getattr(actual, name), getattr(expected, name), err_msg=name)
+    a, e = actual.forecast(), expected.forecast()
+    np.testing.assert_allclose(a['mean'], e['mean'])
+    np.testing.assert_allclose(a['variance'], e['variance'])
+
+
+def test_incremental_updates_match_single_batch():
+    y = volumes(60)
+    batch = DemandForecast()
+    batch.update(FIRST_DAY, y.reshape(len(y), N_SERIES))
+
+    incremental = DemandForecast()
+    day = 0
+    for size in [3, 10, 1, 0, 20, 26]:
+        incremental.update(FIRST_DAY + day, y[day:day + size].reshape(size, N_SERIES))
+        day += size
+    assert_same_state(incremental, batch)
+
+
+def test_forecast_needs_two_seasons_and_contiguous_days():
+    fc = DemandForecast()
+    y = volumes(MIN_DAYS).reshape(MIN_DAYS, N_SERIES)
+    fc.update(FIRST_DAY, y[:-1])
+    assert not fc.ready and fc.forecast() is None
+    with pytest.raises(ValueError):
+        fc.update(FIRST_DAY + MIN_DAYS, y[-1:])
+    fc.update(FIRST_DAY + MIN_DAYS - 1, y[-1:])
+    assert fc.ready and fc.forecast()['mean'].shape == (HORIZON, len(DEPARTMENTS), N_HOURS)
+
+
+def test_exact_weekly_pattern_is_forecast_exactly():
+    pattern = np.arange(1, SEASON + 1, dtype=np.float64) * 10
+    n_days = 5 * SEASON
+    weekday = (FIRST_DAY + np.arange(n_days) + 3) % SEASON
+    y = np.broadcast_to(pattern[weekday][:, None], (n_days, N_SERIES))
+    fc = DemandForecast()
+    fc.update(FIRST_DAY, y)
+    result = fc.forecast()
+    expected = pattern[(result['days'] + 3) % SEASON]
+    np.testing.assert_allclose(result['mean'][:, 0, 0], expected, atol=1e-9)
+    np.testing.assert_allclose(result['variance'], 0, atol=1e-9)
+
+    day_df = forecast_day_frame(result)
+    assert list(day_df['Day']) == [DAYS[w] for w in sorted((result['days'] + 3) % SEASON)]
+    hour_df = forecast_hour_frame(result, DEPARTMENTS[:2], scale=2.0)
+    assert hour_df['Forecast'].iloc[0] == pytest.approx(2 * 2 * pattern.sum())
+
+
+def test_sync_matches_fresh_fit():
+    y = volumes(70)
+    synced = DemandForecast()
+    for n_days in (10, 30, 30, 70):
+        synced.sync(SeriesRollup(y[:n_days]))
+    fresh = DemandForecast()
+    assert fresh.sync(SeriesRollup(y)) == 70
+    assert_same_state(synced, fresh)
+
+    # Riwayat yang sudah di-fit berubah: fit ulang dari awal
+    changed = y.copy()
+    changed[5] += 1
+    synced.sync(SeriesRollup(changed))
+    fresh = DemandForecast()
+    fresh.sync(SeriesRollup(changed))
+    assert_same_state(synced, fresh)
+
+
+def test_sync_follows_store_rollup(synthetic_dir, tmp_path):
+    for source in PARTIAL_BUILDERS:
+        split_by_day(synthetic_dir / f"{source}.parquet", source, tmp_path)
+    store = ensure_store(tmp_path, workers=1)
+    rollup = DailyRollup()
+    rollup.sync(store)
+    store.close()
+
+    fc = DemandForecast()
+    assert fc.sync(rollup) == rollup.n_days >= MIN_DAYS
+    assert fc.sync(rollup) == 0
+    counts = rollup.daily_patients()
+    assert fc.total == counts.sum()
+    expected = DemandForecast()
+    expected.update(rollup.first_day, counts.reshape(len(counts), N_SERIES))
+    assert_same_state(fc, expected)
@@ -0,0 +1,123 @@
+import json
+import os
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from data_loader import DEPARTMENTS, TRIAGE_CATEGORIES
+from live_stream import KEYS, OVERALL, EventTail, LiveMetrics, SlidingWindow
+
+DEPT = DEPARTMENTS[0]
+TRIAGE = TRIAGE_CATEGORIES[2]
+
+
+def ts(hour, minute=0, day=4):
+    return datetime(2024, 3, day, hour, minute).isoformat()
+
+
+def visit(patient, arrived, seen, **extra):
+    return [{'ts': arrived, 'patient_id': patient, 'type': 'arrival', 'department': DEPT,
+             'triage': TRIAGE, **extra},
+            {'ts': seen, 'patient_id': patient, 'type': 'seen'}]
+
+
+def test_sliding_window_drops_expired_minutes():
+    window = SlidingWindow(15, n_keys=1)
+    window.add(100, [0], 10.0)
+    window.add(110, [0], 30.0)
+    assert window.total_sum[0] == 40 and window.total_count[0] == 2
+    window.advance(115)     # menit 100 keluar window
+    assert window.total_sum[0] == 30 and window.total_count[0] == 1
+    window.advance(200)
+    assert window.total_count[0] == 0 and window.total_sum[0] == 0
+    window.add(100, [0], 5.0)   # terlalu lama, diabaikan
+    assert window.total_count[0] == 0
+
+
+def test_windows_and_today_per_key():
+    metrics = LiveMetrics()
+    for event in visit('P1', ts(9), ts(9, 30)) + visit('P2', ts(9, 40), ts(10, 50)):
+        metrics.process(event)
+    now = datetime.fromisoformat(ts(10, 55)).timestamp()
+    summary = metrics.summary(now).set_index('Key')
+    assert summary.loc['Semua', 'Patients 15 menit'] == 1
+    assert summary.loc['Semua', 'Avg_Wait 15 menit'] == pytest.approx(70)
+    assert summary.loc[DEPT, 'Patients hari ini'] == 2
+    assert summary.loc[TRIAGE, 'Avg_Wait hari ini'] == pytest.approx(50)
+    assert summary['Menunggu'].sum() == 0
+
+
+def test_waiting_patients_expire_after_ttl():
+    metrics = LiveMetrics(ttl_minutes=60)
+    metrics.process(visit('P1', ts(9), ts(9))[0])
+    assert metrics.waiting_count[OVERALL] == 1
+    metrics.summary(datetime.fromisoformat(ts(10, 30)).timestamp())
+    assert metrics.waiting_count.sum() == 0 and metrics.expired == 1 and not metrics.waiting
+
+
+def test_events_before_current_day_are_ignored():
+    metrics = LiveMetrics()
+    for event in visit('P1', ts(9, day=5), ts(10, day=5)):
+        metrics.process(event)
+    # Seen terlambat dari hari sebelumnya tidak me-reset counter hari ini
+    for event in visit('P0', ts(9, day=4), ts(10, day=4)):
+        metrics.process(event)
+    assert metrics.stale == 2
+    assert metrics.today_count[OVERALL] == 1
+
+
+def write_lines(path, lines, mode='a'):
+    with open(path, mode) as f:
+        for line in lines:
+            f.write((line if isinstance(line, str) else json.dumps(line)) + '\n')
+
+
+def test_tail_skips_malformed_lines(tmp_path):
+    path = tmp_path / 'events.jsonl'
+    write_lines(path, ['{not json', {'ts': ts(9), 'type': 'arrival'}, '[1, 2]',
+                       {'ts': 'kemarin', 'patient_id': 'P9', 'type': 'seen'}]
+                + visit('P1', ts(9), ts(9, 20)))
+    tail = EventTail(path)
+    assert tail.poll() == 2
+    assert tail.malformed == 4
+    # Poll berikutnya hanya membaca baris baru, termasuk setelah baris rusak
+    write_lines(path, visit('P2', ts(9, 30), ts(9, 40)))
+    assert tail.poll() == 2
+    assert tail.metrics.today_count[OVERALL] == 2
+
+
+def test_tail_partial_line_waits_for_newline(tmp_path):
+    path = tmp_path / 'events.jsonl'
+    arrival, seen = visit('P1', ts(9), ts(9, 20))
+    write_lines(path, [arrival])
+    with open(path, 'a') as f:
+        f.write(json.dumps(seen))
+    tail = EventTail(path)
+    assert tail.poll() == 1
+    with open(path, 'a') as f:
+        f.write('\n')
+    assert tail.poll() == 1 and tail.metrics.today_count[OVERALL] == 1
+
+
+def test_tail_detects_rotation_by_inode(tmp_path):
+    path = tmp_path / 'events.jsonl'
+    write_lines(path, visit('P1', ts(9), ts(9, 20)))
+    tail = EventTail(path)
+    tail.poll()
+    # Rotasi ke file baru yang lebih besar dari offset lama
+    os.replace(path, tmp_path / 'events.jsonl.1')
+    write_lines(path, visit('P2', ts(9, 30), ts(9, 40)) + visit('P3', ts(9, 45), ts(10)) * 2)
+    assert tail.poll() == 6
+    assert tail.metrics.today_count[OVERALL] == 4
+
+
+def test_tail_restarts_after_truncation(tmp_path):
+    path = tmp_path / 'events.jsonl'
+    write_lines(path, visit('P1', ts(9), ts(9, 20)) + visit('P2', ts(9, 30), ts(9, 40)))
+    tail = EventTail(path)
+    tail.poll()
+    write_lines(path, visit('P3', ts(10), ts(10, 5)), mode='w')
+    assert tail.poll() == 2
+    assert tail.metrics.today_count[OVERALL] == 1
+    assert np.all(tail.summary()['Key'] == KEYS)
@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_loader import (APPT_STATUSES, CUBE_SHAPE, DEPARTMENTS, MAX_DOCTORS, TARGET_WAIT,
+                         build_frames, load_raw_frames)
+from metrics import MetricCache, Metrics
+
+
+@pytest.fixture(scope='module')
+def records(synthetic_dir):
+    records = pd.read_parquet(synthetic_dir / 'wait_times.parquet')
+    return records.dropna(subset=['Visit_Date', 'Department', 'Triage_Category', 'Wait_Time'])
+
+
+@pytest.fixture(scope='module')
+def frames(synthetic_dir):
+    return load_raw_frames(synthetic_dir, workers=1)
+
+
+def empty_frames():
+    """Frame hasil filter yang tidak mencakup satu record pun"""
+    return build_frames({
+        'cube_sum': np.zeros(CUBE_SHAPE),
+        'cube_count': np.zeros(CUBE_SHAPE, dtype=np.int64),
+        'staff_wait_sq': np.zeros(MAX_DOCTORS + 1),
+        'status_count': np.zeros(len(APPT_STATUSES), dtype=np.int64),
+    })
+
+
+def test_headline_matches_records(records, frames):
+    headline = Metrics(frames)
+    assert headline['avg_wait'] == pytest.approx(records['Wait_Time'].mean(), abs=0.1)
+    assert headline['wait_gap'] == pytest.approx(headline['avg_wait'] - TARGET_WAIT)
+
+    by_dept = records.groupby('Department')['Wait_Time'].mean()
+    assert headline['n_departments'] == len(by_dept)
+    assert headline['depts_above_target'] == int((by_dept.round(1) > TARGET_WAIT).sum())
+    (low_dept, _), (high_dept, _) = headline['dept_gap_extremes']
+    assert (low_dept, high_dept) == (by_dept.idxmin(), by_dept.idxmax())
+
+    # Momen dari frame yang dibulatkan ke 0.1 menit: aproksimasi Pearson record-level
+    expected = np.corrcoef(records['Doctors_On_Shift'], records['Wait_Time'])[0, 1]
+    assert headline['correlation'] == pytest.approx(expected, abs=0.01)
+
+
+def test_empty_frames_degrade_to_none():
+    headline = Metrics(empty_frames())
+    for name in ['avg_wait', 'wait_gap', 'dept_wait_range', 'dept_gap_extremes',
+                 'volume_range', 'staff_range', 'volume_variation_pct',
+                 'staffing_variation_pct', 'best_day', 'shift_extremes']:
+        assert headline[name] is None, name
+    assert headline['n_departments'] == headline['depts_above_pct'] == 0
+    assert headline['peak_hours'] == []
+    assert np.isnan(headline['correlation'])
+    assert headline['waste_pct'] == headline['non_urgent_pct'] == 0
+
+
+def test_zero_minimum_has_no_variation(frames):
+    dept_df, hour_df, *rest = frames
+    hour_df = hour_df.assign(Staff=np.where(hour_df['Hour'] == hour_df['Hour'].iloc[0],
+                                            0.0, hour_df['Staff']))
+    headline = Metrics((dept_df, hour_df, *rest))
+    assert headline['staffing_variation_pct'] is None
+    assert headline['volume_variation_pct'] is not None
+
+
+def test_cache_recomputes_only_changed_sources(frames):
+    cache = MetricCache()
+    Metrics(frames, cache)['avg_wait'], Metrics(frames, cache)['waste_pct']
+    computed = cache.computed
+
+    dept_df, hour_df, day_df, staff_df, triage_df, appt_df = frames
+    appt_df = appt_df.assign(Count=appt_df['Count'] * 2)
+    changed = Metrics((dept_df, hour_df, day_df, staff_df, triage_df, appt_df), cache)
+    assert changed['avg_wait'] == Metrics(frames)['avg_wait']
+    assert cache.computed == computed
+    changed['waste_pct']
+    assert cache.computed == computed + 1
+
+
+def test_filtered_departments_only(frames):
+    dept_df = frames[0]
+    subset = dept_df[dept_df['Department'] == DEPARTMENTS[0]]
+    headline = Metrics({'dept_df': subset})
+    assert headline['n_departments'] == 1
+    assert headline['avg_wait'] == pytest.approx(subset['Avg_Wait'].iloc[0])
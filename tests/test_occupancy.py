@@ -0,0 +1,94 @@
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_loader import APPT_SOURCE, DEPARTMENTS, WAIT_SOURCE
+from occupancy import (IDLE, PRODUCTIVE, STATES, WASTED, backfill, occupancy_frames,
+                       occupancy_totals, slot_occupancy, sweep)
+
+MONDAY = int(np.datetime64('2024-01-01', 'm').astype(np.int64))
+
+
+def slots(rows):
+    """Slot satu hari Senin dari (dokter, dept, terbuang, jam:menit mulai, jam:menit selesai)"""
+    def minute(hhmm):
+        hour, minute = hhmm.split(':')
+        return MONDAY + int(hour) * 60 + int(minute)
+
+    doctor, dept, wasted, start, end = zip(*rows)
+    start = np.array([minute(t) for t in start], np.int64)
+    return {'day': start // (24 * 60), 'doctor': np.array(doctor, np.int32),
+            'dept': np.array(dept, np.int8), 'wasted': np.array(wasted),
+            'start': start, 'end': np.array([minute(t) for t in end], np.int64)}
+
+
+@pytest.fixture(scope='module')
+def sliced_dir(synthetic_dir, tmp_path_factory):
+    """Data sintetis dengan log appointment dipecah ke banyak row group kecil"""
+    data_dir = tmp_path_factory.mktemp('occupancy')
+    shutil.copy(synthetic_dir / f"{WAIT_SOURCE}.parquet", data_dir)
+    appt = pd.read_parquet(synthetic_dir / f"{APPT_SOURCE}.parquet")
+    appt.to_parquet(data_dir / f"{APPT_SOURCE}.parquet", index=False, row_group_size=700)
+    return data_dir
+
+
+def test_sweep_states_per_hour():
+    result = sweep(slots([
+        (1, 0, False, '09:00', '09:30'),
+        (1, 0, True, '09:15', '10:15'),   # cancel tertutup appointment hadir s/d 09:30
+        (1, 0, False, '10:45', '11:00'),  # 10:15-10:45 idle
+        (2, 3, True, '13:00', '13:20'),   # dokter lain: seluruhnya terbuang
+    ]))
+    minutes = result['slot_minutes']
+    assert minutes[0, 9, 0, [PRODUCTIVE, WASTED, IDLE]].tolist() == [30, 30, 0]
+    assert minutes[0, 10, 0, [PRODUCTIVE, WASTED, IDLE]].tolist() == [15, 15, 30]
+    assert minutes[3, 13, 0, WASTED] == 20
+    assert minutes.sum() == 45 + 45 + 30 + 20
+    assert result['wasted_minutes'].sum() == 45 + 20
+
+
+def test_backfill_is_capped_by_wasted_minutes_and_walkin_demand():
+    # Sel (tanggal, dept, jam): 40 menit terbuang; walk-in 1 x 15 menit vs 5 x 15 menit
+    date = MONDAY // (24 * 60)
+    cells = np.array([(date * len(DEPARTMENTS) + 0) * 24 + 9,
+                      (date * len(DEPARTMENTS) + 1) * 24 + 9])
+    filled = backfill(cells, np.array([40.0, 40.0]), cells, np.array([1.0, 5.0]),
+                      service_minutes=15)
+    assert filled[0, 9, 0] == 15 and filled[1, 9, 0] == 40
+    assert filled.sum() == 55
+
+
+def test_chunked_occupancy_matches_single_pass(synthetic_dir, sliced_dir):
+    whole = slot_occupancy(synthetic_dir, workers=1)
+    for workers, batch_rows in [(1, 700), (2, 1_400), (1, 333)]:
+        chunked = slot_occupancy(sliced_dir, workers=workers, batch_rows=batch_rows)
+        np.testing.assert_allclose(chunked['slot_minutes'], whole['slot_minutes'])
+        np.testing.assert_allclose(chunked['backfill_minutes'], whole['backfill_minutes'])
+
+
+def test_totals_and_frames_agree(synthetic_dir):
+    result = slot_occupancy(synthetic_dir, workers=1)
+    totals = occupancy_totals(result)
+    assert 0 <= totals['Backfill'] <= totals['Terbuang']
+    assert totals['Terbuang_Bersih'] == pytest.approx(totals['Terbuang'] - totals['Backfill'])
+    for df in occupancy_frames(result):
+        for name in STATES + ['Backfill']:
+            assert df[name].sum() == pytest.approx(totals[name], abs=0.1 * len(df))
+
+
+def test_unsorted_log_is_rejected(synthetic_dir, tmp_path):
+    shutil.copy(synthetic_dir / f"{WAIT_SOURCE}.parquet", tmp_path)
+    appt = pd.read_parquet(synthetic_dir / f"{APPT_SOURCE}.parquet")
+    appt.iloc[::-1].to_parquet(tmp_path / f"{APPT_SOURCE}.parquet", index=False)
+    with pytest.raises(RuntimeError, match="harus terurut"):
+        slot_occupancy(tmp_path, workers=1)
+
+
+def test_log_without_schedule_columns(synthetic_dir, tmp_path):
+    shutil.copy(synthetic_dir / f"{WAIT_SOURCE}.parquet", tmp_path)
+    appt = pd.read_parquet(synthetic_dir / f"{APPT_SOURCE}.parquet")
+    appt.drop(columns=['Start_Time', 'End_Time']).to_parquet(
+        tmp_path / f"{APPT_SOURCE}.parquet", index=False)
+    assert slot_occupancy(tmp_path) is None
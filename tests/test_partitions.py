@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_loader import APPT_SOURCE, WAIT_SOURCE, merge_partials, source_files, stream_partials
+from partitions import (CACHE_DIRNAME, PARTIAL_BUILDERS, data_fingerprint, refresh,
+                        split_by_day)
+
+
+@pytest.fixture
+def partitioned_dir(synthetic_dir, tmp_path):
+    """Salinan data sintetis yang dipecah menjadi partisi harian"""
+    for source in PARTIAL_BUILDERS:
+        split_by_day(synthetic_dir / f"{source}.parquet", source, tmp_path)
+    return tmp_path
+
+
+def full_recompute(data_dir):
+    """Partial aggregates semua partisi tanpa cache"""
+    totals = {}
+    for source, (columns, build) in PARTIAL_BUILDERS.items():
+        for path in source_files(source, data_dir):
+            totals = merge_partials(totals, stream_partials(path, columns, build))
+    return totals
+
+
+def assert_same_partials(actual, expected):
+    assert sorted(actual) == sorted(expected)
+    for key in expected:
+        np.testing.assert_allclose(actual[key], expected[key], rtol=1e-9, atol=1e-6,
+                                   err_msg=key)
+
+
+def test_refresh_matches_full_recompute(partitioned_dir):
+    assert len(source_files(WAIT_SOURCE, partitioned_dir)) > 1
+    assert_same_partials(refresh(partitioned_dir, workers=1), full_recompute(partitioned_dir))
+    # Run kedua seluruhnya dari cache
+    assert_same_partials(refresh(partitioned_dir, workers=1), full_recompute(partitioned_dir))
+
+
+def test_parallel_refresh_matches_full_recompute(partitioned_dir):
+    assert_same_partials(refresh(partitioned_dir, workers=2), full_recompute(partitioned_dir))
+
+
+def test_changed_and_removed_partitions_are_invalidated(partitioned_dir):
+    refresh(partitioned_dir, workers=1)
+    before = data_fingerprint(partitioned_dir)
+
+    wait_files = source_files(WAIT_SOURCE, partitioned_dir)
+    changed = pd.read_parquet(wait_files[0])
+    changed.iloc[: len(changed) // 2].to_parquet(wait_files[0], index=False)
+    wait_files[1].unlink()
+    source_files(APPT_SOURCE, partitioned_dir)[-1].unlink()
+
+    assert data_fingerprint(partitioned_dir) != before
+    assert_same_partials(refresh(partitioned_dir, workers=1), full_recompute(partitioned_dir))
+
+
+def test_refresh_rebuilds_when_cached_partial_is_missing(partitioned_dir):
+    refresh(partitioned_dir, workers=1)
+    cache_dir = partitioned_dir / CACHE_DIRNAME / WAIT_SOURCE
+    for path in cache_dir.glob('*.npz'):
+        path.unlink()
+    wait_files = source_files(WAIT_SOURCE, partitioned_dir)
+    wait_files[0].unlink()
+    assert_same_partials(refresh(partitioned_dir, workers=1), full_recompute(partitioned_dir))
@@ -0,0 +1,84 @@
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_loader import DEPARTMENTS, WAIT_SOURCE, merge_partials, source_files, stream_partials
+from partitions import PARTIAL_BUILDERS, refresh, split_by_day
+from query_store import QueryStore, build_store, ensure_store, store_path
+
+STORE_KEYS = ['cube_sum', 'cube_count', 'status_count', 'dept_status', 'month_status']
+
+
+@pytest.fixture
+def partitioned_dir(synthetic_dir, tmp_path):
+    for source in PARTIAL_BUILDERS:
+        split_by_day(synthetic_dir / f"{source}.parquet", source, tmp_path)
+    return tmp_path
+
+
+def assert_store_matches(partials, expected):
+    for key in STORE_KEYS:
+        np.testing.assert_allclose(partials[key], expected[key], rtol=1e-9, atol=1e-6,
+                                   err_msg=key)
+
+
+def day_partials(data_dir, days):
+    """Partial aggregates partisi harian untuk tanggal-tanggal tertentu"""
+    totals = {}
+    for source, (columns, build) in PARTIAL_BUILDERS.items():
+        for path in source_files(source, data_dir):
+            if path.stem.removeprefix('date=') in days:
+                totals = merge_partials(totals, stream_partials(path, columns, build))
+    return totals
+
+
+def part_ids(data_dir):
+    with sqlite3.connect(store_path(data_dir)) as conn:
+        return dict(conn.execute("SELECT name, part FROM parts"))
+
+
+def test_store_matches_partitioned_aggregates(partitioned_dir):
+    store = ensure_store(partitioned_dir, workers=1)
+    assert_store_matches(store.partials(), refresh(partitioned_dir, workers=1))
+
+    days = [path.stem.removeprefix('date=')
+            for path in source_files(WAIT_SOURCE, partitioned_dir)][10:17]
+    start, end = np.datetime64(days[0]), np.datetime64(days[-1])
+    assert_store_matches(store.partials(start, end), day_partials(partitioned_dir, days))
+    assert 'BETWEEN' in store._where(start, end)
+
+    avg_wait, count = store.summary(start, end, DEPARTMENTS[:2])
+    partials = day_partials(partitioned_dir, days)
+    assert count == partials['cube_count'][:2].sum()
+    assert avg_wait == pytest.approx(partials['cube_sum'][:2].sum() / count)
+    store.close()
+
+
+def test_update_touches_only_changed_partitions(partitioned_dir, tmp_path_factory):
+    ensure_store(partitioned_dir, workers=1).close()
+    before = part_ids(partitioned_dir)
+
+    wait_files = source_files(WAIT_SOURCE, partitioned_dir)
+    changed = pd.read_parquet(wait_files[0])
+    changed.iloc[: len(changed) // 2].to_parquet(wait_files[0], index=False)
+    wait_files[1].unlink()
+
+    store = ensure_store(partitioned_dir, workers=1)
+    after = part_ids(partitioned_dir)
+    changed_name = wait_files[0].relative_to(partitioned_dir).as_posix()
+    assert wait_files[1].relative_to(partitioned_dir).as_posix() not in after
+    assert after[changed_name] != before[changed_name]
+    assert all(after[name] == part for name, part in before.items()
+               if name in after and name != changed_name)
+
+    # Hasil update in place sama dengan store yang dibangun dari nol
+    fresh = build_store(partitioned_dir, tmp_path_factory.mktemp('fresh') / 'store.sqlite',
+                        workers=1)
+    rebuilt = QueryStore(fresh)
+    assert_store_matches(store.partials(), rebuilt.partials())
+    assert store.fingerprint == rebuilt.fingerprint
+    np.testing.assert_allclose(store.daily()[0], rebuilt.daily()[0])
+    store.close()
+    rebuilt.close()
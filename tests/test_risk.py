@@ -0,0 +1,100 @@
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_loader import APPT_SOURCE, BOOK_RISK_COLUMNS, BOOK_SOURCE, iter_records
+from partitions import CACHE_DIRNAME
+from risk import (N_FEATURES, auc, booking_features, design, feature_tables, fit_logistic,
+                  logits, merge_tables, no_show_risk, risk_frames, risk_model, risk_totals,
+                  sigmoid)
+
+ALL_ROWS = 1_000_000
+
+
+@pytest.fixture(scope='module')
+def risk_dir(synthetic_dir, tmp_path_factory):
+    """Salinan log appointment (banyak row group) & appointment book; cache risiko di sini"""
+    data_dir = tmp_path_factory.mktemp('risk')
+    appt = pd.read_parquet(synthetic_dir / f"{APPT_SOURCE}.parquet")
+    appt.to_parquet(data_dir / f"{APPT_SOURCE}.parquet", index=False, row_group_size=50_000)
+    shutil.copy(synthetic_dir / f"{BOOK_SOURCE}.parquet", data_dir)
+    return data_dir
+
+
+def history_rows(table):
+    """(pasien, prior_visits, prior_wasted, label) sampel, terurut (tanpa kunci acak)"""
+    rows = np.column_stack([table['patient'], table['prior_visits'], table['prior_wasted'],
+                            table['label']])
+    return rows[np.lexsort(rows.T[::-1])]
+
+
+def test_patient_history_matches_records(risk_dir):
+    appt = pd.read_parquet(risk_dir / f"{APPT_SOURCE}.parquet")
+    label = appt['Status'].isin(['Cancelled', 'No-Show']).astype(np.int64)
+    by_patient = label.groupby(appt['Patient_ID'])
+    expected = pd.DataFrame({'patient': appt['Patient_ID'],
+                             'visits': by_patient.cumcount(),
+                             'wasted': by_patient.cumsum() - label,
+                             'label': label}).to_numpy()
+    expected = expected[np.lexsort(expected.T[::-1])]
+
+    for workers, batch_rows in [(1, ALL_ROWS), (2, 30_000)]:
+        shutil.rmtree(risk_dir / CACHE_DIRNAME, ignore_errors=True)
+        table = merge_tables(feature_tables(risk_dir, ALL_ROWS, workers, batch_rows), ALL_ROWS)
+        np.testing.assert_array_equal(history_rows(table), expected)
+        assert table['visits'].sum() == len(appt)
+        assert table['wasted'].sum() == label.sum()
+
+
+def test_fit_logistic_recovers_coefficients():
+    rng = np.random.default_rng(0)
+    X = np.column_stack([np.ones(50_000), rng.normal(size=50_000), rng.integers(0, 2, 50_000)])
+    coef = np.array([-1.0, 0.8, 1.5])
+    y = (rng.random(50_000) < sigmoid(X @ coef)).astype(np.float64)
+    np.testing.assert_allclose(fit_logistic(X, y, ridge=1e-6), coef, atol=0.05)
+
+
+def test_auc():
+    y = np.array([False, False, True, True])
+    assert auc(y, np.array([0.1, 0.2, 0.8, 0.9])) == 1.0
+    assert auc(y, np.array([0.9, 0.8, 0.2, 0.1])) == 0.0
+    assert auc(y, np.full(4, 0.5)) == 0.5
+    assert np.isnan(auc(np.ones(4, bool), np.arange(4.0)))
+
+
+def test_logits_match_design_matrix(risk_dir):
+    records = next(iter_records(risk_dir / f"{BOOK_SOURCE}.parquet", BOOK_RISK_COLUMNS, 2_000))
+    features = booking_features(records)
+    rng = np.random.default_rng(1)
+    visits = rng.integers(0, 5, len(features['day']))
+    wasted = rng.integers(0, 1 + visits)
+    coef = rng.normal(size=N_FEATURES)
+    np.testing.assert_allclose(logits(features, visits, wasted, coef),
+                               design(features, visits, wasted) @ coef)
+
+
+def test_book_scores_and_cached_model(risk_dir):
+    result = no_show_risk(risk_dir, workers=1)
+    book = pd.read_parquet(risk_dir / f"{BOOK_SOURCE}.parquet")
+    assert result['booked'].sum() == len(book)
+    assert result['histogram'].sum() == len(book)
+    assert 0 < result['expected'].sum() < len(book)
+    assert result['model']['auc'] > 0.5
+
+    totals = risk_totals(result)
+    by_slot, by_dept = risk_frames(result)
+    assert by_slot['Booked'].sum() == by_dept['Booked'].sum() == totals['booked']
+    assert totals['days'] == book['Appointment_Date'].dt.normalize().nunique()
+
+    # Run kedua: model dari cache, skor identik
+    model, _ = risk_model(risk_dir, workers=1)
+    np.testing.assert_array_equal(model['coef'], result['model']['coef'])
+    assert no_show_risk(risk_dir, workers=2)['expected'].sum() == pytest.approx(
+        result['expected'].sum())
+
+
+def test_missing_book_disables_risk(synthetic_dir, tmp_path):
+    shutil.copy(synthetic_dir / f"{APPT_SOURCE}.parquet", tmp_path)
+    assert no_show_risk(tmp_path) is None
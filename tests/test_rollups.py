@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_loader import APPT_SOURCE, DEPARTMENTS, WAIT_SOURCE, source_files
+from partitions import PARTIAL_BUILDERS, split_by_day
+from query_store import ensure_store
+from rollups import DailyRollup
+
+
+@pytest.fixture
+def partitioned_dir(synthetic_dir, tmp_path):
+    for source in PARTIAL_BUILDERS:
+        split_by_day(synthetic_dir / f"{source}.parquet", source, tmp_path)
+    return tmp_path
+
+
+def day(value):
+    return np.datetime64(value, 'D')
+
+
+def check_ranges(rollup, store):
+    """Range query prefix sum sama dengan range query langsung di store"""
+    first, last = store.date_range()
+    ranges = [(first, last), (day(first) + 5, day(first) + 11), (day(last), day(last))]
+    for start, end in ranges:
+        for departments in (None, DEPARTMENTS[:3]):
+            hour_df = rollup.hour_frame(start, end, departments)
+            avg_wait, count = store.summary(start, end, departments)
+            assert hour_df['Volume'].sum() == count
+            expected = store.partials(start, end, departments)
+            np.testing.assert_array_equal(
+                rollup.status_counts(start, end, departments),
+                expected['dept_status'][[DEPARTMENTS.index(d) for d in departments]].sum(axis=0)
+                if departments else expected['status_count'])
+            day_df = rollup.day_frame(start, end, departments)
+            assert day_df['Volume'].sum() == count
+            if count:
+                total = (hour_df['Wait_Time'] * hour_df['Volume']).sum()
+                assert total / count == pytest.approx(avg_wait, abs=0.1)
+
+
+def test_rollup_matches_store_ranges(partitioned_dir):
+    store = ensure_store(partitioned_dir, workers=1)
+    rollup = DailyRollup()
+    assert rollup.sync(store) == rollup.n_days > 0
+    check_ranges(rollup, store)
+    assert rollup.sync(store) == 0
+    store.close()
+
+
+def test_new_days_extend_in_place_and_changes_rebuild(partitioned_dir, tmp_path_factory):
+    # Simpan hari terakhir di luar data dulu, lalu tambahkan kembali
+    held = tmp_path_factory.mktemp('held')
+    moved = {}
+    for source in (WAIT_SOURCE, APPT_SOURCE):
+        path = source_files(source, partitioned_dir)[-1]
+        moved[path] = held / f"{source}-{path.name}"
+        path.rename(moved[path])
+
+    store = ensure_store(partitioned_dir, workers=1)
+    rollup = DailyRollup()
+    rollup.sync(store)
+    n_days = rollup.n_days
+    store.close()
+
+    for path, target in moved.items():
+        target.rename(path)
+    store = ensure_store(partitioned_dir, workers=1)
+    assert rollup.sync(store) >= 1 and rollup.n_days > n_days
+    check_ranges(rollup, store)
+    store.close()
+
+    # Hari lama berubah: prefix sum dibangun ulang dari awal
+    first = source_files(WAIT_SOURCE, partitioned_dir)[0]
+    records = pd.read_parquet(first)
+    records.iloc[: len(records) // 2].to_parquet(first, index=False)
+    store = ensure_store(partitioned_dir, workers=1)
+    rollup.sync(store)
+    check_ranges(rollup, store)
+
+    # Salinan read-only untuk bagian shared snapshot
+    shared = DailyRollup.from_arrays(rollup.to_arrays(), store.fingerprint)
+    check_ranges(shared, store)
+    assert DailyRollup.from_arrays({}, store.fingerprint) is None
+    store.close()
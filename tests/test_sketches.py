@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from sketches import (N_BINS, SKETCH_ALPHA, bin_index, build_sketches, marginal_quantiles,
+                      quantiles)
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_quantiles_within_relative_error(seed):
+    rng = np.random.default_rng(seed)
+    values = rng.lognormal(4, 0.8, 20_000) + 1
+    sketch = build_sketches(np.zeros(len(values), np.int64), 1, values)[0]
+    qs = [0.5, 0.9, 0.95]
+    estimate = quantiles(sketch, qs)
+    # Rank yang dibaca sketch: nilai ke-ceil(q*n) dari data terurut
+    exact = np.sort(values)[np.ceil(np.array(qs) * len(values)).astype(int) - 1]
+    assert np.all(np.abs(estimate - exact) <= SKETCH_ALPHA * exact)
+
+
+def test_merge_is_sum_of_sketches():
+    rng = np.random.default_rng(4)
+    values = rng.gamma(2, 40, 10_000)
+    whole = build_sketches(np.zeros(len(values), np.int64), 1, values)
+    halves = sum(build_sketches(np.zeros(len(part), np.int64), 1, part)
+                 for part in np.array_split(values, 2))
+    np.testing.assert_array_equal(whole, halves)
+
+
+def test_non_finite_values_are_skipped():
+    values = np.array([10.0, np.nan, np.inf, 30.0])
+    sketch = build_sketches(np.zeros(4, np.int64), 1, values)
+    assert sketch.sum() == 2
+    assert bin_index([0.5, 1e9]).tolist() == [0, N_BINS - 1]
+
+
+def test_marginal_quantiles_per_cell_and_empty_cells():
+    cells = np.array([0, 0, 0, 2, 2, 2])
+    values = np.array([10, 10, 10, 100, 100, 100], dtype=float)
+    sketch = build_sketches(cells, 3, values).reshape(3, 1, N_BINS)
+    p50 = marginal_quantiles(sketch, 0, (0.5,))[:, 0]
+    assert p50[0] == pytest.approx(10, rel=SKETCH_ALPHA)
+    assert np.isnan(p50[1])
+    assert p50[2] == pytest.approx(100, rel=SKETCH_ALPHA)
@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_loader import build_frames, builtin_frames
+from partitions import data_fingerprint, refresh
+from precompute import ensure_snapshot, precompute
+from snapshot import (LATEST_NAME, latest_snapshot, load_snapshot, prune_snapshots,
+                      snapshot_fingerprint, write_snapshot)
+
+
+def test_round_trip_frames_and_arrays(tmp_path):
+    frames = builtin_frames()
+    arrays = {'cube_count': np.arange(24, dtype=np.int64).reshape(2, 3, 4),
+              'wait_dropped': np.array([3, 0, 1, 2])}
+    shared = {'prefix': np.linspace(0, 1, 7)}
+    path = write_snapshot(frames, arrays, tmp_path, 'abc123', shared)
+
+    assert latest_snapshot(tmp_path) == path
+    assert (tmp_path / LATEST_NAME).read_text() == path.name
+    assert snapshot_fingerprint(path) == 'abc123'
+
+    snapshot = load_snapshot(path)
+    for loaded, frame in zip(snapshot['frames'], frames):
+        pd.testing.assert_frame_equal(loaded, frame)
+    for name, values in arrays.items():
+        np.testing.assert_array_equal(snapshot['arrays'][name], values)
+        assert not snapshot['arrays'][name].flags.writeable
+    np.testing.assert_array_equal(snapshot['shared']['prefix'], shared['prefix'])
+
+
+def test_versions_written_in_the_same_second_do_not_collide(tmp_path):
+    frames = builtin_frames()
+    paths = [write_snapshot(frames, {}, tmp_path, 'abc123') for _ in range(3)]
+    assert len(set(paths)) == 3 and all(path.exists() for path in paths)
+    assert latest_snapshot(tmp_path) == paths[-1]
+
+
+def test_prune_keeps_newest_written_versions(tmp_path):
+    frames = builtin_frames()
+    oldest, middle, newest = (write_snapshot(frames, {}, tmp_path, 'abc123') for _ in range(3))
+    # Nama file tidak menentukan urutan: versi tertua diberi nama yang terurut paling akhir
+    renamed = oldest.rename(tmp_path / 'dashboard-99991231T235959Z-ffffffff.snap')
+    foreign = tmp_path / 'dashboard-foreign.snap'
+    foreign.write_bytes(b'not a snapshot')
+
+    prune_snapshots(2, tmp_path)
+    assert not renamed.exists()
+    assert middle.exists() and newest.exists() and foreign.exists()
+    assert latest_snapshot(tmp_path) == newest
+
+
+def test_load_rejects_foreign_file(tmp_path):
+    path = tmp_path / 'dashboard-x.snap'
+    path.write_bytes(b'not a snapshot')
+    with pytest.raises(ValueError):
+        load_snapshot(path)
+
+
+def test_precompute_matches_aggregation(synthetic_dir, tmp_path):
+    path = precompute(synthetic_dir, tmp_path, workers=1)
+    snapshot = load_snapshot(path)
+    assert snapshot['fingerprint'] == data_fingerprint(synthetic_dir)
+    expected = build_frames(refresh(synthetic_dir, workers=1))
+    for loaded, frame in zip(snapshot['frames'], expected):
+        pd.testing.assert_frame_equal(loaded, frame)
+    assert snapshot['shared']
+    # Bootstrap CI ikut di-publish, dashboard tidak perlu scan ulang record
+    gap = snapshot['findings']['monday_friday_gap']
+    assert gap['low'] <= gap['estimate'] <= gap['high']
+
+
+def test_ensure_snapshot_reuses_current_version(synthetic_dir, tmp_path):
+    first = ensure_snapshot(synthetic_dir, tmp_path, workers=1)
+    assert ensure_snapshot(synthetic_dir, tmp_path, workers=1) == first
+    forced = ensure_snapshot(synthetic_dir, tmp_path, keep=1, workers=1, force=True)
+    assert forced != first and not first.exists()
+    assert latest_snapshot(tmp_path) == forced
+    assert ensure_snapshot(tmp_path / 'kosong', tmp_path, workers=1) is None
@@ -0,0 +1,49 @@
+import pytest
+
+import static_export
+from static_export import PLOTLY_JS, export_bundle
+
+
+@pytest.fixture
+def fake_pages(monkeypatch):
+    """Halaman tetap tanpa menjalankan dashboard; body berganti per ekspor"""
+    exports = iter(range(100))
+
+    def render_pages(timeout):
+        n = next(exports)
+        return [('index.html', 'Ringkasan', f'<p>ekspor {n}</p>'),
+                ('detail.html', 'Detail', f'<p>detail {n}</p>')]
+
+    monkeypatch.setattr(static_export, 'render_pages', render_pages)
+
+
+def versions(out_dir):
+    return sorted(p.name for p in out_dir.with_name(f".{out_dir.name}.versions").iterdir()
+                  if not p.name.startswith('.'))
+
+
+def test_export_swaps_symlink_to_complete_version(fake_pages, tmp_path):
+    out_dir = tmp_path / 'export'
+    export_bundle(out_dir)
+    first = out_dir.resolve()
+    assert out_dir.is_symlink()
+    assert 'ekspor 0' in (out_dir / 'index.html').read_text()
+    assert (out_dir / PLOTLY_JS).exists() and (out_dir / 'index.html.gz').exists()
+
+    export_bundle(out_dir)
+    assert 'ekspor 1' in (out_dir / 'index.html').read_text()
+    # Versi sebelumnya disisakan untuk klien yang masih memuatnya
+    assert first.exists() and len(versions(out_dir)) == 2
+
+    export_bundle(out_dir)
+    assert not first.exists() and len(versions(out_dir)) == 2
+    assert not list(tmp_path.glob('.export.*.link'))
+
+
+def test_legacy_directory_is_replaced_by_symlink(fake_pages, tmp_path):
+    out_dir = tmp_path / 'export'
+    out_dir.mkdir()
+    (out_dir / 'index.html').write_text('lama')
+    export_bundle(out_dir)
+    assert out_dir.is_symlink()
+    assert 'ekspor 0' in (out_dir / 'index.html').read_text()
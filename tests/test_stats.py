@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_loader import TARGET_WAIT
+from stats import N_BUCKETS, PARALLEL_MIN_CELLS, bucket_stats, findings, resample
+
+
+@pytest.fixture(scope='module')
+def records(synthetic_dir):
+    records = pd.read_parquet(synthetic_dir / 'wait_times.parquet')
+    return records.dropna(subset=['Visit_Date', 'Department', 'Triage_Category', 'Wait_Time'])
+
+
+@pytest.fixture(scope='module')
+def stats(synthetic_dir):
+    return bucket_stats(synthetic_dir, workers=1)
+
+
+def test_point_estimates_match_records(records, stats):
+    result = findings(stats, resamples=200)
+    assert result['n_records'] == len(records)
+    expected = np.corrcoef(records['Doctors_On_Shift'], records['Wait_Time'])[0, 1]
+    assert result['correlation']['estimate'] == pytest.approx(expected, abs=1e-9)
+
+    by_day = records.groupby(records['Visit_Date'].dt.dayofweek)['Wait_Time'].mean()
+    gap = result['monday_friday_gap']
+    assert gap['estimate'] == pytest.approx(by_day[0] - by_day[4])
+    assert gap['low'] <= gap['estimate'] <= gap['high']
+
+    by_dept = records.groupby('Department')['Wait_Time'].mean() - TARGET_WAIT
+    gaps = result['dept_gaps']
+    for dept, value in zip(gaps['Department'], gaps['estimate']):
+        assert value == pytest.approx(by_dept[dept])
+    assert np.all(gaps['low'] <= gaps['high'])
+
+
+def test_resample_is_reproducible_across_workers(stats):
+    # Cukup besar supaya batch benar-benar dibagi ke pool
+    resamples = -(-PARALLEL_MIN_CELLS // N_BUCKETS)
+    one = resample(stats, resamples=resamples, workers=1, seed=7)
+    many = resample(stats, resamples=resamples, workers=3, seed=7)
+    np.testing.assert_array_equal(one, many)
+    # Setiap resample menarik N_BUCKETS bucket dengan pengembalian
+    np.testing.assert_allclose(one[:, 0], stats[:, 0].sum() * np.ones(resamples), rtol=0.2)
+
+
+def test_bucket_stats_without_data(tmp_path):
+    assert bucket_stats(tmp_path, workers=1) is None